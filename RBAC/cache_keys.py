@@ -0,0 +1,17 @@
+"""Keys of the shared cache tier, kept in one place so writers invalidate what readers cache."""
+
+
+def teams_by_org(org_id, user_id) -> str:
+    return f"teams_by_org:{org_id}:{user_id}"
+
+
+def team_members(team_id) -> str:
+    return f"team_members:{team_id}"
+
+
+def accessible_datasources_by_user(user_id) -> str:
+    return f"accessible_datasources:user:{user_id}"
+
+
+def accessible_datasources_by_org(org_id) -> str:
+    return f"accessible_datasources:org:{org_id}"
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from typing import Optional
+
+from config.logging import logger
+from config.settings import loaded_config
+from utils.cache import LRUTTLCache
+
+ACCESS_DECISIONS_TOPIC = "access_decisions"
+
+
+class AccessDecisionCache:
+    """
+    In-process cache of check_access decisions (both granted and denied).
+
+    Entries are keyed by the exact (datasource_id, user_id, team_id, org_id) tuple a caller
+    checked, and indexed by datasource and by user so that writes can drop only the
+    decisions they can actually change.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._decisions = LRUTTLCache(max_size, ttl_seconds, on_evict=self._unindex, name="access_decisions")
+        self._keys_by_datasource = defaultdict(set)
+        self._keys_by_user = defaultdict(set)
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(datasource_id, user_id=None, team_id=None, org_id=None):
+        return (
+            datasource_id,
+            user_id or None,
+            str(team_id) if team_id else None,
+            org_id or None,
+        )
+
+    def get(self, datasource_id, user_id, team_id, org_id) -> Optional[bool]:
+        return self._decisions.get(self.make_key(datasource_id, user_id, team_id, org_id))
+
+    def set(self, datasource_id, user_id, team_id, org_id, has_access: bool):
+        key = self.make_key(datasource_id, user_id, team_id, org_id)
+        self._decisions.set(key, has_access)
+        if key in self._decisions:
+            self._keys_by_datasource[key[0]].add(key)
+            if key[1]:
+                self._keys_by_user[key[1]].add(key)
+
+    def invalidate_grant(self, datasource_id, user_id=None, team_id=None, org_id=None):
+        """Drop decisions for a datasource that mention any of the given principals."""
+        user_id, team_id, org_id = self.make_key(datasource_id, user_id, team_id, org_id)[1:]
+        if not (user_id or team_id or org_id):
+            return self.invalidate_datasource(datasource_id)
+
+        for key in list(self._keys_by_datasource.get(datasource_id, ())):
+            _, key_user_id, key_team_id, key_org_id = key
+            if (
+                (user_id and key_user_id == user_id)
+                or (team_id and key_team_id == team_id)
+                or (org_id and key_org_id == org_id)
+            ):
+                self._invalidate(key)
+
+    def invalidate_datasource(self, datasource_id):
+        for key in list(self._keys_by_datasource.get(datasource_id, ())):
+            self._invalidate(key)
+
+    def invalidate_datasources(self, datasource_ids):
+        """Drop decisions for many datasources at once, e.g. after a bulk grant or revoke."""
+        for datasource_id in datasource_ids:
+            self.invalidate_datasource(datasource_id)
+
+    def invalidate_user(self, user_id: str):
+        """Drop every decision checked on behalf of a user, e.g. after a membership change."""
+        for key in list(self._keys_by_user.get(user_id, ())):
+            self._invalidate(key)
+
+    def clear(self):
+        self._decisions.clear()
+
+    async def broadcast_invalidation(self, scope: str, **params):
+        """
+        Invalidate in this worker right away and publish the invalidation to every other worker
+        through the shared cache backend, when one is configured.
+
+        Args:
+            scope: "grant", "datasource", "datasources" or "user", naming the invalidate_* method to apply
+            params: Keyword arguments of that method
+        """
+        message = {"scope": scope, **params}
+        self.handle_invalidation(message)
+
+        backend = loaded_config.cache_backend
+        if backend is None:
+            return
+        try:
+            await backend.publish(ACCESS_DECISIONS_TOPIC, message)
+        except Exception as e:
+            logger.error("Failed to publish access decision invalidation", error=str(e), **message)
+
+    def handle_invalidation(self, message: dict):
+        params = {key: value for key, value in message.items() if key != "scope"}
+        if message["scope"] == "grant":
+            self.invalidate_grant(**params)
+        elif message["scope"] == "datasource":
+            self.invalidate_datasource(**params)
+        elif message["scope"] == "datasources":
+            self.invalidate_datasources(**params)
+        elif message["scope"] == "user":
+            self.invalidate_user(**params)
+
+    def stats(self) -> dict:
+        return {**self._decisions.stats(), "invalidations": self.invalidations}
+
+    def _invalidate(self, key):
+        self._decisions.pop(key)
+        self.invalidations += 1
+
+    def _unindex(self, key):
+        datasource_keys = self._keys_by_datasource.get(key[0])
+        if datasource_keys is not None:
+            datasource_keys.discard(key)
+            if not datasource_keys:
+                del self._keys_by_datasource[key[0]]
+
+        if key[1]:
+            user_keys = self._keys_by_user.get(key[1])
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._keys_by_user[key[1]]
+
+
+access_decision_cache = AccessDecisionCache(
+    max_size=loaded_config.access_cache_max_size,
+    ttl_seconds=loaded_config.access_cache_ttl_seconds,
+)
@@ -1,85 +1,546 @@
-from typing import Optional
+import hashlib
+from typing import List, Optional
 from uuid import UUID
 
 import uuid6
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, literal, exists, or_, union, tuple_, Integer, BigInteger, String, \
+    Select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from RBAC.datasources.models import DataSourceAccess
+from RBAC import cache_keys
+from RBAC.datasources.cache import access_decision_cache
+from RBAC.datasources.models import DataSourceAccess, EffectiveDataSourceAccess
 from RBAC.datasources.schemas import DataSourceAccessSchema
+from RBAC.teams.models import TeamMemberships
+from config.logging import logger
+from config.settings import loaded_config
+from utils.cache import invalidate
+from utils.connection_handler import after_commit
+from utils.pagination import PageParams, keyset, page_of
+from utils.tracing import traced
 
+# Columns read by grant listings and principal lookups, so they skip ORM entity hydration
+PRINCIPAL_COLUMNS = (DataSourceAccess.user_id, DataSourceAccess.team_id, DataSourceAccess.org_id)
+GRANT_COLUMNS = (DataSourceAccess.access_id, DataSourceAccess.datasource_id, *PRINCIPAL_COLUMNS)
+
+# Advisory lock every scoped refresh holds shared and an unscoped refresh holds exclusively
+REFRESH_ALL_LOCK_KEY = 0
+
+
+def refresh_lock_key(namespace: str, value) -> int:
+    """The advisory lock key of a team or datasource, as a signed 64-bit integer."""
+    digest = hashlib.blake2b(f"{namespace}:{value}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@traced
+class EffectiveAccessDAO:
+    """
+    Maintains effective_datasource_access, the user -> datasource rows implied by direct user
+    grants and by grants to teams the user is an active member of.
+
+    Every write is a scoped refresh: the rows inside the scope are deleted and re-derived from
+    datasource_access and team_memberships, so grants and revocations through overlapping paths
+    (e.g. direct and via a team) stay correct. Organization grants are not materialized since
+    org membership lives in Clerk; they are matched literally in the check path.
+
+    A refresh reads memberships and grants at READ COMMITTED, so two transactions re-deriving the
+    same rows could each miss the other's uncommitted change and leave a stale row behind. Every
+    refresh therefore takes transaction-scoped advisory locks on the teams whose members or
+    grants it reads, then on the datasources it re-derives, so refreshes that can touch the same
+    rows run one after the other and the later one sees the earlier one's commit.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def team_member_ids(*team_ids) -> Select:
+        return select(TeamMemberships.user_id).where(
+            TeamMemberships.team_id.in_(team_ids),
+            TeamMemberships.removed_at.is_(None)
+        )
+
+    @staticmethod
+    def team_datasource_ids(team_id) -> Select:
+        return select(DataSourceAccess.datasource_id).where(DataSourceAccess.team_id == team_id)
+
+    async def refresh(self, user_ids=None, datasource_ids=None, team_ids=()):
+        """
+        Re-derive the effective rows for the given scope.
+
+        Args:
+            user_ids: Users to refresh, as a list or a select of user_ids. None means all users.
+            datasource_ids: Datasources to refresh, as a list or a select of ids. None means all.
+            team_ids: Teams whose memberships or grants define the scope, locked before it is read
+        """
+        await self._lock_scope(datasource_ids, team_ids)
+
+        direct_grants = select(
+            DataSourceAccess.user_id.label("user_id"),
+            DataSourceAccess.datasource_id.label("datasource_id")
+        ).where(DataSourceAccess.user_id.is_not(None))
+        team_grants = select(
+            TeamMemberships.user_id.label("user_id"),
+            DataSourceAccess.datasource_id.label("datasource_id")
+        ).join(
+            TeamMemberships, TeamMemberships.team_id == DataSourceAccess.team_id
+        ).where(TeamMemberships.removed_at.is_(None))
+        source = union(direct_grants, team_grants).subquery("source")
+
+        delete_stmt = delete(EffectiveDataSourceAccess)
+        source_stmt = select(source.c.user_id, source.c.datasource_id)
+        if user_ids is not None:
+            delete_stmt = delete_stmt.where(EffectiveDataSourceAccess.user_id.in_(user_ids))
+            source_stmt = source_stmt.where(source.c.user_id.in_(user_ids))
+        if datasource_ids is not None:
+            delete_stmt = delete_stmt.where(EffectiveDataSourceAccess.datasource_id.in_(datasource_ids))
+            source_stmt = source_stmt.where(source.c.datasource_id.in_(datasource_ids))
+
+        await self.session.execute(delete_stmt)
+        await self.session.execute(
+            insert(EffectiveDataSourceAccess)
+            .from_select(["user_id", "datasource_id"], source_stmt)
+            .on_conflict_do_nothing()
+        )
+
+    async def refresh_grant(self, datasource_id, user_id=None, team_id=None):
+        """Refresh the rows a grant or revocation to a user or team on one datasource can change."""
+        if user_id:
+            await self.refresh(user_ids=[user_id], datasource_ids=[datasource_id])
+        if team_id:
+            await self.refresh(
+                user_ids=self.team_member_ids(team_id), datasource_ids=[datasource_id], team_ids=[team_id]
+            )
+
+    async def refresh_membership(self, team_id, user_ids):
+        """Refresh the rows a membership change of user_ids in team_id can change."""
+        await self.refresh(
+            user_ids=list(user_ids), datasource_ids=self.team_datasource_ids(team_id), team_ids=[team_id]
+        )
+
+    async def rebuild(self):
+        await self.refresh()
+
+    async def _lock_scope(self, datasource_ids, team_ids):
+        """
+        Lock the teams, then the datasources, a refresh re-derives, until the transaction ends.
+        Datasources given as a select are resolved after the team locks, so a concurrent grant
+        to one of the teams cannot change them; an unscoped refresh locks out every other one.
+        """
+        if datasource_ids is None:
+            await self.session.execute(select(func.pg_advisory_xact_lock(REFRESH_ALL_LOCK_KEY)))
+            return
+        await self.session.execute(select(func.pg_advisory_xact_lock_shared(REFRESH_ALL_LOCK_KEY)))
+        await self._lock_keys("team", team_ids)
+        if isinstance(datasource_ids, Select):
+            datasource_ids = (await self.session.scalars(datasource_ids)).all()
+        await self._lock_keys("datasource", datasource_ids)
+
+    async def _lock_keys(self, namespace: str, ids):
+        # Taken in key order, so refreshes with overlapping scopes queue instead of deadlocking
+        keys = sorted({refresh_lock_key(namespace, value) for value in ids})
+        if not keys:
+            return
+        lock_keys = func.unnest(literal(keys, ARRAY(BigInteger))).table_valued("key").render_derived(name="lock_keys")
+        await self.session.execute(select(func.pg_advisory_xact_lock(lock_keys.c.key)).select_from(lock_keys))
+
+
+@traced
 class DataSourceAccessDAO:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.effective_access_dao = EffectiveAccessDAO(session)
 
     async def create_access(self, payload: DataSourceAccessSchema):
-        # Check if access already exists for this specific combination
-        query = select(DataSourceAccess).where(
-            DataSourceAccess.datasource_id == payload.datasource_id
+        """
+        Grant access to the payload's single principal with one INSERT ... ON CONFLICT DO UPDATE
+        ... RETURNING against the principal's unique index, so concurrent grants of the same
+        pair converge on one row. Flushes only; the caller commits.
+        """
+        principal_column = self._principal_column(payload)
+        stmt = insert(DataSourceAccess).values(access_id=uuid6.uuid6(), **payload.model_dump())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DataSourceAccess.datasource_id, principal_column],
+            index_where=principal_column.is_not(None),
+            set_={"updated_at": stmt.excluded.updated_at}
+        ).returning(DataSourceAccess)
+        access = await self.session.scalar(stmt)
+
+        await self.effective_access_dao.refresh_grant(payload.datasource_id, payload.user_id, payload.team_id)
+        await self._invalidate_access_caches_on_commit(
+            payload.datasource_id, payload.user_id, payload.team_id, payload.org_id
         )
+        return access
 
-        # Add filters for the provided identifiers
-        if payload.user_id:
-            query = query.where(DataSourceAccess.user_id == payload.user_id)
-        if payload.team_id:
-            query = query.where(DataSourceAccess.team_id == payload.team_id)
-        if payload.org_id:
-            query = query.where(DataSourceAccess.org_id == payload.org_id)
-
-        existing_access = await self.session.execute(query)
-        existing_access = existing_access.scalars().first()
-
-        if existing_access:
-            for key, value in payload.model_dump().items():
-                setattr(existing_access, key, value)
-            await self.session.commit()
-            await self.session.refresh(existing_access)
-            return existing_access
-        else:
-            new_access = DataSourceAccess(
-                access_id=uuid6.uuid6(),
-                **payload.model_dump()
-            )
-            self.session.add(new_access)
-            await self.session.commit()
-            await self.session.refresh(new_access)
-            return new_access
+    @staticmethod
+    def _principal_column(payload):
+        """The datasource_access column of the one principal (user, team or org) the payload names."""
+        principal_columns = [
+            column for column, value in (
+                (DataSourceAccess.user_id, payload.user_id),
+                (DataSourceAccess.team_id, payload.team_id),
+                (DataSourceAccess.org_id, payload.org_id),
+            ) if value is not None
+        ]
+        if len(principal_columns) != 1:
+            raise ValueError("Exactly one of user_id, team_id, or org_id must be provided")
+        return principal_columns[0]
+
+    async def _invalidate_access_caches_on_commit(self, datasource_id, user_id=None, team_id=None, org_id=None):
+        """
+        Drop the cached decisions and accessible-datasource listings a grant change affects, once
+        it is committed. The affected keys are resolved now, inside the transaction making the change.
+        """
+        keys = []
+        if loaded_config.cache_backend is not None:
+            if user_id:
+                keys.append(cache_keys.accessible_datasources_by_user(user_id))
+            if team_id:
+                member_ids = await self.session.scalars(EffectiveAccessDAO.team_member_ids(team_id))
+                keys.extend(cache_keys.accessible_datasources_by_user(member_id) for member_id in member_ids)
+            if org_id:
+                keys.append(cache_keys.accessible_datasources_by_org(org_id))
+
+        async def invalidate_access_caches():
+            if team_id:
+                # Team grants change the decision of every member, whatever principal they checked with
+                await access_decision_cache.broadcast_invalidation("datasource", datasource_id=datasource_id)
+            else:
+                await access_decision_cache.broadcast_invalidation(
+                    "grant", datasource_id=datasource_id, user_id=user_id, org_id=org_id
+                )
+            await invalidate(loaded_config.cache_backend, *keys)
+
+        after_commit(self.session, invalidate_access_caches)
 
     async def delete_access(self, datasource_id):
+        affected_keys = []
+        if loaded_config.cache_backend is not None:
+            user_ids = await self.session.scalars(
+                select(EffectiveDataSourceAccess.user_id).where(EffectiveDataSourceAccess.datasource_id == datasource_id)
+            )
+            org_ids = await self.session.scalars(
+                select(DataSourceAccess.org_id).where(
+                    DataSourceAccess.datasource_id == datasource_id,
+                    DataSourceAccess.org_id.is_not(None)
+                )
+            )
+            affected_keys.extend(cache_keys.accessible_datasources_by_user(user_id) for user_id in user_ids)
+            affected_keys.extend(cache_keys.accessible_datasources_by_org(org_id) for org_id in set(org_ids))
+
         await self.session.execute(
             delete(DataSourceAccess).where(DataSourceAccess.datasource_id == datasource_id)
         )
-        await self.session.commit()
+        await self.effective_access_dao.refresh(datasource_ids=[datasource_id])
 
-    async def get_by_user(self, user_id: str):
-        stmt = select(DataSourceAccess).where(DataSourceAccess.user_id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        async def invalidate_access_caches():
+            await access_decision_cache.broadcast_invalidation("datasource", datasource_id=datasource_id)
+            await invalidate(loaded_config.cache_backend, *affected_keys)
 
-    async def get_by_team(self, team_id: UUID):
-        stmt = select(DataSourceAccess).where(DataSourceAccess.team_id == team_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        after_commit(self.session, invalidate_access_caches)
 
-    async def get_by_org(self, org_id: str):
-        stmt = select(DataSourceAccess).where(DataSourceAccess.org_id == org_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+    async def bulk_create_access(self, grants: List[DataSourceAccessSchema]) -> int:
+        """
+        Grant many (datasource, principal) pairs with one INSERT ... SELECT FROM unnest(...).
+
+        Pairs that already have a grant hit a unique index and are skipped by ON CONFLICT DO NOTHING. Flushes only; the caller commits, one chunk
+        of at most bulk_write_chunk_size pairs per transaction.
+
+        Returns:
+            int: Number of grants created
+        """
+        requested = self._unnest_grants(grants)
+        stmt = (
+            insert(DataSourceAccess)
+            .from_select(
+                ["access_id", "datasource_id", "user_id", "team_id", "org_id"],
+                select(
+                    requested.c.access_id, requested.c.datasource_id, requested.c.user_id,
+                    requested.c.team_id, requested.c.org_id
+                )
+            )
+            .on_conflict_do_nothing()
+            .returning(
+                DataSourceAccess.datasource_id, DataSourceAccess.user_id,
+                DataSourceAccess.team_id, DataSourceAccess.org_id
+            )
+        )
+        created = (await self.session.execute(stmt)).all()
+        await self._apply_bulk_changes(created)
+        return len(created)
+
+    async def bulk_delete_access(self, grants: List[DataSourceAccessSchema]) -> int:
+        """
+        Revoke many (datasource, principal) pairs with one DELETE ... WHERE (datasource_id, principal) IN (...).
+
+        Flushes only; the caller commits, one chunk of at most bulk_write_chunk_size pairs per transaction.
+
+        Returns:
+            int: Number of grants deleted
+        """
+        principal_columns = {
+            "user_id": DataSourceAccess.user_id,
+            "team_id": DataSourceAccess.team_id,
+            "org_id": DataSourceAccess.org_id,
+        }
+        conditions = []
+        for name, principal_column in principal_columns.items():
+            pairs = [
+                (grant.datasource_id, getattr(grant, name))
+                for grant in grants if getattr(grant, name) is not None
+            ]
+            if pairs:
+                conditions.append(tuple_(DataSourceAccess.datasource_id, principal_column).in_(pairs))
+        if not conditions:
+            return 0
+
+        stmt = (
+            delete(DataSourceAccess)
+            .where(or_(*conditions))
+            .returning(
+                DataSourceAccess.datasource_id, DataSourceAccess.user_id,
+                DataSourceAccess.team_id, DataSourceAccess.org_id
+            )
+        )
+        deleted = (await self.session.execute(stmt)).all()
+        await self._apply_bulk_changes(deleted)
+        return len(deleted)
+
+    @staticmethod
+    def _unnest_grants(grants: List[DataSourceAccessSchema]):
+        return func.unnest(
+            literal([uuid6.uuid6() for _ in grants], ARRAY(PG_UUID(as_uuid=True))),
+            literal([grant.datasource_id for grant in grants], ARRAY(BigInteger)),
+            literal([grant.user_id for grant in grants], ARRAY(String)),
+            literal([grant.team_id for grant in grants], ARRAY(PG_UUID(as_uuid=True))),
+            literal([grant.org_id for grant in grants], ARRAY(String)),
+        ).table_valued("access_id", "datasource_id", "user_id", "team_id", "org_id").render_derived(name="requested")
+
+    async def _apply_bulk_changes(self, changed_grants):
+        """
+        Refresh the effective rows and, once committed, the caches that a set of created or
+        deleted grants (rows of datasource_id, user_id, team_id, org_id) can affect.
+        """
+        if not changed_grants:
+            return
+        datasource_ids = sorted({grant.datasource_id for grant in changed_grants})
+        user_ids = sorted({grant.user_id for grant in changed_grants if grant.user_id})
+        team_ids = sorted({grant.team_id for grant in changed_grants if grant.team_id})
+        org_ids = sorted({grant.org_id for grant in changed_grants if grant.org_id})
+
+        # Team grants first, so team locks are taken before the datasource locks both refreshes share
+        if team_ids:
+            await self.effective_access_dao.refresh(
+                user_ids=EffectiveAccessDAO.team_member_ids(*team_ids), datasource_ids=datasource_ids,
+                team_ids=team_ids
+            )
+        if user_ids:
+            await self.effective_access_dao.refresh(user_ids=user_ids, datasource_ids=datasource_ids)
+
+        keys = []
+        if loaded_config.cache_backend is not None:
+            if team_ids:
+                member_ids = await self.session.scalars(EffectiveAccessDAO.team_member_ids(*team_ids))
+                user_ids = sorted(set(user_ids).union(member_ids))
+            keys.extend(cache_keys.accessible_datasources_by_user(user_id) for user_id in user_ids)
+            keys.extend(cache_keys.accessible_datasources_by_org(org_id) for org_id in org_ids)
+
+        async def invalidate_access_caches():
+            await access_decision_cache.broadcast_invalidation("datasources", datasource_ids=datasource_ids)
+            await invalidate(loaded_config.cache_backend, *keys)
+
+        after_commit(self.session, invalidate_access_caches)
+
+    async def get_by_user(self, user_id: str, page: Optional[PageParams] = None):
+        stmt = select(*GRANT_COLUMNS).where(DataSourceAccess.user_id == user_id)
+        return await self._select_grants(stmt, page)
+
+    async def get_by_team(self, team_id: UUID, page: Optional[PageParams] = None):
+        stmt = select(*GRANT_COLUMNS).where(DataSourceAccess.team_id == team_id)
+        return await self._select_grants(stmt, page)
+
+    async def get_by_org(self, org_id: str, page: Optional[PageParams] = None):
+        stmt = select(*GRANT_COLUMNS).where(DataSourceAccess.org_id == org_id)
+        return await self._select_grants(stmt, page)
+
+    async def _select_grants(self, stmt, page: Optional[PageParams]):
+        """
+        Run a column select of grants, which must include access_id: all rows ordered by
+        access_id when page is None, otherwise the keyset page as (rows, next_cursor).
+
+        Rows are plain named tuples, so no ORM entities are built or tracked by the session.
+        """
+        if page is None:
+            result = await self.session.execute(stmt.order_by(DataSourceAccess.access_id))
+            return result.all()
+        result = await self.session.execute(keyset(stmt, DataSourceAccess.access_id, page))
+        return page_of(result.all(), page, lambda access: access.access_id)
+
+    async def get_accessible_datasource_ids(self, user_id: str, org_id: Optional[str] = None):
+        """
+        Get the ids of all datasources a user can access, by category, in a single query.
+
+        Args:
+            user_id (str): The ID of the user
+            org_id (str, optional): The organization of the user
+
+        Returns:
+            list: Distinct (category, datasource_id) rows, category being one of
+                  "personal", "team" or "organization"
+        """
+        personal = select(
+            literal("personal").label("category"), DataSourceAccess.datasource_id
+        ).where(DataSourceAccess.user_id == user_id)
+        team = select(
+            literal("team").label("category"), DataSourceAccess.datasource_id
+        ).join(
+            TeamMemberships, TeamMemberships.team_id == DataSourceAccess.team_id
+        ).where(
+            TeamMemberships.user_id == user_id,
+            TeamMemberships.removed_at.is_(None)
+        )
+        categories = [personal, team]
+        if org_id:
+            categories.append(
+                select(
+                    literal("organization").label("category"), DataSourceAccess.datasource_id
+                ).where(DataSourceAccess.org_id == org_id)
+            )
+
+        result = await self.session.execute(union(*categories))
+        return result.all()
+
+    async def get_accessible_datasources(self, user_id: str, org_id: Optional[str] = None) -> dict:
+        """
+        Get the datasources a user can access, categorized as personal, team and organization.
+
+        The user's personal/team listing and the org listing are cached separately, since org
+        grants change independently of any one user; both are read in one multi-get.
+        """
+        backend = loaded_config.cache_backend
+        user_key = cache_keys.accessible_datasources_by_user(user_id)
+        org_key = cache_keys.accessible_datasources_by_org(org_id) if org_id else None
+
+        cached = {}
+        if backend is not None:
+            try:
+                cached = await backend.get_many([key for key in (user_key, org_key) if key])
+            except Exception as e:
+                logger.warning("Cache read failed", key=user_key, error=str(e))
+        if user_key in cached and (org_key is None or org_key in cached):
+            return {**cached[user_key], "organization": cached[org_key] if org_key else []}
+
+        result = {
+            "personal": [],
+            "team": [],
+            "organization": []
+        }
+        for category, datasource_id in await self.get_accessible_datasource_ids(user_id, org_id):
+            result[category].append(datasource_id)
+
+        if backend is not None:
+            values = {user_key: {"personal": result["personal"], "team": result["team"]}}
+            if org_key:
+                values[org_key] = result["organization"]
+            try:
+                await backend.set_many(values)
+            except Exception as e:
+                logger.warning("Cache write failed", key=user_key, error=str(e))
+        return result
 
     async def get_by_datasource(self, datasource_id):
-        stmt = select(DataSourceAccess).where(DataSourceAccess.datasource_id == datasource_id)
+        stmt = select(*DataSourceAccess.__table__.columns).where(DataSourceAccess.datasource_id == datasource_id)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return [dict(row) for row in result.mappings()]
 
     async def check_access(self, datasource_id, user_id, team_id, org_id) -> bool:
-        stmt = select(DataSourceAccess).where(
-            DataSourceAccess.datasource_id == datasource_id,
-            (DataSourceAccess.user_id == user_id) |
-            (DataSourceAccess.team_id == team_id) |
-            (DataSourceAccess.org_id == org_id)
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().first() is not None
+        """
+        Check whether a user (directly or through any team they are a member of), a team or
+        an organization has access to a datasource.
+        """
+        cached_decision = access_decision_cache.get(datasource_id, user_id, team_id, org_id)
+        if cached_decision is not None:
+            return cached_decision
+
+        # Only match the principals that were provided; comparing against None would render IS NULL
+        access_paths = []
+        if user_id:
+            access_paths.append(exists().where(
+                EffectiveDataSourceAccess.user_id == user_id,
+                EffectiveDataSourceAccess.datasource_id == datasource_id
+            ))
+        principal_filters = []
+        if team_id:
+            principal_filters.append(DataSourceAccess.team_id == team_id)
+        if org_id:
+            principal_filters.append(DataSourceAccess.org_id == org_id)
+        if principal_filters:
+            access_paths.append(exists().where(
+                DataSourceAccess.datasource_id == datasource_id,
+                or_(*principal_filters)
+            ))
+        if not access_paths:
+            return False
+
+        result = await self.session.execute(select(or_(*access_paths)))
+        has_access = bool(result.scalar())
+
+        access_decision_cache.set(datasource_id, user_id, team_id, org_id, has_access)
+        return has_access
+
+    async def check_access_batch(self, items: List[DataSourceAccessSchema]) -> List[bool]:
+        """
+        Check many (datasource, principal) tuples at once.
 
+        Cached decisions are answered in memory; the remaining distinct tuples are sent as
+        parallel arrays, unnested into a derived table and resolved in a single query.
+
+        Args:
+            items: The tuples to check
+
+        Returns:
+            list: One boolean per item, in input order
+        """
+        make_key = access_decision_cache.make_key
+        keys = [make_key(item.datasource_id, item.user_id, item.team_id, item.org_id) for item in items]
+        unique_keys = set(keys)
+        decisions = {}
+        for key in unique_keys:
+            cached_decision = access_decision_cache.get(*key)
+            if cached_decision is not None:
+                decisions[key] = cached_decision
+
+        pending_keys = [key for key in unique_keys if key not in decisions]
+        if pending_keys:
+            requested = func.unnest(
+                literal(list(range(len(pending_keys))), ARRAY(Integer)),
+                literal([key[0] for key in pending_keys], ARRAY(BigInteger)),
+                literal([key[1] for key in pending_keys], ARRAY(String)),
+                literal([UUID(key[2]) if key[2] else None for key in pending_keys], ARRAY(PG_UUID(as_uuid=True))),
+                literal([key[3] for key in pending_keys], ARRAY(String)),
+            ).table_valued("position", "datasource_id", "user_id", "team_id", "org_id").render_derived(name="requested")
+
+            user_has_access = exists().where(
+                EffectiveDataSourceAccess.user_id == requested.c.user_id,
+                EffectiveDataSourceAccess.datasource_id == requested.c.datasource_id
+            )
+            principal_has_access = exists().where(
+                DataSourceAccess.datasource_id == requested.c.datasource_id,
+                or_(
+                    DataSourceAccess.team_id == requested.c.team_id,
+                    DataSourceAccess.org_id == requested.c.org_id,
+                )
+            )
+            stmt = select(requested.c.position, (user_has_access | principal_has_access).label("has_access"))
+            result = await self.session.execute(stmt)
+
+            for position, decision in result.all():
+                key = pending_keys[position]
+                decisions[key] = decision
+                access_decision_cache.set(*key, decision)
+
+        return [decisions[key] for key in keys]
 
     async def get_users_with_access_status(self, datasource_id: int, organization_id: Optional[str] = None):
         """
@@ -96,12 +557,12 @@ class DataSourceAccessDAO:
         Returns:
             dict: User IDs mapped to their access types
         """
-        # Get all access records for this datasource
-        stmt = select(DataSourceAccess).where(
+        # Get the principals of all access records for this datasource
+        stmt = select(*PRINCIPAL_COLUMNS).where(
             DataSourceAccess.datasource_id == datasource_id
         )
         result = await self.session.execute(stmt)
-        access_records = result.scalars().all()
+        access_records = result.all()
 
         # Categorize access
         direct_user_access = [record.user_id for record in access_records if record.user_id is not None]
@@ -146,31 +607,41 @@ class DataSourceAccessDAO:
             query = query.where(DataSourceAccess.org_id == org_id)
 
         await self.session.execute(query)
-        await self.session.commit()
+        await self.effective_access_dao.refresh_grant(datasource_id, user_id, team_id)
+        await self._invalidate_access_caches_on_commit(datasource_id, user_id, team_id, org_id)
 
-    async def get_all_entities_with_access(self, datasource_id: int):
+    async def get_all_entities_with_access(self, datasource_id: int, page: Optional[PageParams] = None):
         """
         Get all entities (users, teams, organizations) that have access to a specific datasource.
 
         Args:
             datasource_id (int): The ID of the datasource
+            page: Keyset page of the datasource's grants to look at; all of them when None
 
         Returns:
             dict: A dictionary containing lists of user_ids, team_ids, and org_ids
-                  with access to the datasource
+                  with access to the datasource, and next_cursor when paginated
         """
-        # Query all access records for this datasource
-        stmt = select(DataSourceAccess).where(DataSourceAccess.datasource_id == datasource_id)
-        result = await self.session.execute(stmt)
-        access_records = result.scalars().all()
+        # Query the principals of the access records for this datasource
+        stmt = select(DataSourceAccess.access_id, *PRINCIPAL_COLUMNS).where(
+            DataSourceAccess.datasource_id == datasource_id
+        )
+        next_cursor = None
+        if page is None:
+            access_records = await self._select_grants(stmt, None)
+        else:
+            access_records, next_cursor = await self._select_grants(stmt, page)
 
         # Extract the entities with access
         user_ids = [record.user_id for record in access_records if record.user_id is not None]
         team_ids = [record.team_id for record in access_records if record.team_id is not None]
         org_ids = [record.org_id for record in access_records if record.org_id is not None]
 
-        return {
+        entities = {
             "user_ids": user_ids,
             "team_ids": team_ids,
             "org_ids": org_ids
-        }
\ No newline at end of file
+        }
+        if page is not None:
+            entities["next_cursor"] = next_cursor
+        return entities
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, BigInteger
+from sqlalchemy import Column, String, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from utils.sqlalchemy import Base, TimestampMixin
@@ -12,3 +12,26 @@ class DataSourceAccess(TimestampMixin, Base):
     user_id = Column(String, nullable=True)
     team_id = Column(UUID(as_uuid=True), nullable=True, index=True)
     org_id = Column(String, nullable=True)
+
+    # One grant per datasource and principal; create_access upserts against these
+    __table_args__ = (
+        Index('uq_datasource_access_datasource_id_user_id', 'datasource_id', 'user_id', unique=True,
+              postgresql_where=text('user_id IS NOT NULL')),
+        Index('uq_datasource_access_datasource_id_team_id', 'datasource_id', 'team_id', unique=True,
+              postgresql_where=text('team_id IS NOT NULL')),
+        Index('uq_datasource_access_datasource_id_org_id', 'datasource_id', 'org_id', unique=True,
+              postgresql_where=text('org_id IS NOT NULL')),
+        # Keyset orderings of the grants of a user, team, org or datasource
+        Index('ix_datasource_access_user_id_access_id', 'user_id', 'access_id'),
+        Index('ix_datasource_access_team_id_access_id', 'team_id', 'access_id'),
+        Index('ix_datasource_access_org_id_access_id', 'org_id', 'access_id'),
+        Index('ix_datasource_access_datasource_id_access_id', 'datasource_id', 'access_id'),
+    )
+
+
+class EffectiveDataSourceAccess(Base):
+    """User -> datasource materialization of direct and team grants, maintained by EffectiveAccessDAO."""
+    __tablename__ = "effective_datasource_access"
+
+    user_id = Column(String, primary_key=True)
+    datasource_id = Column(BigInteger, primary_key=True, index=True)
@@ -1,14 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from RBAC.datasources.views import (
-    check_access, create_access, delete_access, get_all_accessible_sources, get_datasource_share_details,
-    get_team_access, get_org_access, revoke_datasource_access, get_full_datasource_access_details
+    check_access, check_access_batch, get_access_cache_stats, create_access, delete_access, get_all_accessible_sources, get_datasource_share_details,
+    get_team_access, get_org_access, revoke_datasource_access, get_full_datasource_access_details,
+    bulk_create_access, bulk_delete_access
 )
+from utils.common import get_user_data_from_request
 
-router = APIRouter(prefix="/datasources", tags=["DataSources"])
+# Grants and checks act on any principal, so every route needs a signed-in caller
+router = APIRouter(prefix="/datasources", tags=["DataSources"], dependencies=[Depends(get_user_data_from_request)])
+# Operational routes, only mounted on the internal server
+internal_router = APIRouter(prefix="/datasources", tags=["DataSources"])
 
 router.add_api_route("/access", endpoint=create_access, methods=["POST"], description="Assign access to a datasource (user/team/org)")
 router.add_api_route("/access", endpoint=delete_access, methods=["DELETE"], description="Revoke access to a datasource")
+router.add_api_route("/access/bulk", endpoint=bulk_create_access, methods=["POST"], description="Grant access for the cross product of datasources and principals, or an explicit list")
+router.add_api_route("/access/bulk/revoke", endpoint=bulk_delete_access, methods=["POST"], description="Revoke access for the cross product of datasources and principals, or an explicit list")
 router.add_api_route("/check/access", endpoint=check_access, methods=["POST"], description="Check the datasource access")
+router.add_api_route("/check/access/batch", endpoint=check_access_batch, methods=["POST"], description="Check many (datasource, principal) tuples in one call")
+internal_router.add_api_route("/check/access/cache", endpoint=get_access_cache_stats, methods=["GET"], description="Hit/miss/eviction counters of the access decision cache")
 router.add_api_route("/access/datasource/{datasource_id}", endpoint=get_full_datasource_access_details, methods=["GET"], description="Get all accesses for a datasource")
 router.add_api_route("/access", endpoint=get_all_accessible_sources, methods=["GET"], description="Get all accessible datasources")
 router.add_api_route("/specific/access", endpoint=revoke_datasource_access, methods=["POST"], description="Revoke specific accesses")
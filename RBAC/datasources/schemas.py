@@ -1,9 +1,11 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator, model_validator
 from datetime import datetime
 
+from config.settings import loaded_config
+
 
 class DataSourceSchema(BaseModel):
     type: str = Field(..., description="Type of data source (e.g., 'quip', 'github')")
@@ -39,6 +41,73 @@ class DataSourceAccessSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Validates a whole list of grant rows in one pydantic-core call
+DATASOURCE_ACCESS_LIST = TypeAdapter(List[DataSourceAccessSchema])
+
+
+class BatchCheckAccessSchema(BaseModel):
+    items: List[DataSourceAccessSchema] = Field(..., description="(datasource, principal) tuples to check")
+
+    @field_validator('items')
+    def validate_batch_size(cls, v):
+        if len(v) > loaded_config.check_access_batch_limit:
+            raise ValueError(f"At most {loaded_config.check_access_batch_limit} items can be checked per request")
+        return v
+
+
+class AccessPrincipalSchema(BaseModel):
+    user_id: Optional[str] = None
+    team_id: Optional[UUID] = None
+    org_id: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_single_principal(self):
+        if sum(principal is not None for principal in (self.user_id, self.team_id, self.org_id)) != 1:
+            raise ValueError("Exactly one of user_id, team_id, or org_id must be provided")
+        return self
+
+
+class BulkAccessSchema(BaseModel):
+    datasource_ids: List[int] = Field(default_factory=list, description="Datasources of the cross product")
+    principals: List[AccessPrincipalSchema] = Field(default_factory=list, description="Principals of the cross product")
+    grants: List[DataSourceAccessSchema] = Field(
+        default_factory=list, description="Explicit (datasource, principal) pairs, in addition to the cross product"
+    )
+
+    @field_validator('grants')
+    def validate_grants(cls, v):
+        for grant in v:
+            AccessPrincipalSchema(user_id=grant.user_id, team_id=grant.team_id, org_id=grant.org_id)
+        return v
+
+    @model_validator(mode='after')
+    def validate_size(self):
+        size = len(self.datasource_ids) * len(self.principals) + len(self.grants)
+        if size > loaded_config.bulk_access_limit:
+            raise ValueError(f"At most {loaded_config.bulk_access_limit} grants can be changed per request")
+        return self
+
+    def expand(self) -> List[DataSourceAccessSchema]:
+        """The distinct (datasource, principal) pairs of the cross product and the explicit list."""
+        pairs = [
+            DataSourceAccessSchema(datasource_id=datasource_id, **principal.model_dump())
+            for datasource_id in self.datasource_ids
+            for principal in self.principals
+        ]
+        pairs.extend(self.grants)
+        unique_pairs = {}
+        for pair in pairs:
+            unique_pairs.setdefault((pair.datasource_id, pair.user_id, pair.team_id, pair.org_id), pair)
+        return list(unique_pairs.values())
+
+
+class BulkAccessResult(BaseModel):
+    requested: int = Field(0, description="Distinct (datasource, principal) pairs in the request")
+    changed: int = Field(0, description="Grants created or deleted")
+    unchanged: int = Field(0, description="Pairs that already were granted, or had no grant to revoke")
+    chunks: int = Field(0, description="Transactions committed")
+
+
 class DataSourceAccessResponseSchema(DataSourceAccessSchema):
     model_config = ConfigDict(from_attributes=True)
 
@@ -47,4 +116,15 @@ class RevokeAccessSchema(BaseModel):
     datasource_id: int
     user_id: Optional[str] = None
     team_id: Optional[UUID] = None
-    org_id: Optional[str] = None
\ No newline at end of file
+    org_id: Optional[str] = None
+
+
+class ShareDetailsQueryParams(BaseModel):
+    limit: Optional[int] = Field(None, description="Page size of the users section; all members when omitted", ge=1)
+    offset: Optional[int] = Field(0, description="Number of org members to skip", ge=0)
+
+    @field_validator('limit')
+    def validate_limit(cls, v):
+        if v is not None and v > loaded_config.clerk_org_members_page_size:
+            return loaded_config.clerk_org_members_page_size
+        return v
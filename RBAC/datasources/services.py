@@ -1,30 +1,62 @@
-from collections import defaultdict
+import asyncio
+from functools import cached_property
+from typing import List, Optional
 
 from clerk_integration.helpers import ClerkHelper
 from clerk_integration.utils import UserData
+from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
 from RBAC.datasources.dao import DataSourceAccessDAO
 from RBAC.datasources.exceptions import DataSourceAccessError
-from RBAC.datasources.schemas import DataSourceAccessSchema
+from RBAC.datasources.schemas import DataSourceAccessSchema, BulkAccessSchema, BulkAccessResult, \
+    DATASOURCE_ACCESS_LIST
 from RBAC.datasources.models import DataSourceAccess
 from RBAC.teams.dao import TeamMembershipsDAO, TeamsDAO
 from RBAC.teams.exceptions import TeamError
 from config.logging import logger
 from config.settings import loaded_config
 from utils.connection_handler import ConnectionHandler
+from utils.metrics import observe_clerk_call
+from utils.pagination import PageParams
+from utils.tracing import traced
 
 
+@traced
 class DataSourceAccessService:
     def __init__(self, connection_handler: ConnectionHandler):
-        self.session = connection_handler.session
-        self.dao = DataSourceAccessDAO(self.session)
-        self.team_membership_dao = TeamMembershipsDAO(self.session)
+        self.connection_handler = connection_handler
         self.clerk_client = ClerkHelper(loaded_config.clerk_secret_key)
-        self.teams_dao = TeamsDAO(self.session)
+
+    @property
+    def session(self):
+        return self.connection_handler.session
+
+    @cached_property
+    def dao(self) -> DataSourceAccessDAO:
+        return DataSourceAccessDAO(self.session)
+
+    @cached_property
+    def team_membership_dao(self) -> TeamMembershipsDAO:
+        return TeamMembershipsDAO(self.session)
+
+    @cached_property
+    def teams_dao(self) -> TeamsDAO:
+        return TeamsDAO(self.session)
+
+    @property
+    def read_dao(self) -> DataSourceAccessDAO:
+        """DAO on the handler's read session (a replica when one is fresh enough), for calls that never write."""
+        return DataSourceAccessDAO(self.connection_handler.read_session)
 
     async def create_access(self, data: DataSourceAccessSchema) -> DataSourceAccess:
+        provided_ids = [data.user_id, data.team_id, data.org_id]
+        if sum(selected_id is not None for selected_id in provided_ids) != 1:
+            raise DataSourceAccessError("Exactly one of user_id, team_id, or org_id must be provided")
+
         try:
-            return await self.dao.create_access(data)
+            access = await self.dao.create_access(data)
+            await self.connection_handler.session_commit()
+            return access
         except SQLAlchemyError as e:
             await self.session.rollback()
             logger.error("DB error creating datasource access: %s", str(e))
@@ -33,28 +65,87 @@ class DataSourceAccessService:
     async def delete_access(self, datasource_id):
         try:
             await self.dao.delete_access(datasource_id)
+            await self.connection_handler.session_commit()
         except SQLAlchemyError as e:
             await self.session.rollback()
             logger.error("DB error deleting datasource access: %s", str(e))
             raise TeamError("Failed to delete datasource access")
 
-    async def get_access_by_user(self, user_id):
-        results = await self.dao.get_by_user(user_id)
-        return [DataSourceAccessSchema.model_validate(result) for result in results]
+    async def bulk_create_access(self, data: BulkAccessSchema) -> BulkAccessResult:
+        """Grant every pair of the request, committing one transaction per chunk."""
+        return await self._bulk_change_access(data, self.dao.bulk_create_access, "grant")
 
-    async def get_access_by_team(self, team_id):
-        results = await self.dao.get_by_team(team_id)
-        return [DataSourceAccessSchema.model_validate(result) for result in results]
+    async def bulk_delete_access(self, data: BulkAccessSchema) -> BulkAccessResult:
+        """Revoke every pair of the request, committing one transaction per chunk."""
+        return await self._bulk_change_access(data, self.dao.bulk_delete_access, "revoke")
 
-    async def get_access_by_org(self, org_id):
-        results = await self.dao.get_by_org(org_id)
-        return [DataSourceAccessSchema.model_validate(result) for result in results]
+    async def _bulk_change_access(self, data: BulkAccessSchema, change_chunk, action: str) -> BulkAccessResult:
+        """
+        Apply change_chunk to the request's pairs in chunks of bulk_write_chunk_size, each in its
+        own transaction, so a large share does not hold one long transaction and its locks.
+        Chunks committed before a failure stay committed; the error reports how far it got.
+        """
+        grants = data.expand()
+        result = BulkAccessResult(requested=len(grants))
+        chunk_size = loaded_config.bulk_write_chunk_size
+        for start in range(0, len(grants), chunk_size):
+            chunk = grants[start:start + chunk_size]
+            try:
+                changed = await change_chunk(chunk)
+                await self.connection_handler.session_commit()
+            except SQLAlchemyError as e:
+                await self.session.rollback()
+                logger.error(f"DB error in bulk datasource access {action}: {str(e)}")
+                raise DataSourceAccessError(
+                    f"Failed to {action} datasource access",
+                    detail=f"{result.chunks} chunk(s) with {start} pair(s) were committed before the failure, "
+                           f"{result.changed} of them changed"
+                )
+            result.chunks += 1
+            result.changed += changed
+            result.unchanged += len(chunk) - changed
+        return result
+
+    async def get_access_by_user(self, user_id, page: PageParams):
+        return self._grants_response(await self.dao.get_by_user(user_id, self._page_or_none(page)))
+
+    async def get_access_by_team(self, team_id, page: PageParams):
+        return self._grants_response(await self.dao.get_by_team(team_id, self._page_or_none(page)))
+
+    async def get_access_by_org(self, org_id, page: PageParams):
+        return self._grants_response(await self.dao.get_by_org(org_id, self._page_or_none(page)))
+
+    @staticmethod
+    def _page_or_none(page: Optional[PageParams]) -> Optional[PageParams]:
+        return page if page is not None and page.paginated else None
+
+    @staticmethod
+    def _grants_response(results):
+        """Serialize the grants of a DAO list call: a page dict for (grants, next_cursor), else a list."""
+        if isinstance(results, tuple):
+            grants, next_cursor = results
+            return {
+                "items": DATASOURCE_ACCESS_LIST.validate_python(grants, from_attributes=True),
+                "next_cursor": next_cursor
+            }
+        return DATASOURCE_ACCESS_LIST.validate_python(results, from_attributes=True)
 
     async def get_access_by_datasource(self, datasource_id):
         return await self.dao.get_by_datasource(datasource_id)
 
     async def check_access(self, datasource_id, user_id, team_id, org_id) -> bool:
-        return await self.dao.check_access(datasource_id, user_id, team_id, org_id)
+        return await self.read_dao.check_access(datasource_id, user_id, team_id, org_id)
+
+    async def check_access_batch(self, items: List[DataSourceAccessSchema]) -> List[bool]:
+        if not items:
+            return []
+        dao = self.read_dao
+        try:
+            return await dao.check_access_batch(items)
+        except SQLAlchemyError as e:
+            await dao.session.rollback()
+            logger.error("DB error checking datasource access in batch: %s", str(e))
+            raise DataSourceAccessError("Failed to check datasource access")
 
     async def get_accessible_datasources_by_user(self, user_id, org_id=None):
         """
@@ -76,112 +167,135 @@ class DataSourceAccessService:
                     "organization": [datasource_ids]
                 }
         """
+        dao = self.read_dao
         try:
-            result = {
-                "personal": [],
-                "team": [],
-                "organization": []
-            }
-
-            # Get datasources directly accessible by the user
-            user_datasources = await self.dao.get_by_user(user_id)
-            result["personal"] = [access.datasource_id for access in user_datasources]
-
-            user_teams = await self.team_membership_dao.get_teams_by_user(user_id)
-
-            # Get datasources accessible by user's teams
-            team_ids = [team.team_id for team in user_teams]
-            for team_id in team_ids:
-                team_access = await self.dao.get_by_team(team_id)
-                team_datasource_ids = [access.datasource_id for access in team_access]
-                result["team"].extend(team_datasource_ids)
-
-            # Remove duplicates in team datasources
-            result["team"] = list(set(result["team"]))
-
-            # Get datasources accessible by user's organization (if org_id provided)
-            if org_id:
-                org_datasources = await self.dao.get_by_org(org_id)
-                result["organization"] = [access.datasource_id for access in org_datasources]
-
-            return result
-
+            return await dao.get_accessible_datasources(user_id, org_id)
         except SQLAlchemyError as e:
-            await self.session.rollback()
+            await dao.session.rollback()
             logger.error("DB error retrieving accessible datasources: %s", str(e))
             raise DataSourceAccessError("Failed to retrieve accessible datasources")
 
-    async def get_user_access_status_for_datasource(self, datasource_id: int, user_data: UserData):
-        try:
-            if not user_data.orgId:
-                return []
-
-            org_members_response = await self.clerk_client.get_org_members(user_data.orgId, limit=100)
-            org_members = org_members_response.get("members", [])
-
-            access_info = await self.dao.get_users_with_access_status(datasource_id, user_data.orgId)
-            all_org_teams = await self.teams_dao.get_teams_by_org(user_data.orgId, user_data.userId)
+    async def _get_org_members(self, org_id: str, limit: Optional[int] = None, offset: int = 0):
+        """
+        Fetch org members from Clerk.
 
-            team_ids_with_access = access_info["team_access"]
+        With a limit, only that page is fetched. Without one, every member is fetched by
+        requesting pages concurrently, a window of pages at a time, until a short page is seen.
 
-            orgs_with_access = access_info["org_access"]
-            org_has_access = user_data.orgId in orgs_with_access
+        Returns:
+            tuple: (members, total_count or None if Clerk did not report it)
+        """
+        page_size = loaded_config.clerk_org_members_page_size
+        if limit is not None:
+            response = await self._get_org_members_page(org_id, limit, offset)
+            return response.get("members", []), response.get("total_count")
+
+        members = []
+        window_start = offset
+        while True:
+            window_offsets = [
+                window_start + page_size * page_number
+                for page_number in range(loaded_config.clerk_org_members_concurrency)
+            ]
+            responses = await asyncio.gather(*(
+                self._get_org_members_page(org_id, page_size, page_offset)
+                for page_offset in window_offsets
+            ))
+            pages = [response.get("members", []) for response in responses]
+            for page in pages:
+                members.extend(page)
+            if any(len(page) < page_size for page in pages):
+                return members, offset + len(members)
+            window_start = window_offsets[-1] + page_size
+
+    async def _get_org_members_page(self, org_id: str, limit: int, offset: int):
+        async with observe_clerk_call("get_org_members"):
+            return await self.clerk_client.get_org_members(org_id, None, limit, offset)
+
+    async def _get_datasource_share_state(self, datasource_id: int, user_data: UserData):
+        access_info = await self.dao.get_users_with_access_status(datasource_id, user_data.orgId)
+        visible_teams = await self.teams_dao.get_teams_by_org(user_data.orgId, user_data.userId)
+
+        team_ids_with_access = set(access_info["team_access"])
+        visible_teams_with_access = [
+            team["team_id"] for team in visible_teams if team["team_id"] in team_ids_with_access
+        ]
+        # One grouped query for every membership edge into the visible teams that have access
+        team_ids_by_member = await self.team_membership_dao.get_team_ids_by_member(visible_teams_with_access)
+        # Hand the connection back while the Clerk paging running alongside finishes
+        await self.connection_handler.release()
+        return access_info, visible_teams, team_ids_with_access, team_ids_by_member
+
+    async def get_user_access_status_for_datasource(
+        self,
+        datasource_id: int,
+        user_data: UserData,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ):
+        """
+        Get the share state of a datasource for every member and team visible to the user.
 
-            direct_user_access = access_info["direct_user_access"]
+        Args:
+            datasource_id: The ID of the datasource
+            user_data: The requesting user
+            limit: Optional page size for the "users" section; all members are returned without it
+            offset: Offset of the "users" page
 
-            user_team_membership = defaultdict(list)
+        Returns:
+            dict: "users", "teams" and "org" sections, plus "users_pagination"
+        """
+        try:
+            if not user_data.orgId:
+                return []
 
-            for team in all_org_teams:
-                team_id = team["team_id"]
-                team_members = await self.team_membership_dao.get_members(team_id, from_clerk=False)
+            # Clerk paging and the DB reads do not depend on each other, so overlap them
+            (org_members, total_members), share_state = await asyncio.gather(
+                self._get_org_members(user_data.orgId, limit, offset),
+                self._get_datasource_share_state(datasource_id, user_data),
+            )
+            access_info, visible_teams, team_ids_with_access, team_ids_by_member = share_state
 
-                for member in team_members:
-                    user_team_membership[member["user_id"]].append(str(team_id))
+            org_has_access = user_data.orgId in access_info["org_access"]
+            direct_user_access = set(access_info["direct_user_access"])
 
             users_result = []
             for user in org_members:
                 user_id = user["id"]
-
-                user_teams = user_team_membership.get(user_id, [])
-
-                has_direct_access = user_id in direct_user_access
-
-                has_team_access = any(team_id in team_ids_with_access for team_id in user_teams)
-
-                user_access_data = {
+                users_result.append({
                     "user_id": user_id,
                     "firstName": user.get("firstName"),
                     "lastName": user.get("lastName"),
                     "role": user.get("role"),
-                    "has_access": has_direct_access,
-                    "team_access": has_team_access,
+                    "has_access": user_id in direct_user_access,
+                    "team_access": user_id in team_ids_by_member,
                     "org_access": org_has_access
-                }
-
-                users_result.append(user_access_data)
+                })
 
-            teams_result = []
-            for team in all_org_teams:
-                team_id = team["team_id"]
-                team_data = {
-                    "team_id": str(team_id),
+            teams_result = [
+                {
+                    "team_id": str(team["team_id"]),
                     "team_name": team["name"],
-                    "has_access": team_id in team_ids_with_access
+                    "has_access": team["team_id"] in team_ids_with_access
                 }
-                teams_result.append(team_data)
+                for team in visible_teams
+            ]
 
             org_result = {
                 "org_id": user_data.orgId,
                 "has_access": org_has_access
             }
 
-            result = {
+            return {
                 "users": users_result,
+                "users_pagination": {
+                    "offset": offset,
+                    "limit": limit,
+                    "total": total_members
+                },
                 "teams": teams_result,
                 "org": org_result
             }
-
-            return result
         except Exception as e:
             logger.error(f"Error getting user access status: {e}")
             return []
@@ -208,15 +322,16 @@ class DataSourceAccessService:
 
         try:
             await self.dao.delete_specific_access(datasource_id, user_id, team_id, org_id)
+            await self.connection_handler.session_commit()
         except (SQLAlchemyError, Exception) as e:
             await self.session.rollback()
             logger.error(f"DB error revoking specific datasource access: {str(e)}")
             raise DataSourceAccessError("Failed to revoke specific datasource access")
 
-    async def get_all_entities_with_access_details(self, datasource_id: int):
+    async def get_all_entities_with_access_details(self, datasource_id: int, page: Optional[PageParams] = None):
         try:
             # Get all entity IDs with access
-            entities = await self.dao.get_all_entities_with_access(datasource_id)
+            entities = await self.dao.get_all_entities_with_access(datasource_id, self._page_or_none(page))
 
             # Get detailed information for each entity
 
@@ -247,13 +362,18 @@ class DataSourceAccessService:
                     logger.warning(f"Error fetching org details for {org_id}: {e}")
                     orgs_details.append(org_id)
 
-            return {
+            details = {
                 "datasource_id": datasource_id,
                 "users": users_details,
                 "teams": teams_details,
                 "organizations": orgs_details
             }
+            if "next_cursor" in entities:
+                details["next_cursor"] = entities["next_cursor"]
+            return details
 
+        except HTTPException:
+            raise
         except SQLAlchemyError as e:
             await self.session.rollback()
             logger.error(f"DB error retrieving datasource access details: {str(e)}")
@@ -4,11 +4,14 @@ from uuid import UUID
 from clerk_integration.utils import UserData
 from fastapi import Depends
 
+from RBAC.datasources.cache import access_decision_cache
 from RBAC.datasources.exceptions import DataSourceAccessError
 from utils.connection_handler import ConnectionHandler, get_connection_handler_for_app
+from utils.pagination import PageParams
 from utils.serializers import ResponseData
 from utils.common import handle_exceptions, get_user_data_from_request
-from RBAC.datasources.schemas import DataSourceAccessSchema, RevokeAccessSchema
+from RBAC.datasources.schemas import DataSourceAccessSchema, RevokeAccessSchema, BatchCheckAccessSchema, \
+    ShareDetailsQueryParams, BulkAccessSchema
 from RBAC.datasources.services import DataSourceAccessService
 
 
@@ -34,33 +37,56 @@ async def delete_access(
 
 
 
+@handle_exceptions("Failed to grant access", [DataSourceAccessError])
+async def bulk_create_access(
+    data: BulkAccessSchema,
+    connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    service = DataSourceAccessService(connection_handler)
+    result = await service.bulk_create_access(data)
+    return ResponseData.model_construct(success=True, message="Successfully granted access!", data=result)
+
+
+@handle_exceptions("Failed to revoke access", [DataSourceAccessError])
+async def bulk_delete_access(
+    data: BulkAccessSchema,
+    connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    service = DataSourceAccessService(connection_handler)
+    result = await service.bulk_delete_access(data)
+    return ResponseData.model_construct(success=True, message="Successfully revoked access!", data=result)
+
+
 @handle_exceptions("Failed to get user access", [DataSourceAccessError])
 async def get_user_access(
     user_id: str,
+    page: PageParams = Depends(),
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = DataSourceAccessService(connection_handler)
-    data = await service.get_access_by_user(user_id)
+    data = await service.get_access_by_user(user_id, page)
     return ResponseData.model_construct(success=True, data=data)
 
 
 @handle_exceptions("Failed to get team access", [DataSourceAccessError])
 async def get_team_access(
     team_id: UUID,
+    page: PageParams = Depends(),
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = DataSourceAccessService(connection_handler)
-    data = await service.get_access_by_team(team_id)
+    data = await service.get_access_by_team(team_id, page)
     return ResponseData.model_construct(success=True, data=data)
 
 
 @handle_exceptions("Failed to get org access", [DataSourceAccessError])
 async def get_org_access(
     org_id: str,
+    page: PageParams = Depends(),
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = DataSourceAccessService(connection_handler)
-    data = await service.get_access_by_org(org_id)
+    data = await service.get_access_by_org(org_id, page)
     return ResponseData.model_construct(success=True, data=data)
 
 
@@ -90,6 +116,25 @@ async def check_access(
     return ResponseData.model_construct(success=True, data={"access": has_access})
 
 
+@handle_exceptions("Failed to check access", [DataSourceAccessError])
+async def check_access_batch(
+    data: BatchCheckAccessSchema,
+    connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    service = DataSourceAccessService(connection_handler)
+    decisions = await service.check_access_batch(data.items)
+    results = [
+        {**item.model_dump(), "access": has_access}
+        for item, has_access in zip(data.items, decisions)
+    ]
+    return ResponseData.model_construct(success=True, data=results)
+
+
+@handle_exceptions("Failed to get access cache stats", [DataSourceAccessError])
+async def get_access_cache_stats():
+    return ResponseData.model_construct(success=True, data=access_decision_cache.stats())
+
+
 @handle_exceptions("Failed to check access", [DataSourceAccessError])
 async def get_all_accessible_sources(
     user_id: str,
@@ -104,11 +149,17 @@ async def get_all_accessible_sources(
 @handle_exceptions("Failed to get datasource share details", [DataSourceAccessError])
 async def get_datasource_share_details(
         datasource_id: int,
+        query_params: ShareDetailsQueryParams = Depends(),
         user_data: UserData = Depends(get_user_data_from_request),
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = DataSourceAccessService(connection_handler)
-    data = await service.get_user_access_status_for_datasource(datasource_id, user_data)
+    data = await service.get_user_access_status_for_datasource(
+        datasource_id,
+        user_data,
+        query_params.limit,
+        query_params.offset
+    )
     return ResponseData.model_construct(
         success=True,
         data=data,
@@ -136,10 +187,11 @@ async def revoke_datasource_access(
 @handle_exceptions("Failed to get datasource access details", [DataSourceAccessError])
 async def get_full_datasource_access_details(
         datasource_id: int,
+        page: PageParams = Depends(),
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = DataSourceAccessService(connection_handler)
-    access_data = await service.get_all_entities_with_access_details(datasource_id)
+    access_data = await service.get_all_entities_with_access_details(datasource_id, page)
 
     return ResponseData.model_construct(
         success=True,
@@ -0,0 +1,307 @@
+import csv
+import gzip
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel, Field
+from sqlalchemy import String, column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from RBAC.datasources.dao import EffectiveAccessDAO
+from config.logging import logger
+from config.settings import loaded_config
+from utils.tracing import traced
+
+
+class BundleImportError(Exception):
+    """The bundle is malformed or fails referential integrity; nothing was imported."""
+
+
+def _uuid(value):
+    return UUID(str(value)) if value not in (None, "") else None
+
+
+def _int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _text(value):
+    return str(value) if value not in (None, "") else None
+
+
+def _timestamp(value):
+    if value in (None, ""):
+        return None
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _json(value):
+    if value in (None, ""):
+        return None
+    return value if isinstance(value, str) else orjson.dumps(value).decode()
+
+
+# Staging table and typed columns of each record type of a bundle, in COPY column order
+STAGING_TABLES: Dict[str, Tuple[str, List[Tuple[str, str, object]]]] = {
+    "role": ("import_roles", [
+        ("role_id", "uuid", _uuid),
+        ("role_slug", "text", _text),
+    ]),
+    "team": ("import_teams", [
+        ("team_id", "uuid", _uuid),
+        ("org_id", "text", _text),
+        ("team_slug", "text", _text),
+        ("description", "text", _text),
+        ("name", "text", _text),
+        ("created_by", "text", _text),
+        ("created_at", "timestamptz", _timestamp),
+        ("updated_at", "timestamptz", _timestamp),
+    ]),
+    "membership": ("import_memberships", [
+        ("membership_id", "uuid", _uuid),
+        ("team_id", "uuid", _uuid),
+        ("user_id", "text", _text),
+        ("role_id", "uuid", _uuid),
+        ("role_slug", "text", _text),
+        ("removed_at", "bigint", _int),
+        ("meta_data", "jsonb", _json),
+        ("created_at", "timestamptz", _timestamp),
+        ("updated_at", "timestamptz", _timestamp),
+    ]),
+    "grant": ("import_grants", [
+        ("access_id", "uuid", _uuid),
+        ("datasource_id", "bigint", _int),
+        ("user_id", "text", _text),
+        ("team_id", "uuid", _uuid),
+        ("org_id", "text", _text),
+        ("created_at", "timestamptz", _timestamp),
+        ("updated_at", "timestamptz", _timestamp),
+    ]),
+}
+
+# CSV bundles are a directory with one file per record type
+CSV_FILES = {"role": "roles.csv", "team": "teams.csv", "membership": "memberships.csv", "grant": "grants.csv"}
+
+# Each check counts the staged rows violating one rule; any violation aborts the import
+INTEGRITY_CHECKS = {
+    "memberships of unknown teams": """
+        SELECT count(*) FROM import_memberships m
+        WHERE NOT EXISTS (SELECT 1 FROM import_teams t WHERE t.team_id = m.team_id)
+          AND NOT EXISTS (SELECT 1 FROM teams t WHERE t.team_id = m.team_id)
+    """,
+    "memberships with unknown roles": """
+        SELECT count(*) FROM import_memberships m
+        WHERE m.resolved_role_id IS NULL
+    """,
+    "memberships without user_id": """
+        SELECT count(*) FROM import_memberships WHERE user_id IS NULL OR membership_id IS NULL
+    """,
+    "grants to unknown teams": """
+        SELECT count(*) FROM import_grants g
+        WHERE g.team_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM import_teams t WHERE t.team_id = g.team_id)
+          AND NOT EXISTS (SELECT 1 FROM teams t WHERE t.team_id = g.team_id)
+    """,
+    "grants without exactly one principal": """
+        SELECT count(*) FROM import_grants
+        WHERE num_nonnulls(user_id, team_id, org_id) <> 1 OR datasource_id IS NULL OR access_id IS NULL
+    """,
+    "teams without id, org, name or creator": """
+        SELECT count(*) FROM import_teams
+        WHERE team_id IS NULL OR org_id IS NULL OR name IS NULL OR created_by IS NULL
+    """,
+    "teams whose slug belongs to another team": """
+        SELECT count(*) FROM import_teams i
+        WHERE EXISTS (SELECT 1 FROM teams t WHERE t.team_slug = i.team_slug AND t.team_id <> i.team_id)
+           OR EXISTS (SELECT 1 FROM import_teams o WHERE o.team_slug = i.team_slug AND o.team_id <> i.team_id)
+    """,
+}
+
+
+class ImportResult(BaseModel):
+    staged: Dict[str, int] = Field(default_factory=dict, description="Rows read from the bundle, by record type")
+    merged: Dict[str, int] = Field(default_factory=dict, description="Rows inserted or updated, by target table")
+    seconds: float = Field(0, description="Wall time of the import")
+    rows_per_second: float = Field(0, description="Staged rows per second of wall time")
+
+
+def read_bundle(path: str) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (record type, fields) from a bundle: an NDJSON file as written by the org export
+    (optionally gzipped), or a directory of CSV files named as in CSV_FILES.
+    """
+    if os.path.isdir(path):
+        for record_type, filename in CSV_FILES.items():
+            csv_path = os.path.join(path, filename)
+            if not os.path.exists(csv_path):
+                continue
+            with open(csv_path, newline="") as csv_file:
+                for row in csv.DictReader(csv_file):
+                    yield record_type, row
+        return
+
+    open_bundle = gzip.open if path.endswith(".gz") else open
+    with open_bundle(path, "rb") as bundle:
+        for line_number, line in enumerate(bundle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+                yield record["type"], record["data"]
+            except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                raise BundleImportError(f"Line {line_number} is not a bundle record: {e}") from e
+
+
+@traced
+class BundleImporter:
+    """
+    Loads a bundle of teams, memberships and datasource grants in one transaction.
+
+    Records are streamed into temporary staging tables with COPY (asyncpg
+    copy_records_to_table) in batches of import_batch_size, checked for referential integrity
+    in SQL, then merged into teams, team_memberships and datasource_access. Rows that already
+    exist are updated (teams) or kept (memberships and grants), so restoring a bundle twice is
+    harmless. Membership roles are matched by role_id, or by slug when the ids differ between
+    environments.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int = None):
+        self.session = session
+        self.batch_size = batch_size or loaded_config.import_batch_size
+
+    async def run(self, records: Iterator[Tuple[str, dict]]) -> ImportResult:
+        started_at = time.perf_counter()
+        result = ImportResult()
+        async with self.session.begin():
+            driver_connection = await self._driver_connection()
+            await self._create_staging_tables()
+            result.staged = await self._stage(driver_connection, records)
+            staged_at = time.perf_counter()
+            logger.info(f"Staged {sum(result.staged.values())} bundle rows in {staged_at - started_at:.3f}s")
+            await self._resolve_roles()
+            await self._check_integrity()
+            result.merged = await self._merge()
+            await self._refresh_effective_access()
+
+        result.seconds = time.perf_counter() - started_at
+        result.rows_per_second = sum(result.staged.values()) / result.seconds if result.seconds else 0
+        logger.info(f"Imported bundle: {result.model_dump()}")
+        return result
+
+    async def _driver_connection(self):
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    async def _create_staging_tables(self):
+        for table_name, columns in STAGING_TABLES.values():
+            column_definitions = ", ".join(f"{name} {sql_type}" for name, sql_type, _ in columns)
+            await self.session.execute(
+                text(f"CREATE TEMPORARY TABLE {table_name} ({column_definitions}) ON COMMIT DROP")
+            )
+        await self.session.execute(text("ALTER TABLE import_memberships ADD COLUMN resolved_role_id uuid"))
+
+    async def _stage(self, driver_connection, records) -> Dict[str, int]:
+        staged = {record_type: 0 for record_type in STAGING_TABLES}
+        batches = {record_type: [] for record_type in STAGING_TABLES}
+
+        async def flush(record_type):
+            table_name, columns = STAGING_TABLES[record_type]
+            await driver_connection.copy_records_to_table(
+                table_name, records=batches[record_type], columns=[name for name, _, _ in columns]
+            )
+            staged[record_type] += len(batches[record_type])
+            batches[record_type] = []
+
+        for record_type, fields in records:
+            if record_type not in STAGING_TABLES:
+                raise BundleImportError(f"Unknown record type {record_type}")
+            _, columns = STAGING_TABLES[record_type]
+            try:
+                row = tuple(convert(fields.get(name)) for name, _, convert in columns)
+            except (TypeError, ValueError) as e:
+                raise BundleImportError(f"Invalid {record_type} record {fields}: {e}") from e
+            batches[record_type].append(row)
+            if len(batches[record_type]) >= self.batch_size:
+                await flush(record_type)
+
+        for record_type in STAGING_TABLES:
+            if batches[record_type]:
+                await flush(record_type)
+        return staged
+
+    async def _resolve_roles(self):
+        # By id when the role exists here, else by the slug given inline or in the bundle's roles
+        await self.session.execute(text("""
+            UPDATE import_memberships m
+            SET resolved_role_id = COALESCE(
+                (SELECT r.role_id FROM team_roles r WHERE r.role_id = m.role_id),
+                (SELECT r.role_id FROM team_roles r WHERE r.role_slug = m.role_slug),
+                (SELECT r.role_id FROM team_roles r JOIN import_roles ir ON ir.role_slug = r.role_slug
+                 WHERE ir.role_id = m.role_id LIMIT 1)
+            )
+        """))
+
+    async def _check_integrity(self):
+        violations = {}
+        for rule, query in INTEGRITY_CHECKS.items():
+            count = await self.session.scalar(text(query))
+            if count:
+                violations[rule] = count
+        if violations:
+            raise BundleImportError(
+                "Bundle failed integrity checks: "
+                + ", ".join(f"{count} {rule}" for rule, count in violations.items())
+            )
+
+    async def _merge(self) -> Dict[str, int]:
+        merged = {}
+        result = await self.session.execute(text("""
+            INSERT INTO teams (team_id, org_id, team_slug, description, name, created_by, created_at, updated_at)
+            SELECT DISTINCT ON (team_id) team_id, org_id, team_slug, description, name, created_by,
+                   COALESCE(created_at, now()), COALESCE(updated_at, now())
+            FROM import_teams
+            ORDER BY team_id, updated_at DESC NULLS LAST
+            ON CONFLICT (team_id) DO UPDATE SET
+                org_id = excluded.org_id,
+                team_slug = excluded.team_slug,
+                description = excluded.description,
+                name = excluded.name,
+                updated_at = excluded.updated_at
+        """))
+        merged["teams"] = result.rowcount
+
+        result = await self.session.execute(text("""
+            INSERT INTO team_memberships
+                (membership_id, team_id, user_id, role_id, removed_at, meta_data, created_at, updated_at)
+            SELECT membership_id, team_id, user_id, resolved_role_id, removed_at, COALESCE(meta_data, '{}'::jsonb),
+                   COALESCE(created_at, now()), COALESCE(updated_at, now())
+            FROM import_memberships
+            ON CONFLICT DO NOTHING
+        """))
+        merged["team_memberships"] = result.rowcount
+
+        result = await self.session.execute(text("""
+            INSERT INTO datasource_access (access_id, datasource_id, user_id, team_id, org_id, created_at, updated_at)
+            SELECT access_id, datasource_id, user_id, team_id, org_id,
+                   COALESCE(created_at, now()), COALESCE(updated_at, now())
+            FROM import_grants
+            ON CONFLICT DO NOTHING
+        """))
+        merged["datasource_access"] = result.rowcount
+        return merged
+
+    async def _refresh_effective_access(self):
+        # Everyone whose access the imported memberships and grants can change
+        affected_user_ids = text("""
+            SELECT user_id FROM import_memberships
+            UNION SELECT user_id FROM import_grants WHERE user_id IS NOT NULL
+            UNION SELECT tm.user_id FROM team_memberships tm
+                  JOIN import_grants g ON g.team_id = tm.team_id
+                  WHERE tm.removed_at IS NULL
+        """).columns(column("user_id", String))
+        await EffectiveAccessDAO(self.session).refresh(user_ids=affected_user_ids.subquery().select())
@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+from RBAC.exports.views import export_org
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+router.add_api_route("/org", endpoint=export_org, methods=["GET"], description="Stream the active org's roles, teams, memberships and grants as NDJSON")
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from clerk_integration.utils import UserData
+from fastapi import Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from RBAC.exports.services import OrgExportService, gzip_stream, parse_export_cursor
+from config.settings import loaded_config
+from utils.common import handle_exceptions, get_user_data_from_request
+from utils.connection_handler import ConnectionHandler
+
+
+@handle_exceptions("Failed to export organization")
+async def export_org(
+    gzip: bool = False,
+    cursor: Optional[str] = None,
+    user_data: UserData = Depends(get_user_data_from_request),
+):
+    if not user_data.orgId:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No active organisation provided."
+        )
+    section, after = parse_export_cursor(cursor)
+
+    # The stream outlives the request's dependencies, so the export owns its connection handler
+    service = OrgExportService(ConnectionHandler(connection_manager=loaded_config.connection_manager))
+    body = service.export_ndjson(user_data.orgId, section, after)
+    filename = f"{user_data.orgId}.ndjson"
+    media_type = "application/x-ndjson"
+    if gzip:
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
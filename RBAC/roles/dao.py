@@ -1,50 +1,73 @@
 from uuid import UUID
 
 import uuid6
-from sqlalchemy import select
+from sqlalchemy import select, insert
 
 from RBAC.roles.models import TeamRoles
+from RBAC.roles.registry import RoleRecord, ROLES_TOPIC, get_role_registry, add_role, load_role_registry
 from RBAC.roles.schemas import TeamRoleSchema
 from config.logging import logger
 from config.settings import loaded_config
+from utils.connection_handler import after_commit
+from utils.tracing import traced
 
 
+@traced
 class TeamRoleDAO:
     def __init__(self, session):
         self.session = session
 
     async def create_role(self, role: TeamRoleSchema):
-        role_id = uuid6.uuid6()
-        new_role = TeamRoles(
-            role_id=role_id,
-            name=role.name,
-            description=role.description,
-            role_slug=role.slug
+        new_role = await self.session.scalar(
+            insert(TeamRoles)
+            .values(
+                role_id=uuid6.uuid6(),
+                name=role.name,
+                description=role.description,
+                role_slug=role.slug
+            )
+            .returning(TeamRoles)
         )
-        self.session.add(new_role)
-        await self.session.commit()
-        await self.session.refresh(new_role)
+        record = RoleRecord.from_model(new_role)
+
+        async def register_role():
+            add_role(record)
+            if loaded_config.cache_backend is not None:
+                try:
+                    await loaded_config.cache_backend.publish(ROLES_TOPIC, record.to_dict())
+                except Exception as e:
+                    logger.error("Failed to publish created team role", role_slug=record.role_slug, error=str(e))
+
+        after_commit(self.session, register_role)
         logger.info("Created new team role %s", role.name)
         return new_role
 
-    async def get_role_by_slug(self, slug: str) -> TeamRoles | None:
-        if loaded_config.all_roles_data:
-            return loaded_config.all_roles_data[slug]
-        stmt = select(TeamRoles).where(TeamRoles.role_slug == slug)
-        query_result = await self.session.execute(stmt)
-        result = query_result.scalar_one_or_none()
-        if result:
-            return result.role_id
-        return result
-
-    async def get_all_roles(self) -> list[TeamRoles]:
-        stmt = select(TeamRoles)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
-
-
-    async def get_role_by_id(self, role_id: UUID) -> TeamRoles | None:
-        stmt = select(TeamRoles).where(TeamRoles.role_id == role_id)
-        query_result = await self.session.execute(stmt)
-        result = query_result.scalar_one_or_none()
-        return result
\ No newline at end of file
+    async def get_role_by_slug(self, slug: str) -> UUID | None:
+        role = get_role_registry().by_slug(slug)
+        if role is None:
+            role = await self._load_role(TeamRoles.role_slug == slug)
+        return role.role_id if role else None
+
+    async def get_all_roles(self) -> list[dict]:
+        registry = get_role_registry()
+        if not registry.loaded:
+            registry = await load_role_registry(self.session)
+        return [role.to_dict() for role in registry.all()]
+
+    async def get_role_by_id(self, role_id: UUID) -> RoleRecord | None:
+        if role_id is None:
+            return None
+        role = get_role_registry().by_id(role_id)
+        if role is None:
+            role = await self._load_role(TeamRoles.role_id == role_id)
+        return role
+
+    async def _load_role(self, condition) -> RoleRecord | None:
+        """Fallback for a role missing from the registry, e.g. created before a broadcast reached this worker."""
+        result = await self.session.execute(select(TeamRoles).where(condition))
+        role = result.scalar_one_or_none()
+        if role is None:
+            return None
+        record = RoleRecord.from_model(role)
+        add_role(record)
+        return record
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Optional, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import select
+
+from RBAC.roles.models import TeamRoles
+
+ROLES_TOPIC = "roles"
+
+
+@dataclass(frozen=True)
+class RoleRecord:
+    role_id: UUID
+    name: str
+    description: Optional[str]
+    role_slug: str
+
+    @classmethod
+    def from_model(cls, role: TeamRoles) -> "RoleRecord":
+        return cls(role_id=role.role_id, name=role.name, description=role.description, role_slug=role.role_slug)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RoleRecord":
+        return cls(
+            role_id=UUID(str(data["role_id"])),
+            name=data["name"],
+            description=data.get("description"),
+            role_slug=data["role_slug"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "role_id": str(self.role_id),
+            "name": self.name,
+            "description": self.description,
+            "role_slug": self.role_slug,
+        }
+
+
+class RoleRegistry:
+    """
+    Immutable snapshot of the team_roles table, indexed by slug and by role_id.
+
+    Roles are few and change rarely, so the whole table is loaded at startup and every
+    change produces a new registry that replaces the current one in a single assignment;
+    readers holding the previous snapshot are never affected.
+    """
+
+    def __init__(self, roles: Iterable[RoleRecord] = (), loaded: bool = False):
+        roles = tuple(roles)
+        self.loaded = loaded
+        self._roles: Tuple[RoleRecord, ...] = roles
+        self._by_slug = MappingProxyType({role.role_slug: role for role in roles})
+        self._by_id = MappingProxyType({role.role_id: role for role in roles})
+
+    def by_slug(self, slug: str) -> Optional[RoleRecord]:
+        return self._by_slug.get(slug)
+
+    def by_id(self, role_id: Union[UUID, str, None]) -> Optional[RoleRecord]:
+        if role_id is None:
+            return None
+        if not isinstance(role_id, UUID):
+            role_id = UUID(str(role_id))
+        return self._by_id.get(role_id)
+
+    def all(self) -> Tuple[RoleRecord, ...]:
+        return self._roles
+
+    def with_role(self, role: RoleRecord) -> "RoleRegistry":
+        roles = [existing for existing in self._roles
+                 if existing.role_id != role.role_id and existing.role_slug != role.role_slug]
+        return RoleRegistry([*roles, role], loaded=self.loaded)
+
+
+_registry = RoleRegistry()
+
+
+def get_role_registry() -> RoleRegistry:
+    return _registry
+
+
+def set_role_registry(registry: RoleRegistry):
+    global _registry
+    _registry = registry
+
+
+def add_role(role: RoleRecord):
+    set_role_registry(get_role_registry().with_role(role))
+
+
+def handle_role_created(message: dict):
+    """Cache backend listener applying a role created by another worker."""
+    add_role(RoleRecord.from_dict(message))
+
+
+async def load_role_registry(session) -> RoleRegistry:
+    result = await session.execute(select(TeamRoles))
+    registry = RoleRegistry((RoleRecord.from_model(role) for role in result.scalars().all()), loaded=True)
+    set_role_registry(registry)
+    return registry
@@ -1,21 +1,33 @@
+from functools import cached_property
+
 from sqlalchemy.exc import SQLAlchemyError
 
 from RBAC.roles.dao import TeamRoleDAO
 from RBAC.roles.schemas import TeamRoleSchema
 from RBAC.teams.exceptions import TeamError
 from utils.connection_handler import ConnectionHandler
+from utils.tracing import traced
 from config.logging import logger
 
 
+@traced
 class TeamRoleService:
     def __init__(self, connection_handler: ConnectionHandler):
         self.connection_handler = connection_handler
-        self.session = connection_handler.session if connection_handler else None
-        self.dao = TeamRoleDAO(self.session)
+
+    @property
+    def session(self):
+        return self.connection_handler.session if self.connection_handler else None
+
+    @cached_property
+    def dao(self) -> TeamRoleDAO:
+        return TeamRoleDAO(self.session)
 
     async def create_role(self, role: TeamRoleSchema):
         try:
-            return await self.dao.create_role(role)
+            new_role = await self.dao.create_role(role)
+            await self.connection_handler.session_commit()
+            return new_role
         except SQLAlchemyError as e:
             if self.session:
                 await self.session.rollback()
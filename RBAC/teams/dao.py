@@ -1,29 +1,75 @@
 import time
+from typing import Optional
 from uuid import UUID
 
 import uuid6
 
-from sqlalchemy import update, and_
+from fastapi import HTTPException, status
+from sqlalchemy import update, delete, and_, func, any_, bindparam, String, values, column
+from sqlalchemy.dialects.postgresql import insert, ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 
+from RBAC import cache_keys
+from RBAC.datasources.cache import access_decision_cache
+from RBAC.datasources.dao import EffectiveAccessDAO
 from RBAC.roles.dao import TeamRoleDAO
 from RBAC.roles.models import TeamRoles
 from RBAC.roles.schemas import TeamRoleEnum
 from RBAC.teams.models import Teams, TeamMemberships
 from RBAC.teams.exceptions import TeamError, TeamNotFoundError
 from RBAC.teams.schemas import TeamUpdateSchema, TeamMemberAddSchema, TeamAddSchema, \
-    MemberRoleChangeSchema
+    MemberRoleChangeSchema, TeamMemberBulkAddSchema, TeamMemberBulkAddResult
 from config.logging import logger
 from config.settings import loaded_config
 from clerk_integration.helpers import ClerkHelper
+from utils.cache import read_through, invalidate
+from utils.clerk_profiles import clerk_profile_cache
+from utils.connection_handler import release_connection, after_commit
+from utils.pagination import PageParams, keyset, page_of
+from utils.tracing import traced
+
+
+async def _invalidate_team_caches_on_commit(
+    session, team_id: UUID, user_ids, org_id: str = None, access_changed: bool = True
+):
+    """
+    Drop the cached reads a change to team_id's memberships can affect, once the change is committed.
+
+    Args:
+        session: Session making the change; the team's org is looked up in it when org_id is not given
+        team_id: The team that changed
+        user_ids: Members whose membership changed
+        org_id: The team's organization, if already known
+        access_changed: Whether the change can affect datasource access (not the case for role changes)
+    """
+    user_ids = list(user_ids)
+    backend = loaded_config.cache_backend
+    keys = []
+    if backend is not None:
+        if org_id is None:
+            org_id = await session.scalar(select(Teams.org_id).where(Teams.team_id == team_id))
+        keys.append(cache_keys.team_members(team_id))
+        keys.extend(cache_keys.teams_by_org(org_id, user_id) for user_id in user_ids)
+        if access_changed:
+            keys.extend(cache_keys.accessible_datasources_by_user(user_id) for user_id in user_ids)
+
+    async def invalidate_team_caches():
+        if access_changed:
+            for user_id in user_ids:
+                await access_decision_cache.broadcast_invalidation("user", user_id=user_id)
+        await invalidate(backend, *keys)
+
+    after_commit(session, invalidate_team_caches)
 
 
 # --------------- Teams DAO ----------------
+@traced
 class TeamsDAO:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.effective_access_dao = EffectiveAccessDAO(session)
 
 
     async def create_team(self, team_details: TeamAddSchema, user_id: str, org_id: str):
@@ -31,16 +77,17 @@ class TeamsDAO:
         try:
             team_id = uuid6.uuid6()
             team_slug = team_details.team_slug or f"{team_details.name.lower().replace(' ', '-')}-{str(team_id)[:8]}"
-            new_team = Teams(
-                team_id=team_id,
-                org_id=org_id,
-                name=team_details.name,
-                team_slug=team_slug,
-                created_by=user_id
+            new_team = await self.session.scalar(
+                insert(Teams)
+                .values(
+                    team_id=team_id,
+                    org_id=org_id,
+                    name=team_details.name,
+                    team_slug=team_slug,
+                    created_by=user_id
+                )
+                .returning(Teams)
             )
-            self.session.add(new_team)
-            await self.session.commit()
-            await self.session.refresh(new_team)
             logger.info(f"Created new team {new_team.team_slug} with ID {team_id}")
             return new_team
         except IntegrityError as e:
@@ -50,51 +97,87 @@ class TeamsDAO:
             logger.error(f"Failed to create team: {e}")
             raise TeamError(detail=str(e))
 
-    async def get_teams_by_org(self, org_id: str, current_user_id: str):
+    async def get_teams_by_org(self, org_id: str, current_user_id: str, page: Optional[PageParams] = None):
+        """
+        Get the teams of an org that the user is a member of, with the user's role in each.
+
+        Args:
+            org_id: The organization
+            current_user_id: The member
+            page: Keyset page to return; the whole list when None (legacy_unpaginated_lists)
+
+        Returns:
+            A page dict with items and next_cursor, or the list of teams when page is None
+        """
         try:
-            # Get only the teams that the user is a member of in this organization
-            user_teams_stmt = (
-                select(Teams, TeamMemberships.role_id, TeamRoles.name.label("role_name"), TeamRoles.role_slug)
-                .join(
-                    TeamMemberships,
-                    and_(
-                        Teams.team_id == TeamMemberships.team_id,
-                        TeamMemberships.user_id == current_user_id,
-                        TeamMemberships.removed_at.is_(None)
-                    )
+            if page is None:
+                return await self._load_teams_by_org(org_id, current_user_id)
+            if page.cursor is None and page.limit is None:
+                # The default first page is what clients fetch on every load, so it is cached
+                return await read_through(
+                    loaded_config.cache_backend,
+                    cache_keys.teams_by_org(org_id, current_user_id),
+                    lambda: self._load_teams_page(org_id, current_user_id, page)
                 )
-                .join(
-                    TeamRoles,
-                    TeamMemberships.role_id == TeamRoles.role_id
+            return await self._load_teams_page(org_id, current_user_id, page)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to fetch teams for org {org_id}: {e}")
+            raise TeamError(detail=str(e))
+
+    async def _load_teams_page(self, org_id: str, current_user_id: str, page: PageParams):
+        teams, next_cursor = page_of(
+            await self._load_teams_by_org(org_id, current_user_id, page), page, lambda team: UUID(team["team_id"])
+        )
+        return {"items": teams, "next_cursor": next_cursor}
+
+    async def _load_teams_by_org(self, org_id: str, current_user_id: str, page: Optional[PageParams] = None):
+        # Get only the teams that the user is a member of in this organization
+        user_teams_stmt = (
+            select(Teams, TeamMemberships.role_id, TeamRoles.name.label("role_name"), TeamRoles.role_slug)
+            .join(
+                TeamMemberships,
+                and_(
+                    Teams.team_id == TeamMemberships.team_id,
+                    TeamMemberships.user_id == current_user_id,
+                    TeamMemberships.removed_at.is_(None)
                 )
-                .where(Teams.org_id == org_id)
             )
-
-            result = await self.session.execute(user_teams_stmt)
-
-            # Build the response with only teams the user is a member of
-            teams_with_roles = []
-            for row in result:
-                team = row.Teams  # Access the Teams object from the row
-                team_dict = {
-                    "team_id": str(team.team_id),
-                    "org_id": team.org_id,
-                    "team_slug": team.team_slug,
-                    "description": team.description,
-                    "name": team.name,
-                    "created_by": team.created_by,
-                    "user_role": {
-                        "role_id": row.role_id,
-                        "role_name": row.role_name,
-                        "role_slug": row.role_slug
-                    }
+            .join(
+                TeamRoles,
+                TeamMemberships.role_id == TeamRoles.role_id
+            )
+            .where(Teams.org_id == org_id)
+        )
+        # Ordered by the membership's team_id, which ix_team_memberships_user_id_team_id_active serves
+        if page is not None:
+            user_teams_stmt = keyset(user_teams_stmt, TeamMemberships.team_id, page)
+        else:
+            user_teams_stmt = user_teams_stmt.order_by(TeamMemberships.team_id)
+
+        result = await self.session.execute(user_teams_stmt)
+
+        # Build the response with only teams the user is a member of
+        teams_with_roles = []
+        for row in result:
+            team = row.Teams  # Access the Teams object from the row
+            team_dict = {
+                "team_id": str(team.team_id),
+                "org_id": team.org_id,
+                "team_slug": team.team_slug,
+                "description": team.description,
+                "name": team.name,
+                "created_by": team.created_by,
+                "user_role": {
+                    "role_id": str(row.role_id),
+                    "role_name": row.role_name,
+                    "role_slug": row.role_slug
                 }
-                teams_with_roles.append(team_dict)
+            }
+            teams_with_roles.append(team_dict)
 
-            return teams_with_roles
-        except Exception as e:
-            logger.error(f"Failed to fetch teams for org {org_id}: {e}")
-            raise TeamError(detail=str(e))
+        return teams_with_roles
 
 
     async def get_team_by_id(self, team_id: UUID):
@@ -116,17 +199,26 @@ class TeamsDAO:
     async def update_team(self, team_id: UUID, team_details: TeamUpdateSchema):
         """Update an existing team."""
         try:
-            result = await self.session.execute(select(Teams).where(Teams.team_id == team_id))
-            team = result.scalars().first()
+            changes = {key: value for key, value in team_details.model_dump(exclude_unset=True).items() if value}
+            if changes:
+                stmt = (
+                    update(Teams)
+                    .where(Teams.team_id == team_id)
+                    .values(**changes)
+                    .returning(Teams)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                stmt = select(Teams).where(Teams.team_id == team_id)
+            team = (await self.session.scalars(stmt)).first()
             if not team:
                 raise TeamNotFoundError()
 
-            for key, value in team_details.model_dump(exclude_unset=True).items():
-                if value:
-                    setattr(team, key, value)
-
-            await self.session.commit()
-            await self.session.refresh(team)
+            if loaded_config.cache_backend is not None:
+                member_ids = (await self.session.execute(EffectiveAccessDAO.team_member_ids(team_id))).scalars().all()
+                await _invalidate_team_caches_on_commit(
+                    self.session, team_id, member_ids, team.org_id, access_changed=False
+                )
             logger.info(f"Team {team_id} updated successfully")
             return team
         except TeamNotFoundError:
@@ -139,13 +231,16 @@ class TeamsDAO:
     async def delete_team(self, team_id: UUID):
         """Delete a team."""
         try:
-            result = await self.session.execute(select(Teams).where(Teams.team_id == team_id))
-            team = result.scalars().first()
-            if not team:
+            member_ids = (await self.session.execute(EffectiveAccessDAO.team_member_ids(team_id))).scalars().all()
+
+            org_id = await self.session.scalar(
+                delete(Teams).where(Teams.team_id == team_id).returning(Teams.org_id)
+            )
+            if org_id is None:
                 raise TeamNotFoundError(str(team_id))
 
-            await self.session.delete(team)
-            await self.session.commit()
+            await self.effective_access_dao.refresh_membership(team_id, member_ids)
+            await _invalidate_team_caches_on_commit(self.session, team_id, member_ids, org_id)
             logger.info(f"Team {str(team_id)} deleted successfully")
         except TeamNotFoundError:
             raise
@@ -155,10 +250,12 @@ class TeamsDAO:
 
 
 # ---------- Team Membership DAO -------------
+@traced
 class TeamMembershipsDAO:
     def __init__(self, session):
         self.session = session
         self.roles_dao = TeamRoleDAO(session)
+        self.effective_access_dao = EffectiveAccessDAO(session)
         self.clerk_helper = ClerkHelper(loaded_config.clerk_secret_key)
 
     async def add_member(self, team_id: UUID, member: TeamMemberAddSchema):
@@ -173,47 +270,35 @@ class TeamMembershipsDAO:
             Added team memberships
         """
         try:
-            results = []
+            user_ids = [user_role.user_id for user_role in member.members]
             # Check all members first before adding any
-            for user_role in member.members:
-                stmt = select(TeamMemberships).where(
-                    and_(
-                        TeamMemberships.team_id == team_id,
-                        TeamMemberships.user_id == user_role.user_id,
-                        TeamMemberships.removed_at.is_(None)
-                    )
-                )
-                result = await self.session.execute(stmt)
-                existing_member = result.scalar_one_or_none()
-
-                if existing_member:
-                    raise TeamError(f"Member with user_id {user_role.user_id} already exists in the team")
+            existing_user_id = await self.session.scalar(
+                select(TeamMemberships.user_id).where(
+                    TeamMemberships.team_id == team_id,
+                    TeamMemberships.user_id.in_(user_ids),
+                    TeamMemberships.removed_at.is_(None)
+                ).limit(1)
+            )
+            if existing_user_id:
+                raise TeamError(f"Member with user_id {existing_user_id} already exists in the team")
 
-            # If we get here, none of the members exist, so we can add them all
+            rows = []
             for user_role in member.members:
-                role_id = None
-                if user_role.role_slug:
-                    role_id = await self.roles_dao.get_role_by_slug(user_role.role_slug)
-                else:
-                    role_id = await self.roles_dao.get_role_by_slug(TeamRoleEnum.MEMBER.value)
-
+                role_id = await self.roles_dao.get_role_by_slug(user_role.role_slug or TeamRoleEnum.MEMBER.value)
                 if not role_id:
                     raise TeamError(f"Role not found for slug {user_role.role_slug or 'member'}")
+                rows.append({
+                    "membership_id": uuid6.uuid6(),
+                    "team_id": team_id,
+                    "user_id": user_role.user_id,
+                    "role_id": role_id,
+                    "removed_at": None
+                })
 
-                new_entry = TeamMemberships(
-                    membership_id=uuid6.uuid6(),
-                    team_id=team_id,
-                    user_id=user_role.user_id,
-                    role_id=role_id,
-                    removed_at=None
-                )
-                self.session.add(new_entry)
-                results.append(new_entry)
-
-            await self.session.commit()
+            results = (await self.session.scalars(insert(TeamMemberships).values(rows).returning(TeamMemberships))).all()
 
-            for entry in results:
-                await self.session.refresh(entry)
+            await self.effective_access_dao.refresh_membership(team_id, user_ids)
+            await _invalidate_team_caches_on_commit(self.session, team_id, user_ids)
 
             logger.info(f"Added {len(results)} members to team {team_id}")
 
@@ -221,95 +306,288 @@ class TeamMembershipsDAO:
                 return results[0]
             return results
 
+        except TeamError:
+            raise
         except Exception as e:
-            await self.session.rollback()  # Add explicit rollback on error
             logger.error(f"Failed to add team member(s): {str(e)}")
             raise TeamError(str(e))  # Pass the original error message
 
+    async def bulk_add_members(self, team_id: UUID, members: TeamMemberBulkAddSchema) -> TeamMemberBulkAddResult:
+        """
+        Add many members to a team, skipping users that already are active members.
+
+        Existing members are found with a single user_id = ANY(:user_ids) query, and new rows go
+        in with chunked multi-row INSERT ... ON CONFLICT DO NOTHING against the partial unique
+        index on active memberships, so a member added concurrently is skipped rather than
+        failing the import. Flushes only; the caller commits.
+
+        Args:
+            team_id: The team to add members to
+            members: TeamMemberBulkAddSchema with the user/role pairs to add
+
+        Returns:
+            TeamMemberBulkAddResult: The user ids created and skipped
+        """
+        try:
+            # Last pair wins for users listed more than once
+            role_slugs = {
+                user_role.user_id: user_role.role_slug or TeamRoleEnum.MEMBER.value
+                for user_role in members.members
+            }
+            role_ids = {}
+            for slug in set(role_slugs.values()):
+                role_ids[slug] = await self.roles_dao.get_role_by_slug(slug)
+                if not role_ids[slug]:
+                    raise TeamError(f"Role not found for slug {slug}")
+
+            existing_user_ids = set((await self.session.scalars(
+                select(TeamMemberships.user_id).where(
+                    TeamMemberships.team_id == team_id,
+                    TeamMemberships.user_id == any_(bindparam("user_ids", list(role_slugs), type_=ARRAY(String))),
+                    TeamMemberships.removed_at.is_(None)
+                )
+            )).all())
+
+            rows = [
+                {
+                    "membership_id": uuid6.uuid6(),
+                    "team_id": team_id,
+                    "user_id": user_id,
+                    "role_id": role_ids[slug],
+                    "removed_at": None
+                }
+                for user_id, slug in role_slugs.items()
+                if user_id not in existing_user_ids
+            ]
+
+            created = []
+            chunk_size = loaded_config.bulk_write_chunk_size
+            for start in range(0, len(rows), chunk_size):
+                chunk_created = (await self.session.scalars(
+                    insert(TeamMemberships)
+                    .values(rows[start:start + chunk_size])
+                    .on_conflict_do_nothing(
+                        index_elements=[TeamMemberships.team_id, TeamMemberships.user_id],
+                        index_where=TeamMemberships.removed_at.is_(None)
+                    )
+                    .returning(TeamMemberships.user_id)
+                )).all()
+                if chunk_created:
+                    await self.effective_access_dao.refresh_membership(team_id, chunk_created)
+                created.extend(chunk_created)
+
+            if created:
+                await _invalidate_team_caches_on_commit(self.session, team_id, created)
+
+            created_ids = set(created)
+            skipped = [user_id for user_id in role_slugs if user_id not in created_ids]
+            logger.info(f"Bulk added {len(created)} members to team {team_id}, skipped {len(skipped)}")
+            return TeamMemberBulkAddResult(created=created, skipped=skipped)
+
+        except TeamError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to bulk add team members: {str(e)}")
+            raise TeamError(str(e))
+
     async def change_member_role(self, member_info: MemberRoleChangeSchema, team_id: UUID):
+        """
+        Change the roles of team members with a single UPDATE ... FROM (VALUES ...) RETURNING.
+
+        The team row is locked first so concurrent role changes of the same team serialize, and
+        the change is refused when it would leave the team without an owner. Flushes only; the
+        caller commits (or rolls back on error).
+
+        Args:
+            member_info: MemberRoleChangeSchema with user_id/role_slug pairs
+            team_id: The team whose members change
+
+        Returns:
+            dict: "successful" entries with user_id and new_role_id, and "failed" entries with
+                user_id and reason, for members that are not active or have an unknown role
+
+        Raises:
+            TeamNotFoundError: If the team does not exist
+            TeamError: If no owner would be left (403)
+        """
         try:
             results = {
                 "successful": [],
                 "failed": []
             }
-            for member in member_info.members:
-                role_id = await self.roles_dao.get_role_by_slug(member.role_slug)
-                if not role_id:
-                    raise TeamError("Failed to add member to team: Role slug not found")
+            # Last pair wins for users listed more than once
+            role_slugs = {member.user_id: member.role_slug for member in member_info.members}
+            changes = []
+            for user_id, slug in role_slugs.items():
+                role_id = await self.roles_dao.get_role_by_slug(slug) if slug else None
+                if role_id:
+                    changes.append((user_id, role_id))
+                else:
+                    results["failed"].append({"user_id": user_id, "reason": f"Role not found for slug {slug}"})
 
-                membership_query = select(TeamMemberships).where(
-                    and_(
+            org_id = await self.session.scalar(
+                select(Teams.org_id).where(Teams.team_id == team_id).with_for_update()
+            )
+            if org_id is None:
+                raise TeamNotFoundError(str(team_id))
+
+            updated = {}
+            if changes:
+                new_roles = values(
+                    column("user_id", String), column("role_id", PG_UUID(as_uuid=True)), name="new_roles"
+                ).data(changes)
+                stmt = (
+                    update(TeamMemberships)
+                    .where(
                         TeamMemberships.team_id == team_id,
-                        TeamMemberships.user_id == member.user_id,
+                        TeamMemberships.user_id == new_roles.c.user_id,
                         TeamMemberships.removed_at.is_(None)
                     )
+                    .values(role_id=new_roles.c.role_id)
+                    .returning(TeamMemberships.user_id, TeamMemberships.role_id)
+                    .execution_options(synchronize_session=False)
                 )
+                updated = dict((await self.session.execute(stmt)).all())
 
-                membership_result = await self.session.execute(membership_query)
-                existing_membership = membership_result.scalar_one_or_none()
-                if not existing_membership:
-                    raise TeamError("User/s are not member of this team")
+            if updated:
+                owner_role_id = await self.roles_dao.get_role_by_slug(TeamRoleEnum.OWNER.value)
+                owners_left = await self.session.scalar(
+                    select(func.count()).select_from(TeamMemberships).where(
+                        TeamMemberships.team_id == team_id,
+                        TeamMemberships.role_id == owner_role_id,
+                        TeamMemberships.removed_at.is_(None)
+                    )
+                )
+                if not owners_left:
+                    raise TeamError(
+                        "There should be at least one owner of the team.",
+                        status_code=status.HTTP_403_FORBIDDEN
+                    )
 
-                existing_membership.role_id = role_id
-                results["successful"].append({
-                    "user_id": member.user_id,
-                    "new_role_id": role_id
-                })
+            for user_id, role_id in changes:
+                if user_id in updated:
+                    results["successful"].append({"user_id": user_id, "new_role_id": role_id})
+                else:
+                    results["failed"].append({"user_id": user_id, "reason": "User is not a member of this team"})
 
-            await self.session.flush()
+            if updated:
+                await _invalidate_team_caches_on_commit(
+                    self.session, team_id, list(updated), org_id, access_changed=False
+                )
             return results
+        except TeamError:
+            raise
         except Exception as e:
             logger.error(f"Failed to change member role(s): {str(e)}")
             raise TeamError("Failed to change member role(s)")
 
 
-    async def get_members(self, team_id: UUID, from_clerk=True):
-        try:
-            user_ids, rows = await self.get_member_user_ids(team_id)
-
-            if not user_ids:
-                return []
-
-            clerk_users_by_id = None
+    async def get_members(self, team_id: UUID, from_clerk=True, page: Optional[PageParams] = None):
+        """
+        Get the active members of a team, with their Clerk profiles when from_clerk is set.
 
-            if from_clerk:
-                clerk_users_by_id = await self.clerk_helper.get_clerk_users_by_id(user_ids)
+        Returns:
+            A page dict with items and next_cursor, or the list of all members when page is None
+        """
+        try:
+            next_cursor = None
+            if page is None:
+                user_ids, rows = await self.get_member_user_ids(team_id)
+            else:
+                # Pages come straight from the database; only their members are looked up in Clerk
+                rows, next_cursor = page_of(
+                    await self._load_member_rows(team_id, page), page, lambda row: UUID(row["membership_id"])
+                )
+                user_ids = [row["user_id"] for row in rows]
 
             members = []
-            for row in rows:
-                member_db = row.TeamMemberships
-                role_name = row.role_name
-                member_dict = {
-                    "user_id": member_db.user_id,
-                    "team_id": member_db.team_id,
-                    "role_id": member_db.role_id,
-                    "role_name": role_name
-                }
-                if from_clerk and clerk_users_by_id:
-                    clerk_user = clerk_users_by_id.get(member_db.user_id)
-                    member_dict["clerk_user"] = clerk_user
+            if user_ids:
+                clerk_users_by_id = None
+
+                if from_clerk:
+                    await release_connection(self.session)
+                    clerk_users_by_id = await clerk_profile_cache.get_profiles(
+                        user_ids, self.clerk_helper.get_clerk_users_by_id
+                    )
 
+                for row in rows:
+                    member_dict = dict(row)
+                    if from_clerk and clerk_users_by_id:
+                        clerk_user = clerk_users_by_id.get(row["user_id"])
+                        member_dict["clerk_user"] = clerk_user
 
-                members.append(member_dict)
+                    members.append(member_dict)
 
-            return members
+            if page is None:
+                return members
+            return {"items": members, "next_cursor": next_cursor}
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error("Failed to get members for team %s: %s", str(team_id), str(e))
             raise TeamError("Failed to list team members")
 
 
     async def get_member_user_ids(self, team_id: UUID):
+        rows = await read_through(
+            loaded_config.cache_backend,
+            cache_keys.team_members(team_id),
+            lambda: self._load_member_rows(team_id)
+        )
+        user_ids = [row["user_id"] for row in rows]
+        return user_ids, rows
+
+    async def _load_member_rows(self, team_id: UUID, page: Optional[PageParams] = None):
         stmt = (
-            select(TeamMemberships, TeamRoles.name.label("role_name"))
+            select(TeamMemberships.membership_id, TeamMemberships.user_id, TeamMemberships.team_id,
+                   TeamMemberships.role_id, TeamRoles.name.label("role_name"))
             .join(TeamRoles, TeamMemberships.role_id == TeamRoles.role_id)
             .where(TeamMemberships.team_id == team_id, TeamMemberships.removed_at.is_(None))
         )
+        # Ordered by the uuid6 membership_id, which ix_team_memberships_team_id_membership_id_active serves
+        if page is not None:
+            stmt = keyset(stmt, TeamMemberships.membership_id, page)
+        else:
+            stmt = stmt.order_by(TeamMemberships.membership_id)
         result = await self.session.execute(stmt)
-        rows = result.fetchall()
+        return [
+            {
+                "membership_id": str(row.membership_id),
+                "user_id": row.user_id,
+                "team_id": str(row.team_id),
+                "role_id": str(row.role_id),
+                "role_name": row.role_name
+            }
+            for row in result
+        ]
 
-        user_ids = [row.TeamMemberships.user_id for row in rows]
-        return user_ids, rows
+    async def get_team_ids_by_member(self, team_ids) -> dict:
+        """
+        Get the active membership edges of the given teams, grouped by member.
+
+        Args:
+            team_ids: The teams to look at
+
+        Returns:
+            dict: user_id mapped to the set of team_ids (as strings) the user belongs to
+        """
+        if not team_ids:
+            return {}
+
+        stmt = (
+            select(TeamMemberships.user_id, func.array_agg(TeamMemberships.team_id))
+            .where(
+                TeamMemberships.team_id.in_([UUID(str(team_id)) for team_id in team_ids]),
+                TeamMemberships.removed_at.is_(None)
+            )
+            .group_by(TeamMemberships.user_id)
+        )
+        result = await self.session.execute(stmt)
+        return {
+            user_id: {str(team_id) for team_id in member_team_ids}
+            for user_id, member_team_ids in result.all()
+        }
 
     async def remove_member(self, team_id: UUID, user_id: str):
         try:
@@ -319,7 +597,8 @@ class TeamMembershipsDAO:
                 .values(removed_at=int(time.time()))
             )
             await self.session.execute(stmt)
-            await self.session.commit()
+            await self.effective_access_dao.refresh_membership(team_id, [user_id])
+            await _invalidate_team_caches_on_commit(self.session, team_id, [user_id])
             logger.info("Removed user %s from team %s", user_id, team_id)
         except Exception as e:
             logger.error("Failed to remove member: %s", str(e))
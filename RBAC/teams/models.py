@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, BigInteger, Index
+from sqlalchemy import Column, String, DateTime, ForeignKey, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from utils.sqlalchemy import Base, TimestampMixin
 
@@ -25,5 +25,13 @@ class TeamMemberships(TimestampMixin, Base):
 
     __table_args__ = (
         Index('ix_team_memberships_user_id_removed_at', 'user_id', 'removed_at'),
-        Index('ix_team_memberships_team_id_removed_at', 'team_id', 'removed_at')
-    )
\ No newline at end of file
+        Index('ix_team_memberships_team_id_removed_at', 'team_id', 'removed_at'),
+        # At most one active membership per user and team; bulk adds rely on it for ON CONFLICT
+        Index('uq_team_memberships_team_id_user_id_active', 'team_id', 'user_id', unique=True,
+              postgresql_where=text('removed_at IS NULL')),
+        # Keyset orderings of a user's teams and of a team's members
+        Index('ix_team_memberships_user_id_team_id_active', 'user_id', 'team_id',
+              postgresql_where=text('removed_at IS NULL')),
+        Index('ix_team_memberships_team_id_membership_id_active', 'team_id', 'membership_id',
+              postgresql_where=text('removed_at IS NULL')),
+    )
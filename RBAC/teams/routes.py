@@ -8,7 +8,7 @@ from RBAC.teams.views import (
     add_team_member,
     remove_team_member,
     get_team_members,
-    get_team_by_id, get_org_members, change_role_of_member
+    get_team_by_id, get_org_members, change_role_of_member, bulk_add_team_members
 )
 
 router = APIRouter(prefix="/teams", tags=["Teams"])
@@ -22,6 +22,7 @@ router.add_api_route("/{team_id}", endpoint=delete_team, methods=["DELETE"], des
 
 # --- Memberships ---
 router.add_api_route("/{team_id}/members", endpoint=add_team_member, methods=["POST"], description="Add member to team")
+router.add_api_route("/{team_id}/members/bulk", endpoint=bulk_add_team_members, methods=["POST"], description="Add many members to a team, skipping existing members")
 router.add_api_route("/{team_id}/members", endpoint=get_team_members, methods=["GET"], description="List team members", dependencies=[Depends(get_user_data_from_request)])
 router.add_api_route("/{team_id}/members/{user_id}", endpoint=remove_team_member, methods=["DELETE"], description="Remove member from team")
 router.add_api_route("/{team_id}/members", endpoint=change_role_of_member, methods=["PATCH"], description="Change member role")
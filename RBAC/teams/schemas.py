@@ -4,6 +4,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
+from config.settings import loaded_config
+
 
 class TeamCreateSchema(BaseModel):
     team_id: UUID = Field(..., description="Unique identifier of the created team")
@@ -43,6 +45,21 @@ class TeamMemberAddSchema(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TeamMemberBulkAddSchema(BaseModel):
+    members: List[UserRolePair] = Field(..., description="User and role pairs to add; users already in the team are skipped")
+
+    @field_validator('members')
+    def validate_batch_size(cls, v):
+        if len(v) > loaded_config.bulk_member_add_limit:
+            raise ValueError(f"At most {loaded_config.bulk_member_add_limit} members can be added per request")
+        return v
+
+
+class TeamMemberBulkAddResult(BaseModel):
+    created: List[str] = Field(default_factory=list, description="User IDs added to the team")
+    skipped: List[str] = Field(default_factory=list, description="User IDs that already were active members")
+
+
 class MemberRoleChangeSchema(BaseModel):
     members: List[UserRolePair] = Field(..., description="Clerk user ID")
 
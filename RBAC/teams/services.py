@@ -1,5 +1,6 @@
 from uuid import UUID
 from collections import defaultdict
+from functools import cached_property
 
 from clerk_integration.helpers import ClerkHelper
 from clerk_integration.utils import UserData
@@ -12,17 +13,30 @@ from RBAC.teams.exceptions import TeamNotFoundError, TeamError
 from config.logging import logger
 from config.settings import loaded_config
 from utils.connection_handler import ConnectionHandler
+from utils.metrics import observe_clerk_call
+from utils.pagination import PageParams
+from utils.tracing import traced
 from RBAC.teams.schemas import TeamCreateSchema, TeamUpdateSchema, TeamMemberAddSchema, OrgMembersQueryParams, \
-    UserRolePair, TeamAddSchema, MemberRoleChangeSchema
+    UserRolePair, TeamAddSchema, MemberRoleChangeSchema, TeamMemberBulkAddSchema
 
 
 # ------- Teams service --------
+@traced
 class TeamService:
     def __init__(self, connection_handler: ConnectionHandler = None):
         self.connection_handler = connection_handler
-        self.teams_dao = TeamsDAO(session=connection_handler.session)
-        self.memberships_dao = TeamMembershipsDAO(session=connection_handler.session)
-        self.roles_dao = TeamRoleDAO(session=connection_handler.session)
+
+    @cached_property
+    def teams_dao(self) -> TeamsDAO:
+        return TeamsDAO(session=self.connection_handler.session)
+
+    @cached_property
+    def memberships_dao(self) -> TeamMembershipsDAO:
+        return TeamMembershipsDAO(session=self.connection_handler.session)
+
+    @cached_property
+    def roles_dao(self) -> TeamRoleDAO:
+        return TeamRoleDAO(session=self.connection_handler.session)
 
     async def create_team(self, team_details: TeamAddSchema, user_id: str, org_id: str):
         try:
@@ -36,7 +50,7 @@ class TeamService:
                 team_id=team.team_id,
                 member=member_schema
             )
-            await self.connection_handler.session.commit()
+            await self.connection_handler.session_commit()
             return TeamCreateSchema.model_validate(team)
         except (TeamError, ValueError) as e:
             await self.connection_handler.session.rollback()
@@ -46,9 +60,13 @@ class TeamService:
             logger.error(f"Unexpected error creating team: {e}")
             raise TeamError(f"Failed to create team: {str(e)}")
 
-    async def get_teams_by_user_org(self, org_id: str, user_id: str):
+    async def get_teams_by_user_org(self, org_id: str, user_id: str, page: PageParams):
         try:
-            return await self.teams_dao.get_teams_by_org(org_id, user_id)
+            return await TeamsDAO(session=self.connection_handler.read_session).get_teams_by_org(
+                org_id, user_id, page if page.paginated else None
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching teams for org {org_id}: {e}")
             raise TeamError(f"Failed to fetch teams: {str(e)}")
@@ -78,7 +96,7 @@ class TeamService:
     async def update_team(self, team_id: UUID, team_details: TeamUpdateSchema):
         try:
             team = await self.teams_dao.update_team(team_id, team_details)
-            await self.connection_handler.session.commit()
+            await self.connection_handler.session_commit()
             return team
         except TeamNotFoundError:
             raise
@@ -90,7 +108,7 @@ class TeamService:
     async def delete_team(self, team_id: UUID):
         try:
             await self.teams_dao.delete_team(team_id)
-            await self.connection_handler.session.commit()
+            await self.connection_handler.session_commit()
             return True
         except TeamNotFoundError:
             raise
@@ -101,13 +119,23 @@ class TeamService:
 
 
 # ------- Team membership service --------
+@traced
 class TeamMembershipService:
     def __init__(self, connection_handler: ConnectionHandler):
         self.connection_handler = connection_handler
-        self.memberships_dao = TeamMembershipsDAO(connection_handler.session)
         self.clerk_helper = ClerkHelper(loaded_config.clerk_secret_key)
-        self.teams_dao = TeamsDAO(connection_handler.session)
-        self.roles_dao = TeamRoleDAO(connection_handler.session)
+
+    @cached_property
+    def memberships_dao(self) -> TeamMembershipsDAO:
+        return TeamMembershipsDAO(self.connection_handler.session)
+
+    @cached_property
+    def teams_dao(self) -> TeamsDAO:
+        return TeamsDAO(self.connection_handler.session)
+
+    @cached_property
+    def roles_dao(self) -> TeamRoleDAO:
+        return TeamRoleDAO(self.connection_handler.session)
 
     async def _assert_owner(self, team_id: UUID, user_id: str):
         """Ensure the user is an OWNER of the team."""
@@ -133,7 +161,7 @@ class TeamMembershipService:
         try:
             await self._assert_owner(team_id, performed_by)
             result = await self.memberships_dao.add_member(team_id, member)
-            await self.connection_handler.session.commit()
+            await self.connection_handler.session_commit()
             return result
         except HTTPException:
             raise
@@ -142,9 +170,37 @@ class TeamMembershipService:
             logger.error(f"Failed to add member(s): {e}")
             raise TeamError("Failed to add member(s) to team")
 
-    async def get_members(self, team_id: UUID):
+    async def bulk_add_members(self, team_id: UUID, members: TeamMemberBulkAddSchema, performed_by: str):
+        """
+        Add many members to a team in one transaction, skipping users that already are members.
+
+        Args:
+            team_id: UUID of the team
+            members: TeamMemberBulkAddSchema with the members to add
+            performed_by: User ID of the user performing the action
+
+        Returns:
+            TeamMemberBulkAddResult with the created and skipped user ids
+        """
         try:
-            return await self.memberships_dao.get_members(team_id)
+            await self._assert_owner(team_id, performed_by)
+            result = await self.memberships_dao.bulk_add_members(team_id, members)
+            await self.connection_handler.session_commit()
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self.connection_handler.session.rollback()
+            logger.error(f"Failed to bulk add members: {e}")
+            raise TeamError("Failed to add members to team")
+
+    async def get_members(self, team_id: UUID, page: PageParams):
+        try:
+            return await TeamMembershipsDAO(self.connection_handler.read_session).get_members(
+                team_id, page=page if page.paginated else None
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to get members for team {team_id}: {e}")
             raise TeamError("Failed to list team members")
@@ -164,7 +220,7 @@ class TeamMembershipService:
                     detail="Empty team cannot exist kindly delete the team."
                 )
             await self.memberships_dao.remove_member(team_id, user_id)
-            await self.connection_handler.session.commit()
+            await self.connection_handler.session_commit()
             return True
         except HTTPException:
             raise
@@ -183,14 +239,17 @@ class TeamMembershipService:
                     detail="No active organisation provided."
                 )
 
-            org_members = await self.clerk_helper.get_org_members(
-                user_data.orgId,
-                query,
-                query_params.limit,
-                query_params.offset
-            )
-
             existing_team_member_ids, _ = await self.memberships_dao.get_member_user_ids(team_id=query_params.team_id)
+            # Nothing below touches the database, so don't hold a connection through the Clerk call
+            await self.connection_handler.release()
+
+            async with observe_clerk_call("get_org_members"):
+                org_members = await self.clerk_helper.get_org_members(
+                    user_data.orgId,
+                    query,
+                    query_params.limit,
+                    query_params.offset
+                )
 
             filtered_org_members = defaultdict(list)
             for member in org_members["members"]:
@@ -207,17 +266,15 @@ class TeamMembershipService:
     async def change_members_role(self, member_info: MemberRoleChangeSchema, user_data: UserData, team_id: UUID):
         try:
             await self._assert_owner(team_id, user_data.userId)
-            team_members = await self.memberships_dao.get_members(team_id=team_id, from_clerk=False)
-            if len(team_members) == 1 and team_members[0]["role_id"] == loaded_config.all_roles_data[TeamRoleEnum.OWNER.value]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="There should be at least one owner of the team."
-                )
+            # The DAO refuses changes that would leave the team without an owner
             data = await self.memberships_dao.change_member_role(member_info, team_id)
-            await self.connection_handler.session.commit()  # Make sure this is awaited if it's an async function
+            await self.connection_handler.session_commit()
             return data
         except HTTPException:
             raise
+        except TeamError:
+            await self.connection_handler.session.rollback()
+            raise
         except Exception as e:
             await self.connection_handler.session.rollback()  # Make sure this is awaited if it's an async function
             logger.error(f"Failed to change role of member: {e}")
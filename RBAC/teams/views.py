@@ -5,10 +5,11 @@ from fastapi import Depends
 
 from RBAC.teams.exceptions import TeamError
 from RBAC.teams.schemas import TeamCreateSchema, TeamUpdateSchema, TeamMemberAddSchema, TeamGetSchema, \
-    OrgMembersQueryParams, TeamMembershipResponse, TeamAddSchema, MemberRoleChangeSchema
+    OrgMembersQueryParams, TeamMembershipResponse, TeamAddSchema, MemberRoleChangeSchema, TeamMemberBulkAddSchema
 from RBAC.teams.services import TeamService, TeamMembershipService
 from utils.common import handle_exceptions, get_user_data_from_request
 from utils.connection_handler import ConnectionHandler, get_connection_handler_for_app
+from utils.pagination import PageParams
 from utils.serializers import ResponseData
 
 
@@ -28,11 +29,12 @@ async def create_team(
 
 @handle_exceptions("Failed to fetch teams", [TeamError])
 async def get_teams_by_user_org(
+    page: PageParams = Depends(),
     user_data: UserData = Depends(get_user_data_from_request),
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = TeamService(connection_handler)
-    teams = await service.get_teams_by_user_org(user_data.orgId, user_data.userId)
+    teams = await service.get_teams_by_user_org(user_data.orgId, user_data.userId, page)
     return ResponseData.model_construct(success=True, data=teams)
 
 
@@ -88,13 +90,26 @@ async def add_team_member(
     return ResponseData.model_construct(success=True, data=response_data)
 
 
+@handle_exceptions("Failed to add team members", [TeamError])
+async def bulk_add_team_members(
+        team_id: UUID,
+        members: TeamMemberBulkAddSchema,
+        user_data: UserData = Depends(get_user_data_from_request),
+        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    service = TeamMembershipService(connection_handler)
+    result = await service.bulk_add_members(team_id, members, user_data.userId)
+    return ResponseData.model_construct(success=True, data=result)
+
+
 @handle_exceptions("Failed to list team members", [TeamError])
 async def get_team_members(
     team_id: UUID,
+    page: PageParams = Depends(),
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
 ):
     service = TeamMembershipService(connection_handler)
-    members = await service.get_members(team_id)
+    members = await service.get_members(team_id, page)
     return ResponseData.model_construct(success=True, data=members)
 
 
@@ -0,0 +1,47 @@
+"""Add effective datasource access index
+
+Revision ID: 3ab894072118
+Revises: fcf4d2f6c378
+Create Date: 2026-10-17 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ab894072118'
+down_revision: Union[str, None] = 'fcf4d2f6c378'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'effective_datasource_access',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('datasource_id', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'datasource_id')
+    )
+    op.create_index(op.f('ix_effective_datasource_access_datasource_id'), 'effective_datasource_access', ['datasource_id'], unique=False)
+
+    # Backfill from direct user grants and grants to teams with active memberships
+    op.execute(
+        sa.text("""
+            INSERT INTO effective_datasource_access (user_id, datasource_id)
+            SELECT user_id, datasource_id FROM datasource_access WHERE user_id IS NOT NULL
+            UNION
+            SELECT tm.user_id, da.datasource_id
+            FROM datasource_access da
+            JOIN team_memberships tm ON tm.team_id = da.team_id
+            WHERE tm.removed_at IS NULL
+            ON CONFLICT DO NOTHING
+        """)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_effective_datasource_access_datasource_id'), table_name='effective_datasource_access')
+    op.drop_table('effective_datasource_access')
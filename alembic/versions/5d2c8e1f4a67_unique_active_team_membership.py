@@ -0,0 +1,48 @@
+"""Unique active team membership
+
+Revision ID: 5d2c8e1f4a67
+Revises: 3ab894072118
+Create Date: 2026-10-17 14:05:12.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c8e1f4a67'
+down_revision: Union[str, None] = '3ab894072118'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Soft-remove duplicate active memberships, keeping the oldest one per (team_id, user_id)
+    op.execute(
+        sa.text("""
+            UPDATE team_memberships tm
+            SET removed_at = EXTRACT(EPOCH FROM now())::bigint
+            FROM (
+                SELECT membership_id,
+                       row_number() OVER (
+                           PARTITION BY team_id, user_id ORDER BY created_at, membership_id
+                       ) AS position
+                FROM team_memberships
+                WHERE removed_at IS NULL
+            ) ranked
+            WHERE tm.membership_id = ranked.membership_id AND ranked.position > 1
+        """)
+    )
+    op.create_index(
+        'uq_team_memberships_team_id_user_id_active',
+        'team_memberships',
+        ['team_id', 'user_id'],
+        unique=True,
+        postgresql_where=sa.text('removed_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_team_memberships_team_id_user_id_active', table_name='team_memberships')
@@ -0,0 +1,51 @@
+"""Unique datasource access grants
+
+Revision ID: 9c4e7b2a1d58
+Revises: 5d2c8e1f4a67
+Create Date: 2026-10-17 15:21:47.902311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e7b2a1d58'
+down_revision: Union[str, None] = '5d2c8e1f4a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRINCIPAL_COLUMNS = ('user_id', 'team_id', 'org_id')
+
+
+def upgrade() -> None:
+    for principal_column in PRINCIPAL_COLUMNS:
+        # Delete duplicate grants, keeping the oldest one per (datasource_id, principal)
+        op.execute(
+            sa.text(f"""
+                DELETE FROM datasource_access da
+                USING (
+                    SELECT access_id,
+                           row_number() OVER (
+                               PARTITION BY datasource_id, {principal_column} ORDER BY created_at, access_id
+                           ) AS position
+                    FROM datasource_access
+                    WHERE {principal_column} IS NOT NULL
+                ) ranked
+                WHERE da.access_id = ranked.access_id AND ranked.position > 1
+            """)
+        )
+        op.create_index(
+            f'uq_datasource_access_datasource_id_{principal_column}',
+            'datasource_access',
+            ['datasource_id', principal_column],
+            unique=True,
+            postgresql_where=sa.text(f'{principal_column} IS NOT NULL')
+        )
+
+
+def downgrade() -> None:
+    for principal_column in reversed(PRINCIPAL_COLUMNS):
+        op.drop_index(f'uq_datasource_access_datasource_id_{principal_column}', table_name='datasource_access')
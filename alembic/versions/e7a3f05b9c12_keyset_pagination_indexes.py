@@ -0,0 +1,36 @@
+"""Keyset pagination indexes
+
+Revision ID: e7a3f05b9c12
+Revises: 9c4e7b2a1d58
+Create Date: 2026-10-17 16:02:38.775140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3f05b9c12'
+down_revision: Union[str, None] = '9c4e7b2a1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_team_memberships_user_id_team_id_active', 'team_memberships', ['user_id', 'team_id'], unique=False, postgresql_where=sa.text('removed_at IS NULL'))
+    op.create_index('ix_team_memberships_team_id_membership_id_active', 'team_memberships', ['team_id', 'membership_id'], unique=False, postgresql_where=sa.text('removed_at IS NULL'))
+    op.create_index('ix_datasource_access_user_id_access_id', 'datasource_access', ['user_id', 'access_id'], unique=False)
+    op.create_index('ix_datasource_access_team_id_access_id', 'datasource_access', ['team_id', 'access_id'], unique=False)
+    op.create_index('ix_datasource_access_org_id_access_id', 'datasource_access', ['org_id', 'access_id'], unique=False)
+    op.create_index('ix_datasource_access_datasource_id_access_id', 'datasource_access', ['datasource_id', 'access_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_datasource_access_datasource_id_access_id', table_name='datasource_access')
+    op.drop_index('ix_datasource_access_org_id_access_id', table_name='datasource_access')
+    op.drop_index('ix_datasource_access_team_id_access_id', table_name='datasource_access')
+    op.drop_index('ix_datasource_access_user_id_access_id', table_name='datasource_access')
+    op.drop_index('ix_team_memberships_team_id_membership_id_active', table_name='team_memberships')
+    op.drop_index('ix_team_memberships_user_id_team_id_active', table_name='team_memberships')
@@ -1,16 +1,79 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.router import api_router
+from config.settings import loaded_config
+from RBAC.datasources.cache import access_decision_cache, ACCESS_DECISIONS_TOPIC
+from RBAC.roles.registry import ROLES_TOPIC, handle_role_created, load_role_registry
+from utils.auth import ClerkTokenVerifier
+from utils.cache import build_cache_backend
+from utils.connection_manager import ConnectionManager
+from utils.constants import PRODUCTION_ENVS
+from utils.prometheus import PrometheusMiddleware
+from utils.query_stats import QueryStatsMiddleware
+from utils.tracing import setup_tracing
+from utils.serializers import ORJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Set up the database pool, the shared cache tier, the role registry and token verification for the lifetime of a worker. """
+    if loaded_config.connection_manager is None:
+        loaded_config.connection_manager = ConnectionManager.from_config(loaded_config)
+    await loaded_config.connection_manager.start()
+
+    loaded_config.cache_backend = build_cache_backend(
+        loaded_config.cache_backend_type,
+        loaded_config.redis_url,
+        loaded_config.cache_max_size,
+        loaded_config.cache_ttl_seconds
+    )
+    if loaded_config.cache_backend is not None:
+        loaded_config.cache_backend.add_listener(ACCESS_DECISIONS_TOPIC, access_decision_cache.handle_invalidation)
+        loaded_config.cache_backend.add_listener(ROLES_TOPIC, handle_role_created)
+        await loaded_config.cache_backend.start()
+
+    session = loaded_config.connection_manager.get_session_factory()()
+    try:
+        await load_role_registry(session)
+    finally:
+        await session.close()
+
+    if not loaded_config.clerk_remote_auth:
+        loaded_config.clerk_token_verifier = ClerkTokenVerifier(
+            jwks_url=loaded_config.clerk_jwks_url,
+            secret_key=loaded_config.clerk_secret_key,
+            refresh_seconds=loaded_config.clerk_jwks_refresh_seconds,
+            cache_max_size=loaded_config.auth_cache_max_size,
+            authorized_parties=[
+                party.strip() for party in loaded_config.clerk_authorized_parties.split(",") if party.strip()
+            ]
+        )
+        await loaded_config.clerk_token_verifier.start()
+
+    yield
+
+    if loaded_config.clerk_token_verifier is not None:
+        await loaded_config.clerk_token_verifier.close()
+    if loaded_config.cache_backend is not None:
+        await loaded_config.cache_backend.close()
+    await loaded_config.connection_manager.close_connections()
+
+
 def get_app() -> FastAPI:
     """ Get FastAPI application. This is the main constructor of an application. :return: application. """
-    
+
     locksmith_app = FastAPI(
         debug=True,
         title="locksmith",
         docs_url="/api-reference",
         openapi_url="/openapi.json",
-        root_path="/"
+        root_path="/",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
 
     locksmith_app.add_middleware(
@@ -19,7 +82,27 @@ def get_app() -> FastAPI:
         allow_methods=["*"],  # Allows all methods
         allow_headers=["*"],  # Allows all headers
     )
-    
+
     locksmith_app.add_middleware(SessionMiddleware, secret_key="** Session Middleware **")
 
-    return locksmith_app
\ No newline at end of file
+    locksmith_app.add_middleware(
+        QueryStatsMiddleware,
+        query_budget=loaded_config.db_query_budget,
+        repeated_statement_limit=loaded_config.db_repeated_statement_limit,
+        add_headers=loaded_config.env.lower() not in PRODUCTION_ENVS
+    )
+
+    if loaded_config.prometheus:
+        locksmith_app.add_middleware(PrometheusMiddleware)
+
+    locksmith_app.include_router(api_router)
+
+    if loaded_config.otel_tracing:
+        setup_tracing(
+            locksmith_app,
+            exporter=loaded_config.otel_exporter,
+            sample_ratio=loaded_config.otel_sample_ratio,
+            file_path=loaded_config.otel_exporter_file
+        )
+
+    return locksmith_app
@@ -1,10 +1,13 @@
 import uvicorn
 
 from config.settings import loaded_config
+from utils.prometheus import reset_multiprocess_dir
 
 
 def main() -> None:
     """Entrypoint of the application."""
+    if loaded_config.prometheus:
+        reset_multiprocess_dir()
     uvicorn.run(
         "app.application:get_app",
         workers=loaded_config.workers_count,
@@ -2,9 +2,12 @@ from fastapi.routing import APIRouter
 from fastapi.responses import JSONResponse
 
 from config.settings import loaded_config
+from utils.prometheus import METRICS_PATH, metrics_endpoint
 
 from RBAC.teams.routes import router as teams_router
 from RBAC.roles.routes import router as roles_router
+from RBAC.datasources.routes import router as datasources_router, internal_router as datasources_internal_router
+from RBAC.exports.routes import router as exports_router
 
 
 async def healthz():
@@ -20,13 +23,18 @@ api_router_v1 = APIRouter(prefix='/v1.0')
 if loaded_config.server_type == "public":
     api_router_v1.include_router(teams_router)
     api_router_v1.include_router(roles_router)
+    api_router_v1.include_router(datasources_router)
+    api_router_v1.include_router(exports_router)
 else:
     """ all common routes """
+    api_router_v1.include_router(datasources_internal_router)
 
 """ health check routes """
 api_router_healthz = APIRouter()
 api_router_healthz.add_api_route("/_healthz", methods=['GET'], endpoint=healthz, include_in_schema=False)
 api_router_healthz.add_api_route("/_readyz", methods=['GET'], endpoint=healthz, include_in_schema=False)
+if loaded_config.prometheus:
+    api_router_healthz.add_api_route(METRICS_PATH, methods=['GET'], endpoint=metrics_endpoint, include_in_schema=False)
 
 api_router.include_router(api_router_healthz)
 api_router.include_router(api_router_v1)
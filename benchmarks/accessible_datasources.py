@@ -0,0 +1,110 @@
+"""
+Benchmark: latency of get_accessible_datasources_by_user as team membership grows.
+
+Compares the previous per-team implementation (get_teams_by_user + one get_by_team
+query per team) with the single-query DataSourceAccessDAO.get_accessible_datasource_ids.
+
+Seed data is written inside one transaction that is rolled back at the end, so the
+benchmark can run against any database migrated to head.
+
+Usage:
+    python -m benchmarks.accessible_datasources --team-counts 1 5 10 20 40 80 --runs 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import uuid6
+from sqlalchemy import select
+
+from RBAC.datasources.dao import DataSourceAccessDAO
+from RBAC.datasources.models import DataSourceAccess
+from RBAC.roles.models import TeamRoles
+from RBAC.roles.schemas import TeamRoleEnum
+from RBAC.teams.dao import TeamMembershipsDAO
+from RBAC.teams.models import Teams, TeamMemberships
+from config.settings import loaded_config
+from utils.connection_manager import ConnectionManager
+
+BENCH_ORG_ID = "org_benchmark"
+
+
+async def seed(session, user_id: str, team_count: int, grants_per_team: int, role_id):
+    for team_number in range(team_count):
+        team_id = uuid6.uuid6()
+        session.add(Teams(
+            team_id=team_id,
+            org_id=BENCH_ORG_ID,
+            name=f"bench-team-{team_number}",
+            team_slug=f"bench-{team_id}",
+            created_by=user_id
+        ))
+        session.add(TeamMemberships(
+            membership_id=uuid6.uuid6(),
+            team_id=team_id,
+            user_id=user_id,
+            role_id=role_id
+        ))
+        for grant_number in range(grants_per_team):
+            session.add(DataSourceAccess(
+                access_id=uuid6.uuid6(),
+                datasource_id=team_number * grants_per_team + grant_number,
+                team_id=team_id
+            ))
+    await session.flush()
+
+
+async def per_team_lookup(session, user_id: str):
+    dao = DataSourceAccessDAO(session)
+    result = {"personal": [], "team": [], "organization": []}
+    result["personal"] = [access.datasource_id for access in await dao.get_by_user(user_id)]
+    for team in await TeamMembershipsDAO(session).get_teams_by_user(user_id):
+        result["team"].extend(access.datasource_id for access in await dao.get_by_team(team.team_id))
+    result["team"] = list(set(result["team"]))
+    result["organization"] = [access.datasource_id for access in await dao.get_by_org(BENCH_ORG_ID)]
+    return result
+
+
+async def single_query_lookup(session, user_id: str):
+    return await DataSourceAccessDAO(session).get_accessible_datasource_ids(user_id, BENCH_ORG_ID)
+
+
+async def measure(lookup, session, user_id: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await lookup(session, user_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--team-counts", type=int, nargs="+", default=[1, 5, 10, 20, 40, 80, 160])
+    parser.add_argument("--grants-per-team", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20)
+    args, _ = parser.parse_known_args()
+
+    connection_manager = ConnectionManager(loaded_config.db_url, False)
+    session = connection_manager.get_session_factory()()
+    try:
+        role_id = await session.scalar(
+            select(TeamRoles.role_id).where(TeamRoles.role_slug == TeamRoleEnum.MEMBER.value)
+        )
+        print(f"{'teams':>6} {'per-team (ms)':>14} {'single query (ms)':>18}")
+        for team_count in args.team_counts:
+            user_id = f"user_benchmark_{team_count}"
+            await seed(session, user_id, team_count, args.grants_per_team, role_id)
+            per_team_ms = await measure(per_team_lookup, session, user_id, args.runs)
+            single_query_ms = await measure(single_query_lookup, session, user_id, args.runs)
+            print(f"{team_count:>6} {per_team_ms:>14.2f} {single_query_ms:>18.2f}")
+    finally:
+        await session.rollback()
+        await session.close()
+        await connection_manager.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
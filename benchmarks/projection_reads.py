@@ -0,0 +1,113 @@
+"""
+Benchmark: CPU time and memory of reading grants as ORM entities vs column projections.
+
+Compares, over the grants of one team:
+- entity: select(DataSourceAccess), then DataSourceAccessSchema.model_validate per row,
+  the previous get_by_team / get_access_by_team path
+- projection: select(*GRANT_COLUMNS) named tuple rows validated in one
+  DATASOURCE_ACCESS_LIST call, the current path
+and the same two fetch modes for the principal-only reads of get_all_entities_with_access.
+
+Memory is the tracemalloc peak of one read. Seed data is written inside one transaction that
+is rolled back at the end, so the benchmark can run against any database migrated to head.
+
+Usage:
+    python -m benchmarks.projection_reads --rows 100000 --runs 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+import uuid6
+from sqlalchemy import insert, select
+
+from RBAC.datasources.dao import GRANT_COLUMNS, PRINCIPAL_COLUMNS
+from RBAC.datasources.models import DataSourceAccess
+from RBAC.datasources.schemas import DataSourceAccessSchema, DATASOURCE_ACCESS_LIST
+from config.settings import loaded_config
+from utils.connection_manager import ConnectionManager
+
+SEED_BATCH_SIZE = 10000
+
+
+async def seed(session, team_id, row_count: int):
+    for start in range(0, row_count, SEED_BATCH_SIZE):
+        await session.execute(insert(DataSourceAccess), [
+            {"access_id": uuid6.uuid6(), "datasource_id": datasource_id, "team_id": team_id}
+            for datasource_id in range(start, min(start + SEED_BATCH_SIZE, row_count))
+        ])
+    await session.flush()
+
+
+async def entity_grants(session, team_id):
+    result = await session.execute(
+        select(DataSourceAccess).where(DataSourceAccess.team_id == team_id).order_by(DataSourceAccess.access_id)
+    )
+    grants = [DataSourceAccessSchema.model_validate(access) for access in result.scalars().all()]
+    session.expunge_all()
+    return grants
+
+
+async def projection_grants(session, team_id):
+    result = await session.execute(
+        select(*GRANT_COLUMNS).where(DataSourceAccess.team_id == team_id).order_by(DataSourceAccess.access_id)
+    )
+    return DATASOURCE_ACCESS_LIST.validate_python(result.all(), from_attributes=True)
+
+
+async def entity_principals(session, team_id):
+    result = await session.execute(select(DataSourceAccess).where(DataSourceAccess.team_id == team_id))
+    team_ids = [access.team_id for access in result.scalars().all() if access.team_id is not None]
+    session.expunge_all()
+    return team_ids
+
+
+async def projection_principals(session, team_id):
+    result = await session.execute(select(*PRINCIPAL_COLUMNS).where(DataSourceAccess.team_id == team_id))
+    return [access.team_id for access in result.all() if access.team_id is not None]
+
+
+async def measure(read, session, team_id, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.process_time()
+        await read(session, team_id)
+        timings.append((time.process_time() - started) * 1000)
+
+    tracemalloc.start()
+    await read(session, team_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2 ** 20
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args, _ = parser.parse_known_args()
+
+    connection_manager = ConnectionManager(loaded_config.db_url, False)
+    session = connection_manager.get_session_factory()()
+    try:
+        team_id = uuid6.uuid6()
+        await seed(session, team_id, args.rows)
+        print(f"{'read':>12} {'fetch mode':>11} {'cpu (ms)':>9} {'peak (MiB)':>11}")
+        for name, reads in (
+            ("grants", (("entity", entity_grants), ("projection", projection_grants))),
+            ("principals", (("entity", entity_principals), ("projection", projection_principals))),
+        ):
+            for mode, read in reads:
+                cpu_ms, peak_mib = await measure(read, session, team_id, args.runs)
+                print(f"{name:>12} {mode:>11} {cpu_ms:>9.1f} {peak_mib:>11.1f}")
+    finally:
+        await session.rollback()
+        await session.close()
+        await connection_manager.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
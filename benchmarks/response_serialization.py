@@ -0,0 +1,87 @@
+"""
+Benchmark: cost of serializing a get_members response.
+
+Compares the previous pipeline (FastAPI's jsonable_encoder over the ResponseData envelope,
+then JSONResponse's json.dumps) with ORJSONResponse rendering the envelope directly. The
+payload is a page of member dicts as TeamMembershipsDAO.get_members builds them, each with a
+Clerk profile, plus the same members as TeamMembershipResponse models to cover nested pydantic
+data. No database is needed.
+
+Usage:
+    python -m benchmarks.response_serialization --members 10000 --runs 20
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+
+import uuid6
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from RBAC.teams.schemas import TeamMembershipResponse
+from utils.serializers import ORJSONResponse, ResponseData
+
+
+def build_members(count: int):
+    team_id = uuid6.uuid6()
+    role_id = uuid6.uuid6()
+    members = []
+    for number in range(count):
+        user_id = f"user_{number}"
+        members.append({
+            "membership_id": str(uuid6.uuid6()),
+            "user_id": user_id,
+            "team_id": str(team_id),
+            "role_id": str(role_id),
+            "role_name": "Member",
+            "clerk_user": {
+                "id": user_id,
+                "first_name": "Bench",
+                "last_name": f"User {number}",
+                "email_addresses": [{"email_address": f"{user_id}@example.com"}],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            },
+        })
+    models = [TeamMembershipResponse(team_id=team_id, user_id=member["user_id"], role_id=role_id) for member in members]
+    return members, models
+
+
+def previous_pipeline(data) -> bytes:
+    return JSONResponse(content=jsonable_encoder(ResponseData.model_construct(success=True, data=data))).body
+
+
+def orjson_pipeline(data) -> bytes:
+    return ORJSONResponse(content=ResponseData.model_construct(success=True, data=data)).body
+
+
+def measure(pipeline, data, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pipeline(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args, _ = parser.parse_known_args()
+
+    members, models = build_members(args.members)
+    payloads = {
+        "member dicts": {"items": members, "next_cursor": None},
+        "pydantic models": models,
+    }
+    print(f"{'payload':>16} {'jsonable_encoder (ms)':>22} {'orjson (ms)':>12} {'speedup':>8}")
+    for name, data in payloads.items():
+        previous_ms = measure(previous_pipeline, data, args.runs)
+        orjson_ms = measure(orjson_pipeline, data, args.runs)
+        print(f"{name:>16} {previous_ms:>22.2f} {orjson_ms:>12.2f} {previous_ms / orjson_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,8 +22,30 @@ parser.add('--realm', help='realm')
 # debug flag
 parser.add('--debug', help='debug', action="store_true")
 parser.add('--postgres_fynix_locksmith_read_write', help='postgres_fynix_locksmith_read_write')
+# database pool
+parser.add('--db_pool_size', help='db_pool_size', type=int, default=5)
+parser.add('--db_max_overflow', help='db_max_overflow', type=int, default=10)
+parser.add('--db_pool_timeout', help='seconds to wait for a pooled connection', type=float, default=30)
+parser.add('--db_pool_recycle', help='seconds after which pooled connections are replaced, -1 disables', type=int, default=-1)
+parser.add('--db_pool_pre_ping', help='db_pool_pre_ping', action="store_true")
+parser.add('--db_statement_cache_size', help='asyncpg prepared statement cache size, 0 disables', type=int, default=100)
+# read replicas, comma separated; read-only calls go to a replica whose lag is within db_replica_max_lag_seconds
+parser.add('--postgres_fynix_locksmith_read_replicas', help='postgres_fynix_locksmith_read_replicas', default='')
+parser.add('--db_replica_max_lag_seconds', help='db_replica_max_lag_seconds', type=float, default=5)
+parser.add('--db_replica_lag_check_seconds', help='db_replica_lag_check_seconds', type=float, default=5)
+# per-request statement counting: warn above db_query_budget statements, or when one statement
+# shape runs more than db_repeated_statement_limit times (N+1); 0 disables either check
+parser.add('--db_query_budget', help='db_query_budget', type=int, default=50)
+parser.add('--db_repeated_statement_limit', help='db_repeated_statement_limit', type=int, default=10)
 # prometheus flag
 parser.add('--prometheus', help='prometheus', action="store_true")
+# shared by all workers so /metrics aggregates them; wiped when the server starts
+parser.add('--prometheus_multiproc_dir', help='prometheus_multiproc_dir', default='')
+# opentelemetry tracing: spans for requests, views, services, DAOs, SQL statements and Clerk calls
+parser.add('--otel_tracing', help='otel_tracing', action="store_true")
+parser.add('--otel_exporter', help='console, file, memory (tests) or otlp', choices=['console', 'file', 'memory', 'otlp'], default='otlp')
+parser.add('--otel_exporter_file', help='JSON lines output of the file exporter', default='traces.jsonl')
+parser.add('--otel_sample_ratio', help='share of new traces sampled; children follow their parent', type=float, default=1.0)
 
 parser.add('--K8S_NODE_NAME', help='K8S_NODE_NAME')
 parser.add('--K8S_POD_NAMESPACE', help='K8S_POD_NAMESPACE')
@@ -38,6 +60,48 @@ parser.add('--google_app_secret', help='GOOGLE_APP_SECRET')
 parser.add('--kafka_broker_list', help='KAFKA_BROKER_LIST')
 
 parser.add('--clerk_secret_key', help='clerk_secret_key')
+# session tokens are verified locally against the JWKS unless clerk_remote_auth is set
+parser.add('--clerk_remote_auth', help='clerk_remote_auth', action="store_true")
+parser.add('--clerk_jwks_url', help='clerk_jwks_url', default='https://api.clerk.com/v1/jwks')
+parser.add('--clerk_jwks_refresh_seconds', help='clerk_jwks_refresh_seconds', type=float, default=3600)
+parser.add('--clerk_authorized_parties', help='comma separated azp values to accept, empty accepts any', default='')
+parser.add('--auth_cache_max_size', help='auth_cache_max_size', type=int, default=10000)
+
+# check_access decision cache
+parser.add('--access_cache_max_size', help='access_cache_max_size', type=int, default=10000)
+parser.add('--access_cache_ttl_seconds', help='access_cache_ttl_seconds', type=float, default=30)
+parser.add('--check_access_batch_limit', help='check_access_batch_limit', type=int, default=1000)
+
+# shared cache tier: none | memory | redis. memory is per process, so a write only invalidates
+# its own worker; use it for tests, benchmarks and single-process runs, redis otherwise
+parser.add('--cache_backend_type', help='cache_backend_type', choices=['none', 'memory', 'redis'], default='none')
+parser.add('--redis_url', help='redis_url', default='redis://127.0.0.1:6379/0')
+parser.add('--cache_max_size', help='cache_max_size', type=int, default=50000)
+parser.add('--cache_ttl_seconds', help='cache_ttl_seconds', type=float, default=60)
+
+# clerk org member paging
+parser.add('--clerk_org_members_page_size', help='clerk_org_members_page_size', type=int, default=100)
+parser.add('--clerk_org_members_concurrency', help='clerk_org_members_concurrency', type=int, default=5)
+
+# clerk user profile cache
+parser.add('--clerk_profile_cache_max_size', help='clerk_profile_cache_max_size', type=int, default=10000)
+parser.add('--clerk_profile_ttl_seconds', help='clerk_profile_ttl_seconds', type=float, default=300)
+parser.add('--clerk_profile_stale_seconds', help='clerk_profile_stale_seconds', type=float, default=3600)
+
+# keyset pagination of list endpoints
+parser.add('--page_size_default', help='page_size_default', type=int, default=50)
+parser.add('--page_size_max', help='page_size_max', type=int, default=500)
+# compatibility: return whole lists when a request has neither limit nor cursor (to be removed next release)
+parser.add('--legacy_unpaginated_lists', help='legacy_unpaginated_lists', action="store_true")
+
+# org export
+parser.add('--export_batch_size', help='rows fetched per round trip by server-side export cursors', type=int, default=1000)
+parser.add('--import_batch_size', help='rows buffered per COPY into the staging tables of a bundle import', type=int, default=10000)
+
+# bulk writes
+parser.add('--bulk_member_add_limit', help='bulk_member_add_limit', type=int, default=10000)
+parser.add('--bulk_access_limit', help='bulk_access_limit', type=int, default=100000)
+parser.add('--bulk_write_chunk_size', help='rows per multi-row INSERT/DELETE statement', type=int, default=1000)
 
 arguments = sys.argv
 print(arguments)
@@ -45,3 +109,9 @@ argument_options = parser.parse_known_args(arguments)
 # print("argument values")
 print(parser.format_values())
 docker_args = argument_options[0]
+
+# prometheus_client picks multiprocess mode when it is first imported, so export the directory
+# before anything imports it; worker processes inherit it
+if docker_args.prometheus and docker_args.prometheus_multiproc_dir:
+    os.environ.setdefault('prometheus_multiproc_dir', docker_args.prometheus_multiproc_dir)
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', docker_args.prometheus_multiproc_dir)
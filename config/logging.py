@@ -7,6 +7,7 @@ from structlog_sentry import SentryProcessor
 
 from config.settings import loaded_config
 from utils.constants import UTC_TIME_ZONE
+from utils.tracing import add_trace_context
 from pytz import timezone
 
 def get_current_time(time_zone: str = UTC_TIME_ZONE):
@@ -30,6 +31,7 @@ def get_logger(*args, **kwargs) -> BoundLogger:
         processors=[
             structlog.processors.TimeStamper(fmt="iso"),
             contextvars.merge_contextvars,
+            add_trace_context,
             structlog.processors.add_log_level,
             structlog.processors.StackInfoRenderer(),
             SentryProcessor(level=logging.ERROR),
@@ -1,12 +1,14 @@
 import enum
 import os
-from typing import Optional, ClassVar
+from typing import Optional, ClassVar, List
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from clerk_integration.utils import ClerkAuthHelper
 from pydantic_settings import BaseSettings
 from config.config_parser import docker_args
 
+from utils.auth import ClerkTokenVerifier
+from utils.cache import CacheBackend
 from utils.connection_manager import ConnectionManager
 from utils.sqlalchemy import async_db_url
 
@@ -34,9 +36,30 @@ class Settings(BaseSettings):
     postgres_fynix_locksmith_read_write: str = args.postgres_fynix_locksmith_read_write
     db_url: str = async_db_url(args.postgres_fynix_locksmith_read_write)
     db_echo: bool = args.debug
+    db_pool_size: int = args.db_pool_size
+    db_max_overflow: int = args.db_max_overflow
+    db_pool_timeout: float = args.db_pool_timeout
+    db_pool_recycle: int = args.db_pool_recycle
+    db_pool_pre_ping: bool = args.db_pool_pre_ping
+    db_statement_cache_size: int = args.db_statement_cache_size
+    db_replica_urls: List[str] = [
+        async_db_url(replica_url.strip())
+        for replica_url in args.postgres_fynix_locksmith_read_replicas.split(",")
+        if replica_url.strip()
+    ]
+    db_replica_max_lag_seconds: float = args.db_replica_max_lag_seconds
+    db_replica_lag_check_seconds: float = args.db_replica_lag_check_seconds
+    db_query_budget: int = args.db_query_budget
+    db_repeated_statement_limit: int = args.db_repeated_statement_limit
     server_type: str = args.server_type
     realm: str = args.realm
     log_level: str = LogLevel.INFO.value
+    prometheus: bool = args.prometheus
+    prometheus_multiproc_dir: str = args.prometheus_multiproc_dir
+    otel_tracing: bool = args.otel_tracing
+    otel_exporter: str = args.otel_exporter
+    otel_exporter_file: str = args.otel_exporter_file
+    otel_sample_ratio: float = args.otel_sample_ratio
     connection_manager: Optional[ConnectionManager] = None
 
     kafka_bootstrap_servers: str = args.kafka_broker_list
@@ -53,5 +76,39 @@ class Settings(BaseSettings):
 
     clerk_secret_key: str = args.clerk_secret_key
     clerk_auth_helper: ClerkAuthHelper = ClerkAuthHelper("locksmith", clerk_secret_key=clerk_secret_key)
+    clerk_remote_auth: bool = args.clerk_remote_auth
+    clerk_jwks_url: str = args.clerk_jwks_url
+    clerk_jwks_refresh_seconds: float = args.clerk_jwks_refresh_seconds
+    clerk_authorized_parties: str = args.clerk_authorized_parties
+    auth_cache_max_size: int = args.auth_cache_max_size
+    clerk_token_verifier: Optional[ClerkTokenVerifier] = None
+
+    access_cache_max_size: int = args.access_cache_max_size
+    access_cache_ttl_seconds: float = args.access_cache_ttl_seconds
+    check_access_batch_limit: int = args.check_access_batch_limit
+
+    cache_backend_type: str = args.cache_backend_type
+    redis_url: str = args.redis_url
+    cache_max_size: int = args.cache_max_size
+    cache_ttl_seconds: float = args.cache_ttl_seconds
+    cache_backend: Optional[CacheBackend] = None
+
+    clerk_org_members_page_size: int = args.clerk_org_members_page_size
+    clerk_org_members_concurrency: int = args.clerk_org_members_concurrency
+
+    clerk_profile_cache_max_size: int = args.clerk_profile_cache_max_size
+    clerk_profile_ttl_seconds: float = args.clerk_profile_ttl_seconds
+    clerk_profile_stale_seconds: float = args.clerk_profile_stale_seconds
+
+    page_size_default: int = args.page_size_default
+    page_size_max: int = args.page_size_max
+    legacy_unpaginated_lists: bool = args.legacy_unpaginated_lists
+
+    export_batch_size: int = args.export_batch_size
+    import_batch_size: int = args.import_batch_size
+
+    bulk_member_add_limit: int = args.bulk_member_add_limit
+    bulk_access_limit: int = args.bulk_access_limit
+    bulk_write_chunk_size: int = args.bulk_write_chunk_size
 
 loaded_config = Settings()
@@ -5,9 +5,10 @@ This script provides utilities for setting up and initializing the catalyst AI A
 It handles database migrations using Alembic and seeds initial model configurations.
 
 Usage:
-    python startup.py --migrate  # Run database migrations
-    python startup.py --all      # Run both migrations and seeding
-    python startup.py            # Show help message
+    python startup.py --migrate               # Run database migrations
+    python startup.py --all                   # Run both migrations and seeding
+    python startup.py --rebuild-access-index  # Rebuild effective_datasource_access from scratch
+    python startup.py                         # Show help message
 
 The script uses the same database connection handling as the main application,
 ensuring consistency across the codebase.
@@ -34,6 +35,30 @@ async def run_alembic_upgrade():
     print("Alembic migrations completed successfully")
 
 
+async def rebuild_access_index():
+    """
+    Rebuild the effective datasource access index.
+
+    The index is maintained incrementally on every grant and membership change; this
+    re-derives it from datasource_access and team_memberships in a single transaction
+    to repair drift.
+    """
+    from config.settings import loaded_config
+    from utils.connection_manager import ConnectionManager
+    from RBAC.datasources.dao import EffectiveAccessDAO
+
+    print("Rebuilding effective datasource access index...")
+    connection_manager = ConnectionManager.from_config(loaded_config)
+    session = connection_manager.get_session_factory()()
+    try:
+        await EffectiveAccessDAO(session).rebuild()
+        await session.commit()
+    finally:
+        await session.close()
+        await connection_manager.close_connections()
+    print("Effective datasource access index rebuilt successfully")
+
+
 
 async def main():
     """
@@ -46,15 +71,18 @@ async def main():
     Command line arguments:
         --migrate: Run database migrations
         --all: Run both migrations and seeding
+        --rebuild-access-index: Rebuild the effective datasource access index
     """
     parser = argparse.ArgumentParser(description="Database setup and initialization script")
     parser.add_argument("--migrate", action="store_true", help="Run database migrations")
     parser.add_argument("--all", action="store_true", help="Run both migrations and seeding")
+    parser.add_argument("--rebuild-access-index", action="store_true",
+                        help="Rebuild the effective datasource access index")
 
     args = parser.parse_args()
 
     # If no arguments provided, show help
-    if not (args.migrate or args.all):
+    if not (args.migrate or args.all or args.rebuild_access_index):
         parser.print_help()
         return
 
@@ -62,6 +90,8 @@ async def main():
     if args.migrate or args.all:
         await run_alembic_upgrade()
 
+    if args.rebuild_access_index:
+        await rebuild_access_index()
 
     print("Requested startup tasks completed successfully")
 
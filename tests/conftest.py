@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.settings import loaded_config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# postgresql+asyncpg URLs of two scratch databases; the tests that need them are skipped otherwise
+PRIMARY_DATABASE_URL_ENV = "LOCKSMITH_TEST_DATABASE_URL"
+REPLICA_DATABASE_URL_ENV = "LOCKSMITH_TEST_REPLICA_DATABASE_URL"
+
+# Every table the tests write to; team_roles keeps the rows its migration pre-populates
+TABLES = ("effective_datasource_access", "datasource_access", "team_memberships", "teams")
+
+
+def _migrated_database(env_var: str) -> str:
+    """Bring the database named by env_var to the head migration and return its URL."""
+    db_url = os.getenv(env_var)
+    if not db_url:
+        pytest.skip(f"{env_var} is not set")
+
+    alembic_config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    alembic_config.set_main_option("script_location", os.path.join(ROOT_DIR, "alembic"))
+    # alembic/env.py connects to loaded_config.db_url
+    configured_db_url = loaded_config.db_url
+    loaded_config.db_url = db_url
+    try:
+        command.upgrade(alembic_config, "head")
+    finally:
+        loaded_config.db_url = configured_db_url
+    return db_url
+
+
+async def _truncate(db_url: str):
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text(f"TRUNCATE {', '.join(TABLES)} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def migrated_primary_url():
+    return _migrated_database(PRIMARY_DATABASE_URL_ENV)
+
+
+@pytest.fixture(scope="session")
+def migrated_replica_url():
+    return _migrated_database(REPLICA_DATABASE_URL_ENV)
+
+
+@pytest.fixture
+async def primary_database(migrated_primary_url):
+    """URL of the primary test database, emptied before the test."""
+    await _truncate(migrated_primary_url)
+    return migrated_primary_url
+
+
+@pytest.fixture
+async def replica_database(migrated_replica_url):
+    """
+    URL of a second database standing in for a read replica, emptied before the test. Nothing
+    replicates into it, so a row written to only one of the two shows which one served a read.
+    """
+    await _truncate(migrated_replica_url)
+    return migrated_replica_url
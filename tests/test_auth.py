@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from utils.auth import ClerkTokenVerifier, TokenVerificationError
+
+AUTHORIZED_PARTY = "https://app.example.com"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class SigningKey:
+    """A local RSA key pair standing in for one of Clerk's signing keys."""
+
+    def __init__(self, kid: str):
+        self.kid = kid
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        self.jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+    def sign(self, expires_in: float = 60, **claims) -> str:
+        now = int(time.time())
+        payload = {"sub": "user_1", "org_id": "org_1", "azp": AUTHORIZED_PARTY, "iat": now, "exp": now + expires_in}
+        payload.update(claims)
+        return jwt.encode(payload, self.private_pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def signing_key():
+    return SigningKey("key_1")
+
+
+@pytest.fixture
+def verifier(clock, signing_key):
+    verifier = ClerkTokenVerifier(
+        jwks_url="http://jwks.invalid",
+        secret_key=None,
+        refresh_seconds=3600,
+        cache_max_size=100,
+        authorized_parties=[AUTHORIZED_PARTY],
+        clock=clock,
+    )
+    verifier.set_keys({"keys": [signing_key.jwk]})
+    return verifier
+
+
+async def test_valid_token_returns_user_data(verifier, signing_key):
+    user_data = await verifier.get_user_data(signing_key.sign())
+
+    assert user_data.userId == "user_1"
+    assert user_data.orgId == "org_1"
+
+
+async def test_expired_token_is_rejected(verifier, signing_key):
+    with pytest.raises(TokenVerificationError):
+        await verifier.get_user_data(signing_key.sign(expires_in=-60))
+
+
+async def test_wrong_authorized_party_is_rejected(verifier, signing_key):
+    with pytest.raises(TokenVerificationError):
+        await verifier.get_user_data(signing_key.sign(azp="https://elsewhere.example.com"))
+
+
+async def test_unknown_key_id_refreshes_the_jwks(verifier, clock, signing_key):
+    rotated_key = SigningKey("key_2")
+    refreshes = []
+
+    async def load_keys():
+        refreshes.append(clock())
+        await asyncio.sleep(0)
+        verifier.set_keys({"keys": [signing_key.jwk, rotated_key.jwk]})
+
+    verifier._load_keys = load_keys
+    clock.advance(ClerkTokenVerifier.MIN_REFRESH_INTERVAL_SECONDS)
+
+    users = await asyncio.gather(*(verifier.get_user_data(rotated_key.sign(sub=f"user_{i}")) for i in range(10)))
+
+    assert [user_data.userId for user_data in users] == [f"user_{i}" for i in range(10)]
+    assert len(refreshes) == 1
+
+
+async def test_unknown_key_id_refresh_is_rate_limited(verifier, clock, signing_key):
+    unknown_key = SigningKey("key_2")
+    refreshes = []
+
+    async def load_keys():
+        refreshes.append(clock())
+        # Yield so the rest of the burst queues on the refresh lock
+        await asyncio.sleep(0)
+        verifier.set_keys({"keys": [signing_key.jwk]})
+
+    verifier._load_keys = load_keys
+
+    with pytest.raises(TokenVerificationError):
+        await verifier.get_user_data(unknown_key.sign())
+    assert refreshes == []
+
+    clock.advance(ClerkTokenVerifier.MIN_REFRESH_INTERVAL_SECONDS)
+    results = await asyncio.gather(
+        *(verifier.get_user_data(unknown_key.sign(sub=f"user_{i}")) for i in range(10)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, TokenVerificationError) for result in results)
+    assert len(refreshes) == 1
+
+
+async def test_failed_unknown_key_id_refresh_is_rate_limited(verifier, clock, signing_key):
+    refreshes = []
+
+    async def load_keys():
+        refreshes.append(clock())
+        await asyncio.sleep(0)
+        raise RuntimeError("JWKS unavailable")
+
+    verifier._load_keys = load_keys
+    clock.advance(ClerkTokenVerifier.MIN_REFRESH_INTERVAL_SECONDS)
+
+    results = await asyncio.gather(
+        *(verifier.get_user_data(SigningKey("key_2").sign()) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, TokenVerificationError) for result in results)
+    assert len(refreshes) == 1
+
+
+async def test_user_data_is_cached_until_the_token_expires(verifier, clock, signing_key):
+    verifications = []
+    verify = verifier.verify
+
+    async def counting_verify(token):
+        verifications.append(token)
+        return await verify(token)
+
+    verifier.verify = counting_verify
+    token = signing_key.sign(expires_in=60)
+
+    await verifier.get_user_data(token)
+    clock.advance(30)
+    await verifier.get_user_data(token)
+    assert len(verifications) == 1
+
+    clock.advance(31)
+    await verifier.get_user_data(token)
+    assert len(verifications) == 2
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from utils.clerk_profiles import ClerkProfileCache
+
+
+@pytest.fixture
+def profile_cache():
+    return ClerkProfileCache(max_size=100, ttl_seconds=60, stale_seconds=60)
+
+
+async def test_a_cancelled_fetch_releases_its_waiters(profile_cache):
+    fetch_started = asyncio.Event()
+
+    async def hanging_fetch(user_ids):
+        fetch_started.set()
+        await asyncio.Event().wait()
+
+    lookup = asyncio.create_task(profile_cache.get_profiles(["user_1"], hanging_fetch))
+    await fetch_started.wait()
+    for task in list(profile_cache._tasks):
+        task.cancel()
+
+    assert await asyncio.wait_for(lookup, timeout=1) == {}
+    assert profile_cache.stats()["inflight"] == 0
+
+    async def fetch(user_ids):
+        return {user_id: {"id": user_id} for user_id in user_ids}
+
+    profiles = await asyncio.wait_for(profile_cache.get_profiles(["user_1"], fetch), timeout=1)
+    assert profiles == {"user_1": {"id": "user_1"}}
+
+
+async def test_a_base_exception_from_the_fetcher_releases_its_waiters(profile_cache):
+    class Interrupted(BaseException):
+        pass
+
+    async def interrupted_fetch(user_ids):
+        raise Interrupted()
+
+    assert await asyncio.wait_for(profile_cache.get_profiles(["user_1"], interrupted_fetch), timeout=1) == {}
+    assert profile_cache.stats()["inflight"] == 0
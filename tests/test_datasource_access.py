@@ -0,0 +1,144 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from RBAC.datasources.dao import DataSourceAccessDAO, EffectiveAccessDAO
+from RBAC.datasources.models import DataSourceAccess, EffectiveDataSourceAccess
+from RBAC.datasources.schemas import DataSourceAccessSchema
+from RBAC.datasources.services import DataSourceAccessService
+from RBAC.roles.models import TeamRoles
+from RBAC.teams.dao import TeamMembershipsDAO
+from RBAC.teams.models import TeamMemberships, Teams
+from utils.connection_handler import ConnectionHandler
+from utils.connection_manager import ConnectionManager
+
+CONCURRENT_GRANTS = 20
+DATASOURCE_ID = 1
+TEAM_ID = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+USER_ID = "user_1"
+# Long enough for the second transaction to reach its refresh while the first is still open
+RACE_WINDOW_SECONDS = 0.5
+
+
+@pytest.fixture
+async def connection_manager(primary_database):
+    manager = ConnectionManager(primary_database, False, pool_size=CONCURRENT_GRANTS)
+    yield manager
+    await manager.close_connections()
+
+
+@pytest.mark.parametrize("principal", [
+    {"user_id": "user_1"},
+    {"team_id": uuid.UUID("00000000-0000-0000-0000-000000000001")},
+    {"org_id": "org_1"},
+], ids=["user", "team", "org"])
+async def test_concurrent_grants_to_one_principal_leave_one_row(connection_manager, principal):
+    payload = DataSourceAccessSchema(datasource_id=DATASOURCE_ID, **principal)
+    connected = 0
+    all_connected = asyncio.Event()
+
+    async def grant():
+        nonlocal connected
+        connection_handler = ConnectionHandler(connection_manager=connection_manager)
+        try:
+            # Every grant holds its own connection before any of them inserts, so the INSERTs race
+            await connection_handler.session.connection()
+            connected += 1
+            if connected == CONCURRENT_GRANTS:
+                all_connected.set()
+            await all_connected.wait()
+            await DataSourceAccessService(connection_handler).create_access(payload)
+        finally:
+            await connection_handler.close()
+
+    await asyncio.gather(*(grant() for _ in range(CONCURRENT_GRANTS)))
+
+    (principal_column, principal_id), = principal.items()
+    session = connection_manager.get_session_factory()()
+    try:
+        grants = await session.scalar(
+            select(func.count()).select_from(DataSourceAccess).where(
+                DataSourceAccess.datasource_id == DATASOURCE_ID,
+                getattr(DataSourceAccess, principal_column) == principal_id,
+            )
+        )
+    finally:
+        await session.close()
+    assert grants == 1
+
+
+@pytest.fixture
+async def sessions(primary_database):
+    """Sessions on independent connections, so one test can hold two open transactions."""
+    engine = create_async_engine(primary_database)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def membership(role_id, removed_at=None) -> dict:
+    return {
+        "membership_id": uuid.uuid4(), "team_id": TEAM_ID, "user_id": USER_ID,
+        "role_id": role_id, "removed_at": removed_at, "meta_data": {},
+    }
+
+
+async def create_team(sessions, active_member: bool):
+    async with sessions() as session:
+        role_id = await session.scalar(select(TeamRoles.role_id).limit(1))
+        await session.execute(insert(Teams).values(
+            team_id=TEAM_ID, org_id="org_1", team_slug="team-a", name="Team A", created_by="owner_1"
+        ))
+        if active_member:
+            await session.execute(insert(TeamMemberships).values(membership(role_id)))
+        await session.commit()
+        return role_id
+
+
+async def grant_team_access(session):
+    await DataSourceAccessDAO(session).create_access(
+        DataSourceAccessSchema(datasource_id=DATASOURCE_ID, team_id=TEAM_ID)
+    )
+    await session.commit()
+
+
+async def race_team_grant(sessions, membership_change):
+    """
+    Run membership_change in one transaction and, while it is still open, grant the team the
+    datasource in another; the membership change commits first.
+    """
+    async with sessions() as changing, sessions() as granting:
+        await membership_change(changing)
+        grant = asyncio.create_task(grant_team_access(granting))
+        await asyncio.sleep(RACE_WINDOW_SECONDS)
+        await changing.commit()
+        await grant
+
+    async with sessions() as session:
+        return await session.scalar(
+            select(func.count()).select_from(EffectiveDataSourceAccess).where(
+                EffectiveDataSourceAccess.user_id == USER_ID,
+                EffectiveDataSourceAccess.datasource_id == DATASOURCE_ID,
+            )
+        )
+
+
+async def test_a_team_grant_racing_a_member_removal_does_not_keep_the_member(sessions):
+    await create_team(sessions, active_member=True)
+
+    async def remove_member(session):
+        await TeamMembershipsDAO(session).remove_member(TEAM_ID, USER_ID)
+
+    assert await race_team_grant(sessions, remove_member) == 0
+
+
+async def test_a_team_grant_racing_a_member_addition_keeps_the_member(sessions):
+    role_id = await create_team(sessions, active_member=False)
+
+    async def add_member(session):
+        await session.execute(insert(TeamMemberships).values(membership(role_id)))
+        await EffectiveAccessDAO(session).refresh_membership(TEAM_ID, [USER_ID])
+
+    assert await race_team_grant(sessions, add_member) == 1
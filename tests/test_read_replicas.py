@@ -0,0 +1,114 @@
+import httpx
+import pytest
+from clerk_integration.utils import UserData
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.application import get_app
+from config.settings import loaded_config
+from RBAC.datasources.cache import access_decision_cache
+from utils.common import get_user_data_from_request
+from utils.connection_handler import READ_AFTER_HEADER
+from utils.connection_manager import ConnectionManager
+
+ORG_ID = "org_1"
+MAX_LAG_SECONDS = 5
+
+
+@pytest.fixture
+async def connection_manager(primary_database, replica_database, monkeypatch):
+    manager = ConnectionManager(
+        primary_database,
+        False,
+        replica_urls=[replica_database],
+        replica_max_lag_seconds=MAX_LAG_SECONDS,
+        replica_lag_check_seconds=MAX_LAG_SECONDS,
+    )
+    # A database that is not a standby reports no lag
+    await manager.check_replica_lag()
+    monkeypatch.setattr(loaded_config, "connection_manager", manager)
+    yield manager
+    await manager.close_connections()
+
+
+@pytest.fixture
+def app(connection_manager):
+    app = get_app()
+    app.dependency_overrides[get_user_data_from_request] = lambda: UserData(userId="user_1", orgId=ORG_ID)
+    return app
+
+
+def make_client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+async def insert_org_grant(db_url: str, datasource_id: int):
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(
+                text(
+                    "INSERT INTO datasource_access (access_id, datasource_id, org_id) "
+                    "VALUES (gen_random_uuid(), :datasource_id, :org_id)"
+                ),
+                {"datasource_id": datasource_id, "org_id": ORG_ID},
+            )
+    finally:
+        await engine.dispose()
+
+
+async def org_has_access(client: httpx.AsyncClient, datasource_id: int, headers=None) -> bool:
+    # Decisions are cached per process; clear them so every check reaches a database
+    access_decision_cache.clear()
+    response = await client.post(
+        "/v1.0/datasources/check/access",
+        json={"datasource_id": datasource_id, "org_id": ORG_ID},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.json()["data"]["access"]
+
+
+async def grant_org_access(client: httpx.AsyncClient, datasource_id: int) -> httpx.Response:
+    response = await client.post("/v1.0/datasources/access", json={"datasource_id": datasource_id, "org_id": ORG_ID})
+    assert response.status_code == 200
+    return response
+
+
+async def test_read_only_calls_go_to_the_replica(app, primary_database, replica_database):
+    await insert_org_grant(primary_database, 1)
+    await insert_org_grant(replica_database, 2)
+
+    async with make_client(app) as client:
+        assert await org_has_access(client, 1) is False
+        assert await org_has_access(client, 2) is True
+
+
+async def test_reads_follow_a_write_through_the_session_cookie(app, connection_manager):
+    async with make_client(app) as writer, make_client(app) as other_client:
+        await grant_org_access(writer, 1)
+
+        assert await org_has_access(writer, 1) is True
+        assert await org_has_access(other_client, 1) is False
+
+        # Once a lag check shows the replica has replayed past the write, reads go back to it
+        await connection_manager.check_replica_lag()
+        assert await org_has_access(writer, 1) is False
+
+
+async def test_reads_follow_a_write_through_the_read_after_header(app):
+    async with make_client(app) as writer, make_client(app) as reader:
+        response = await grant_org_access(writer, 1)
+        read_after = response.headers[READ_AFTER_HEADER]
+
+        assert await org_has_access(reader, 1, headers={READ_AFTER_HEADER: read_after}) is True
+        assert await org_has_access(reader, 1) is False
+
+
+async def test_a_replica_over_the_max_lag_is_skipped(app, connection_manager, primary_database):
+    await insert_org_grant(primary_database, 1)
+    connection_manager.REPLICA_LAG_QUERY = text(f"SELECT {MAX_LAG_SECONDS * 2}")
+    await connection_manager.check_replica_lag()
+
+    async with make_client(app) as client:
+        assert await org_has_access(client, 1) is True
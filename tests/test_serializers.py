@@ -0,0 +1,35 @@
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from RBAC.datasources.models import DataSourceAccess
+from RBAC.datasources.schemas import DataSourceResponseSchema
+from utils.serializers import ORJSONResponse, ResponseData
+from utils.sqlalchemy import get_current_time
+
+
+def test_orm_rows_render_as_jsonable_encoder_did():
+    now = get_current_time()
+    row = DataSourceAccess(
+        access_id=uuid.uuid4(), datasource_id=1, org_id="org_1", created_at=now, updated_at=now
+    )
+    response_data = ResponseData.model_construct(success=True, data={"access": [row]})
+
+    # pydantic 2 will not dump an ORM row inside the envelope, so encode the row as the fallback did
+    expected = JSONResponse(jsonable_encoder(response_data.model_dump())).body
+
+    assert ORJSONResponse(content=response_data).body == expected
+    assert f'"created_at":"{now.isoformat()}"'.encode() in expected
+
+
+def test_nested_models_render_as_jsonable_encoder_did():
+    datasource = DataSourceResponseSchema(
+        type="quip", config={"domain": "example.quip.com"}, datasource_id=1, added_by="user_1",
+        added_at=get_current_time(),
+    )
+    response_data = ResponseData.model_construct(success=True, data=[datasource])
+
+    expected = JSONResponse(jsonable_encoder(response_data)).body
+
+    assert ORJSONResponse(content=response_data).body == expected
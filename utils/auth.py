@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import structlog
+from clerk_integration.utils import UserData
+from jose import jwt, JWTError
+from starlette.requests import Request
+
+from utils.cache import LRUTTLCache
+from utils.metrics import observe_clerk_call
+
+logger = structlog.get_logger(__name__)
+
+
+class TokenVerificationError(Exception):
+    """The session token is missing, malformed, expired or not signed by a known key."""
+
+
+class KeysUnavailableError(Exception):
+    """No signing keys could be loaded, so the token cannot be verified locally."""
+
+
+class ClerkTokenVerifier:
+    """
+    Verifies Clerk session tokens locally against the instance's JWKS.
+
+    Signing keys are fetched once and refreshed in the background every refresh_seconds; a
+    token signed with a key id we do not know yet triggers an immediate (rate-limited) refresh
+    so key rotation does not need to wait for the next tick. Verified UserData is cached by
+    token hash until the token expires, so a token is verified once per worker.
+    """
+
+    ALGORITHMS = ["RS256"]
+    MIN_REFRESH_INTERVAL_SECONDS = 30
+
+    def __init__(
+        self,
+        jwks_url: str,
+        secret_key: Optional[str],
+        refresh_seconds: float,
+        cache_max_size: int,
+        leeway_seconds: int = 5,
+        authorized_parties: Optional[List[str]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.jwks_url = jwks_url
+        self.secret_key = secret_key
+        self.refresh_seconds = refresh_seconds
+        self.leeway_seconds = leeway_seconds
+        self.authorized_parties = authorized_parties or []
+        self._clock = clock
+
+        self._keys: Dict[str, dict] = {}
+        self._last_refresh = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._user_data = LRUTTLCache(cache_max_size, 0, clock=clock, name="clerk_sessions")
+
+    async def start(self):
+        try:
+            await self.refresh_keys()
+        except Exception as e:
+            logger.error("Failed to load Clerk signing keys", error=str(e))
+        self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+
+    def set_keys(self, jwks: dict):
+        """Replace the signing keys with the keys of a JWKS document."""
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._last_refresh = self._clock()
+
+    async def refresh_keys(self):
+        async with self._refresh_lock:
+            await self._load_keys()
+
+    async def _load_keys(self):
+        headers = {"Authorization": f"Bearer {self.secret_key}"} if self.secret_key else {}
+        async with observe_clerk_call("get_jwks"), httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(self.jwks_url, headers=headers)
+            response.raise_for_status()
+        self.set_keys(response.json())
+        logger.info("Loaded Clerk signing keys", key_ids=list(self._keys))
+
+    async def _refresh_for_key(self, key_id: Optional[str]) -> Optional[dict]:
+        """
+        Refresh the keys for a token signed with an unknown key id, at most once per
+        MIN_REFRESH_INTERVAL_SECONDS. Both checks are made under the lock, so a burst of such
+        tokens waits for a single refresh (and any refresh already in flight) instead of queueing
+        one each.
+        """
+        async with self._refresh_lock:
+            key = self._keys.get(key_id)
+            if key is not None or self._clock() - self._last_refresh < self.MIN_REFRESH_INTERVAL_SECONDS:
+                return key
+            # Counts failed attempts too, so an unreachable JWKS is not retried by every request
+            self._last_refresh = self._clock()
+            try:
+                await self._load_keys()
+            except Exception as e:
+                logger.error("Failed to refresh Clerk signing keys", error=str(e))
+            return self._keys.get(key_id)
+
+    async def get_user_data(self, token: str) -> UserData:
+        """
+        Return the UserData of a session token, verifying it on first use.
+
+        Raises:
+            TokenVerificationError: If the token is invalid or expired
+            KeysUnavailableError: If no signing keys are loaded
+        """
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        user_data = self._user_data.get(token_hash)
+        if user_data is not None:
+            return user_data
+
+        claims = await self.verify(token)
+        user_data = UserData(userId=claims["sub"], orgId=claims.get("org_id"))
+        ttl_seconds = claims["exp"] - self._clock()
+        if ttl_seconds > 0:
+            self._user_data.set(token_hash, user_data, ttl_seconds)
+        return user_data
+
+    async def verify(self, token: str) -> dict:
+        try:
+            key_id = jwt.get_unverified_header(token).get("kid")
+        except JWTError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        key = self._keys.get(key_id)
+        if key is None:
+            key = await self._refresh_for_key(key_id)
+
+        if key is None:
+            if not self._keys:
+                raise KeysUnavailableError("No Clerk signing keys loaded")
+            raise TokenVerificationError(f"Unknown signing key {key_id}")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=self.ALGORITHMS,
+                options={"verify_aud": False, "leeway": self.leeway_seconds},
+            )
+        except JWTError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        if "sub" not in claims or "exp" not in claims:
+            raise TokenVerificationError("Session token is missing sub or exp")
+        if self.authorized_parties and claims.get("azp") not in self.authorized_parties:
+            raise TokenVerificationError(f"Unauthorized party {claims.get('azp')}")
+        return claims
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh_keys()
+            except Exception as e:
+                logger.error("Failed to refresh Clerk signing keys", error=str(e))
+
+
+def get_session_token(request: Request) -> Optional[str]:
+    """Read the Clerk session token from the Authorization header or the __session cookie."""
+    authorization = request.headers.get("Authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip() or None
+    return request.cookies.get("__session")
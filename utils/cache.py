@@ -0,0 +1,346 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import orjson
+import redis.asyncio as redis
+import structlog
+
+from utils import metrics
+
+logger = structlog.get_logger(__name__)
+
+
+class LRUTTLCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and a per-entry TTL.
+
+    Keeps hit/miss/eviction counters so the cache can be sized from real traffic; a named
+    cache also exports its hits and misses as locksmith_cache_lookups_total.
+    A max_size of 0 disables the cache (every lookup is a miss, nothing is stored).
+    """
+
+    _MISSING = object()
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        on_evict: Optional[Callable[[Hashable], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        name: Optional[str] = None,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._hit_lookups = metrics.CACHE_LOOKUPS.labels(name, "hit") if name else None
+        self._miss_lookups = metrics.CACHE_LOOKUPS.labels(name, "miss") if name else None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self._record_miss()
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self._record_miss()
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if self._hit_lookups is not None:
+            self._hit_lookups.inc()
+        return value
+
+    def _record_miss(self):
+        self.misses += 1
+        if self._miss_lookups is not None:
+            self._miss_lookups.inc()
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def pop(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        for key in list(self._entries):
+            self._remove(key)
+
+    def keys(self):
+        return list(self._entries)
+
+    def _remove(self, key: Hashable):
+        del self._entries[key]
+        if self._on_evict:
+            self._on_evict(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Shared cache tier used by the DAO read paths.
+
+    Values are stored JSON-encoded, so cached values must round-trip through JSON: UUIDs and
+    datetimes come back as strings. publish() delivers a message to the listeners registered
+    for its topic in every worker, this one included.
+    """
+
+    def __init__(self, default_ttl_seconds: float):
+        self.default_ttl_seconds = default_ttl_seconds
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+    def add_listener(self, topic: str, callback: Callable[[dict], None]):
+        self._listeners[topic].append(callback)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def get(self, key: str) -> Any:
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        await self.set_many({key: value}, ttl_seconds)
+
+    @abstractmethod
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values of the keys that are present; missing keys are left out."""
+
+    @abstractmethod
+    async def set_many(self, values: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        pass
+
+    @abstractmethod
+    async def publish(self, topic: str, payload: dict):
+        pass
+
+    def _dispatch(self, topic: str, payload: dict):
+        for callback in self._listeners.get(topic, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error("Cache invalidation listener failed", topic=topic, error=str(e))
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    @staticmethod
+    def _decode(raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Process-local CacheBackend with the same encoding and publish semantics as RedisCacheBackend,
+    for tests, benchmarks and single-worker deployments.
+    """
+
+    def __init__(self, max_size: int, default_ttl_seconds: float):
+        super().__init__(default_ttl_seconds)
+        self._store = LRUTTLCache(max_size, default_ttl_seconds)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        values = {}
+        for key in keys:
+            raw = self._store.get(key)
+            if raw is not None:
+                values[key] = self._decode(raw)
+        return values
+
+    async def set_many(self, values: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        for key, value in values.items():
+            self._store.set(key, self._encode(value), ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._store.pop(key)
+
+    async def publish(self, topic: str, payload: dict):
+        self._dispatch(topic, self._decode(self._encode(payload)))
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    CacheBackend shared by every worker through Redis.
+
+    Multi-gets are chunked MGETs sent in one pipeline, multi-sets are pipelined SETs with
+    expiry, and invalidation messages are fanned out over a pub/sub channel.
+    """
+
+    MGET_CHUNK_SIZE = 500
+
+    def __init__(self, redis_url: str, default_ttl_seconds: float, key_prefix: str = "locksmith:"):
+        super().__init__(default_ttl_seconds)
+        self._redis = redis.from_url(redis_url)
+        self._key_prefix = key_prefix
+        self._channel = f"{key_prefix}cache:invalidate"
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._channel)
+        self._listener_task = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+        if self._pubsub:
+            await self._pubsub.aclose()
+        await self._redis.aclose()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for chunk_start in range(0, len(keys), self.MGET_CHUNK_SIZE):
+                chunk = keys[chunk_start:chunk_start + self.MGET_CHUNK_SIZE]
+                pipe.mget([self._key_prefix + key for key in chunk])
+            chunks = await pipe.execute()
+
+        raw_values = [raw for chunk in chunks for raw in chunk]
+        return {
+            key: self._decode(raw)
+            for key, raw in zip(keys, raw_values)
+            if raw is not None
+        }
+
+    async def set_many(self, values: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        if not values:
+            return
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(self._key_prefix + key, self._encode(value), px=int(ttl * 1000))
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._redis.delete(*(self._key_prefix + key for key in keys))
+
+    async def publish(self, topic: str, payload: dict):
+        await self._redis.publish(self._channel, self._encode({"topic": topic, "payload": payload}))
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = self._decode(message["data"])
+                    self._dispatch(data["topic"], data["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Cache invalidation channel failed, resubscribing", error=str(e))
+                await asyncio.sleep(1)
+                try:
+                    await self._pubsub.subscribe(self._channel)
+                except Exception as subscribe_error:
+                    logger.error("Failed to resubscribe to cache invalidation channel", error=str(subscribe_error))
+
+
+def build_cache_backend(
+    backend_type: str, redis_url: Optional[str], max_size: int, ttl_seconds: float
+) -> Optional[CacheBackend]:
+    if backend_type == "redis":
+        return RedisCacheBackend(redis_url, ttl_seconds)
+    if backend_type == "memory":
+        return InMemoryCacheBackend(max_size, ttl_seconds)
+    return None
+
+
+async def read_through(
+    backend: Optional[CacheBackend],
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl_seconds: Optional[float] = None,
+) -> Any:
+    """
+    Return the cached value of key, loading and caching it on a miss.
+
+    Cache failures are logged and fall back to the loader, so an unavailable cache tier
+    never fails a read.
+    """
+    if backend is None:
+        return await loader()
+
+    try:
+        value = await backend.get(key)
+        if value is not None:
+            metrics.CACHE_LOOKUPS.labels("shared", "hit").inc()
+            return value
+    except Exception as e:
+        logger.warning("Cache read failed", key=key, error=str(e))
+
+    metrics.CACHE_LOOKUPS.labels("shared", "miss").inc()
+    value = await loader()
+    try:
+        await backend.set(key, value, ttl_seconds)
+    except Exception as e:
+        logger.warning("Cache write failed", key=key, error=str(e))
+    return value
+
+
+async def invalidate(backend: Optional[CacheBackend], *keys: str):
+    if backend is None or not keys:
+        return
+    try:
+        await backend.delete(*keys)
+    except Exception as e:
+        logger.error("Cache invalidation failed", keys=list(keys), error=str(e))
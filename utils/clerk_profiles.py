@@ -0,0 +1,165 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+import structlog
+
+from config.settings import loaded_config
+from utils.cache import LRUTTLCache
+from utils.metrics import observe_clerk_call
+
+logger = structlog.get_logger(__name__)
+
+ProfileFetcher = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+
+class ClerkProfileCache:
+    """
+    In-process cache of Clerk user profiles keyed by user_id.
+
+    A profile is fresh for ttl_seconds after it was fetched and is then served stale for up
+    to stale_seconds more while a background refresh runs. Profiles of ids that are not
+    cached are fetched in one call per batch of missing ids, and concurrent lookups of an id
+    that is already being fetched wait for that fetch instead of starting another one.
+    """
+
+    _UNAVAILABLE = object()
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        stale_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._profiles = LRUTTLCache(max_size, ttl_seconds + stale_seconds, clock=clock, name="clerk_profiles")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks = set()
+
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    async def get_profiles(self, user_ids: Iterable[str], fetch: ProfileFetcher) -> Dict[str, Any]:
+        """
+        Return the profiles of user_ids, fetching only the ids that are not cached.
+
+        Ids whose profile could not be fetched (Clerk unavailable and nothing cached) are
+        left out of the result rather than failing the whole lookup.
+
+        Args:
+            user_ids: Clerk user ids to look up
+            fetch: Coroutine function taking a list of user ids and returning profiles by id
+        """
+        now = self._clock()
+        profiles = {}
+        stale_ids = []
+        missing_ids = []
+        for user_id in dict.fromkeys(user_ids):
+            entry = self._profiles.get(user_id, self._UNAVAILABLE)
+            if entry is self._UNAVAILABLE:
+                missing_ids.append(user_id)
+                continue
+
+            fetched_at, profile = entry
+            profiles[user_id] = profile
+            if now - fetched_at >= self.ttl_seconds:
+                stale_ids.append(user_id)
+
+        if stale_ids:
+            self.stale_hits += len(stale_ids)
+            self._join_or_start_fetch(stale_ids, fetch)
+
+        if missing_ids:
+            waiting = self._join_or_start_fetch(missing_ids, fetch)
+            # asyncio.wait does not cancel the shared futures if this caller is cancelled
+            await asyncio.wait(waiting.values())
+            for user_id, future in waiting.items():
+                profile = future.result()
+                if profile is not self._UNAVAILABLE:
+                    profiles[user_id] = profile
+
+        return profiles
+
+    def invalidate(self, *user_ids: str):
+        for user_id in user_ids:
+            self._profiles.pop(user_id)
+
+    def clear(self):
+        self._profiles.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._profiles.stats(),
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "stale_hits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+            "inflight": len(self._inflight),
+        }
+
+    def _join_or_start_fetch(self, user_ids: List[str], fetch: ProfileFetcher) -> Dict[str, asyncio.Future]:
+        """Return a future per id, joining fetches already in flight and starting one for the rest."""
+        futures = {}
+        to_fetch = []
+        for user_id in user_ids:
+            future = self._inflight.get(user_id)
+            if future is not None:
+                self.coalesced += 1
+                futures[user_id] = future
+            else:
+                to_fetch.append(user_id)
+
+        if to_fetch:
+            loop = asyncio.get_running_loop()
+            fetch_futures = {user_id: loop.create_future() for user_id in to_fetch}
+            self._inflight.update(fetch_futures)
+            futures.update(fetch_futures)
+
+            task = asyncio.create_task(self._fetch(fetch_futures, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return futures
+
+    async def _fetch(self, futures: Dict[str, asyncio.Future], fetch: ProfileFetcher):
+        user_ids = list(futures)
+        self.fetches += 1
+        try:
+            try:
+                async with observe_clerk_call("get_users"):
+                    fetched = await fetch(user_ids) or {}
+            except Exception as e:
+                self.fetch_failures += 1
+                logger.warning("Failed to fetch Clerk user profiles", user_count=len(user_ids), error=str(e))
+                fetched = None
+
+            fetched_at = self._clock()
+            for user_id, future in futures.items():
+                if fetched is None:
+                    profile = self._UNAVAILABLE
+                else:
+                    profile = fetched.get(user_id)
+                    self._profiles.set(user_id, (fetched_at, profile))
+                if not future.done():
+                    future.set_result(profile)
+        finally:
+            # Also when the fetch is cancelled or the fetcher raises a BaseException: a future left
+            # pending in _inflight would be joined, and waited on forever, by every later lookup
+            for user_id, future in futures.items():
+                if self._inflight.get(user_id) is future:
+                    del self._inflight[user_id]
+                if not future.done():
+                    future.set_result(self._UNAVAILABLE)
+
+clerk_profile_cache = ClerkProfileCache(
+    max_size=loaded_config.clerk_profile_cache_max_size,
+    ttl_seconds=loaded_config.clerk_profile_ttl_seconds,
+    stale_seconds=loaded_config.clerk_profile_stale_seconds,
+)
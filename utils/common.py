@@ -1,18 +1,85 @@
-from fastapi import HTTPException, status
+import functools
+import inspect
+import typing
+
+import sentry_sdk
+from fastapi import HTTPException, Response, status
 from pydantic import Field, BaseModel
 from starlette.requests import Request
 from clerk_integration.utils import UserData
 
+from config.logging import logger
+from config.settings import loaded_config
+from utils.auth import get_session_token, TokenVerificationError, KeysUnavailableError
+from utils import tracing
+from utils.metrics import observe_clerk_call
+from utils.serializers import ORJSONResponse, ResponseData
+
+
+class LogData(BaseModel):
+    error_type: str = Field(..., description="Exception class name")
+    message: str = Field(..., description="Error message")
+    detail: typing.Any = Field(None, description="Error detail")
+    function: str = Field(..., description="Function that raised the error")
+
 
 async def get_user_data_from_request(request: Request):
+    verifier = loaded_config.clerk_token_verifier
+    token = get_session_token(request)
+    if verifier is not None and token:
+        try:
+            return await verifier.get_user_data(token)
+        except TokenVerificationError as e:
+            logger.info("Session token failed verification: %s", repr(e))
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not logged in -> Locksmith") from e
+        except KeysUnavailableError as e:
+            logger.warning("Verifying session token with Clerk: %s", repr(e))
+
     try:
-        user_data: UserData = await loaded_config.clerk_auth_helper.get_user_data_from_clerk(request)
+        async with observe_clerk_call("authenticate_request"):
+            user_data: UserData = await loaded_config.clerk_auth_helper.get_user_data_from_clerk(request)
         return user_data
     except Exception as e:
         logger.info("Exception occured while fetching user data from request: %s", repr(e))
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not logged in -> Locksmith") from e
 
 
+SUB_RESPONSE_PARAMETER = "_sub_response"
+
+
+def _sub_response_parameter(signature: inspect.Signature) -> typing.Optional[str]:
+    """Name of the view's own Response parameter, if it declares one."""
+    for parameter in signature.parameters.values():
+        if inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, Response):
+            return parameter.name
+    return None
+
+
+def _with_sub_response_signature(signature: inspect.Signature) -> inspect.Signature:
+    """The view's signature plus a keyword-only Response parameter, for FastAPI to inject."""
+    parameters = list(signature.parameters.values())
+    sub_response = inspect.Parameter(SUB_RESPONSE_PARAMETER, inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+    if parameters and parameters[-1].kind == inspect.Parameter.VAR_KEYWORD:
+        parameters.insert(len(parameters) - 1, sub_response)
+    else:
+        parameters.append(sub_response)
+    return signature.replace(parameters=parameters)
+
+
+def _render(sub_response: typing.Optional[Response], content: ResponseData, status_code: int = None) -> ORJSONResponse:
+    """
+    Render an envelope the way FastAPI renders returned values: headers that dependencies set
+    on the injected Response (X-Read-After, cookies) are carried over, as is its status code
+    unless the envelope has its own.
+    """
+    if status_code is None:
+        status_code = getattr(sub_response, "status_code", None) or status.HTTP_200_OK
+    response = ORJSONResponse(status_code=status_code, content=content)
+    if sub_response is not None:
+        response.headers.raw.extend(sub_response.headers.raw)
+    return response
+
+
 def handle_exceptions(
     generic_message: str = "An unexpected error occurred",
     exception_classes: typing.Union[typing.List[typing.Type[Exception]], tuple] = None
@@ -23,14 +90,28 @@ def handle_exceptions(
     - Logs all exceptions
     - Sends unhandled errors to Sentry
     - Lets FastAPI handle HTTPException but logs it
+    - Renders ResponseData envelopes with orjson, so FastAPI does not re-encode them; headers
+      dependencies set on the request's Response are copied onto the rendered response
     """
     exception_classes = tuple(exception_classes or ())
 
     def decorator(func):
+        signature = inspect.signature(func)
+        # FastAPI injects a single Response per view, so reuse the view's own parameter if it has one
+        own_parameter = _sub_response_parameter(signature)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
+            if own_parameter:
+                sub_response = kwargs.get(own_parameter)
+            else:
+                sub_response = kwargs.pop(SUB_RESPONSE_PARAMETER, None)
             try:
-                return await func(*args, **kwargs)
+                with tracing.span(f"view.{func.__name__}"):
+                    result = await func(*args, **kwargs)
+                if isinstance(result, ResponseData):
+                    return _render(sub_response, result)
+                return result
 
             except HTTPException as http_exc:
                 logger.exception(
@@ -57,10 +138,7 @@ def handle_exceptions(
                 response_data.message = getattr(e, "message", str(e))
                 response_data.errors = [getattr(e, "detail", str(e))]
 
-                return JSONResponse(
-                    status_code=getattr(e, "status_code", status.HTTP_400_BAD_REQUEST),
-                    content=jsonable_encoder(response_data)
-                )
+                return _render(sub_response, response_data, getattr(e, "status_code", status.HTTP_400_BAD_REQUEST))
 
             # Unhandled/Unexpected exception — log and send to Sentry
             except Exception as e:
@@ -77,11 +155,10 @@ def handle_exceptions(
                 response_data.message = generic_message
                 response_data.errors = [str(e)]
 
-                return JSONResponse(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    content=jsonable_encoder(response_data)
-                )
+                return _render(sub_response, response_data, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        if not own_parameter:
+            wrapper.__signature__ = _with_sub_response_signature(signature)
         return wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
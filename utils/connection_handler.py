@@ -1,38 +1,185 @@
-from typing import Optional
+from asyncio import current_task
+from typing import Awaitable, Callable, Optional
 
+from fastapi import Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.logging import logger
 from config.settings import loaded_config
+from utils import metrics
+
+LAST_WRITE_SESSION_KEY = "last_write_at"
+READ_AFTER_HEADER = "X-Read-After"
+AFTER_COMMIT_HOOKS_KEY = "after_commit_hooks"
+
+
+def after_commit(session: AsyncSession, hook: Callable[[], Awaitable[None]]):
+    """
+    Run hook once the session's current transaction is committed through commit_session().
+
+    DAOs use this for side effects that must only happen for committed writes, such as
+    cache invalidation; hooks registered in a transaction that rolls back are dropped.
+    """
+    session.sync_session.info.setdefault(AFTER_COMMIT_HOOKS_KEY, []).append(hook)
+
+
+async def commit_session(session: AsyncSession):
+    """Commit the unit of work, then run the after_commit hooks registered during it."""
+    await session.commit()
+    for hook in session.sync_session.info.pop(AFTER_COMMIT_HOOKS_KEY, []):
+        try:
+            await hook()
+        except Exception as e:
+            logger.error("After-commit hook failed", hook=getattr(hook, "__qualname__", repr(hook)), error=str(e))
+
+
+async def release_connection(session: AsyncSession) -> bool:
+    """
+    End a read-only transaction so its connection goes back to the pool before a slow wait
+    outside the database (e.g. a Clerk call). The session stays usable and checks a
+    connection out again on its next query.
+
+    A session holding unflushed or uncommitted writes is left alone, since releasing it
+    would mean committing on the caller's behalf.
+
+    Returns:
+        bool: Whether the connection was released
+    """
+    if not session.in_transaction():
+        return False
+    sync_session = session.sync_session
+    if (
+        sync_session.new or sync_session.dirty or sync_session.deleted
+        or sync_session.info.get("pending_write") or sync_session.info.get(AFTER_COMMIT_HOOKS_KEY)
+    ):
+        return False
+    await session.commit()
+    return True
 
 
 class ConnectionHandler:
+    """
+    Per-request access to the database.
+
+    Sessions are created on first use and check out a pooled connection only once they run a
+    query; release() hands connections back between database phases, and the total time the
+    request held connections is recorded when the handler closes.
+    """
 
-    def __init__(self, connection_manager=None, event_bridge=None):
+    def __init__(
+        self,
+        connection_manager=None,
+        event_bridge=None,
+        read_after: Optional[float] = None,
+        on_write: Optional[Callable[[float], None]] = None,
+    ):
         self._session: Optional[AsyncSession] = None
+        self._read_session: Optional[AsyncSession] = None
+        self._scoped_sessions = []
         self._connection_manager = connection_manager
+        self.read_after = read_after
+        self.last_write_at: Optional[float] = None
+        self._on_write = on_write
 
     @property
     def session(self):
+        """Session on the primary, for writes and for reads that must see them."""
         if not self._session:
             session_factory = self._connection_manager.get_session_factory()
-            self._session = session_factory()
+            self._session = self._scoped_session(session_factory)
+            self._session.sync_session.info["on_write"] = self._record_write
         return self._session
 
+    @property
+    def read_session(self):
+        """
+        Session for read-only calls: on a replica that has caught up with this client's last
+        write, or on the primary once this handler has written or no replica qualifies.
+        """
+        if self.last_write_at is not None:
+            return self.session
+        if not self._read_session:
+            session_factory = self._connection_manager.get_read_session_factory(self.read_after)
+            if session_factory is self._connection_manager.get_session_factory():
+                return self.session
+            self._read_session = self._scoped_session(session_factory)
+        return self._read_session
+
+    def _scoped_session(self, session_factory) -> AsyncSession:
+        """
+        Create a session in the factory's task-scoped registry, remembering the task it is scoped
+        to: the first use may happen in a task spawned by asyncio.gather, not the request's own.
+        """
+        session = session_factory()
+        self._scoped_sessions.append((session_factory, current_task(), session))
+        return session
+
+    @property
+    def connection_hold_seconds(self) -> float:
+        return sum(
+            session.sync_session.info.get("connection_hold_seconds", 0.0)
+            for session in (self._session, self._read_session)
+            if session is not None
+        )
+
     async def session_commit(self):
-        await self.session.commit()
+        await commit_session(self.session)
+
+    async def release(self):
+        """Return the connections of read-only transactions to the pool; see release_connection."""
+        for session in (self._read_session, self._session):
+            if session is not None:
+                await release_connection(session)
 
     async def close(self):
         if self._session:
-            await self._session.close()
+            self._session.sync_session.info.pop("on_write", None)
+        hold_seconds = None
+        for session_factory, scope_task, session in self._scoped_sessions:
+            await session.close()
+            hold_seconds = (hold_seconds or 0.0) + session.sync_session.info.pop("connection_hold_seconds", 0.0)
+            # Drop the session from the registry under the task it was created in, which may not
+            # be the task closing the handler, so neither outlives the request
+            scoped = session_factory.registry.registry
+            if scoped.get(scope_task) is session:
+                del scoped[scope_task]
+        self._scoped_sessions = []
+        self._session = None
+        self._read_session = None
+        if hold_seconds is not None:
+            metrics.DB_REQUEST_CONNECTION_HOLD_SECONDS.observe(hold_seconds)
+
+    def _record_write(self, written_at: float):
+        self.last_write_at = written_at
+        self.read_after = max(self.read_after or 0, written_at)
+        if self._on_write:
+            self._on_write(written_at)
 
 
-async def get_connection_handler_for_app():
+def _read_after(request: Request) -> Optional[float]:
+    """Latest commit time this client has written, from its session cookie or the X-Read-After header."""
+    candidates = [request.session.get(LAST_WRITE_SESSION_KEY), request.headers.get(READ_AFTER_HEADER)]
+    read_after = None
+    for candidate in candidates:
+        try:
+            value = float(candidate)
+        except (TypeError, ValueError):
+            continue
+        read_after = value if read_after is None else max(read_after, value)
+    return read_after
+
+
+async def get_connection_handler_for_app(request: Request, response: Response):
+    def remember_write(written_at: float):
+        request.session[LAST_WRITE_SESSION_KEY] = written_at
+        response.headers[READ_AFTER_HEADER] = f"{written_at:.6f}"
+
     connection_handler = ConnectionHandler(
-        connection_manager=loaded_config.connection_manager
+        connection_manager=loaded_config.connection_manager,
+        read_after=_read_after(request),
+        on_write=remember_write,
     )
     try:
         yield connection_handler
     finally:
         await connection_handler.close()
-
-
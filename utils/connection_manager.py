@@ -1,32 +1,294 @@
+import asyncio
+import itertools
+import time
 from asyncio import current_task
+from typing import List, Optional, Sequence
 
+import structlog
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from utils import metrics, tracing
+from utils.query_stats import current_query_stats
 from utils.sqlalchemy import async_db_url
 
+logger = structlog.get_logger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout wait time, checkout timeouts and the number of
+    checked-out and overflow connections under the pool's name.
+    """
+
+    pool_name = "primary"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        metrics.DB_POOL_SIZE.labels(self.pool_name).set(self.size())
+
+    @classmethod
+    def named(cls, pool_name: str):
+        """Return a subclass recording its metrics under pool_name, for use as an engine poolclass."""
+        return type(f"{cls.__name__}[{pool_name}]", (cls,), {"pool_name": pool_name})
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.DB_POOL_CHECKOUT_TIMEOUTS.labels(self.pool_name).inc()
+            raise
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT_SECONDS.labels(self.pool_name).observe(time.perf_counter() - started_at)
+        self._record_usage()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self):
+        metrics.DB_POOL_CHECKED_OUT.labels(self.pool_name).set(self.checkedout())
+        metrics.DB_POOL_OVERFLOW.labels(self.pool_name).set(max(self.overflow(), 0))
+
+
+class PrimarySession(Session):
+    """
+    Session bound to the primary. A commit that wrote anything calls the callback stored in
+    info["on_write"] with the commit time, which is what read-your-writes routing keys off.
+    """
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["pending_write"] = True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["pending_write"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_write(session):
+    if session.info.pop("pending_write", False):
+        on_write = session.info.get("on_write")
+        if on_write is not None:
+            on_write(time.time())
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("pending_write", None)
+    session.info.pop("after_commit_hooks", None)
+
+
+@event.listens_for(Session, "after_begin")
+def _start_connection_hold(session, transaction, connection):
+    session.info.setdefault("connection_held_since", time.perf_counter())
+    session.info["pool_name"] = getattr(connection.engine.pool, "pool_name", "primary")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _end_connection_hold(session, transaction):
+    if transaction.parent is not None:
+        return
+    held_since = session.info.pop("connection_held_since", None)
+    if held_since is None:
+        return
+    held_seconds = time.perf_counter() - held_since
+    session.info["connection_hold_seconds"] = session.info.get("connection_hold_seconds", 0.0) + held_seconds
+    metrics.DB_CONNECTION_HOLD_SECONDS.labels(session.info.get("pool_name", "primary")).observe(held_seconds)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.query_started_at = time.perf_counter()
+    context.query_span = tracing.start_query_span(statement)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_started_at
+    route = metrics.current_route.get()
+    metrics.DB_QUERIES.labels(route).inc()
+    metrics.DB_QUERY_DURATION_SECONDS.labels(route).observe(elapsed)
+    query_stats = current_query_stats.get()
+    if query_stats is not None:
+        query_stats.record(statement, elapsed)
+    tracing.end_query_span(context.query_span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(exception_context):
+    context = exception_context.execution_context
+    query_span = getattr(context, "query_span", None)
+    if query_span is not None:
+        context.query_span = None
+        tracing.end_query_span(query_span, exception_context.original_exception)
+
+
+class Replica:
+    """A read replica's engine and session factory, with its last measured replication lag."""
+
+    def __init__(self, name: str, engine, session_factory):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+
+    def is_fresh(self, max_lag_seconds: float, max_check_age_seconds: float, read_after: Optional[float]) -> bool:
+        """
+        Whether reads may go to this replica: it answered the last lag check, that check is
+        recent, its lag is within max_lag_seconds and, when read_after is given, it had
+        replayed everything committed up to read_after when it was checked.
+        """
+        if not self.healthy or self.checked_at is None or self.lag_seconds is None:
+            return False
+        if time.time() - self.checked_at > max_check_age_seconds:
+            return False
+        if self.lag_seconds > max_lag_seconds:
+            return False
+        return read_after is None or self.checked_at - self.lag_seconds >= read_after
+
 
 class ConnectionManager:
+    """
+    Holds the primary engine and any read replica engines.
 
-    def __init__(self, db_url, db_echo):
+    Writes always use the primary. Read-only calls ask for get_read_session_factory(), which
+    returns a replica whose measured lag is acceptable (round robin), or the primary when no
+    replica qualifies. Replica lag is measured in the background every replica_lag_check_seconds.
+    """
+
+    REPLICA_LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(
+        self,
+        db_url,
+        db_echo,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        replica_urls: Sequence[str] = (),
+        replica_max_lag_seconds: float = 5,
+        replica_lag_check_seconds: float = 5,
+    ):
         self.db_url = db_url
         self.db_echo = db_echo
-        self._db_engine, self._db_session_factory = self._setup_db()
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.statement_cache_size = statement_cache_size
+        self.replica_max_lag_seconds = replica_max_lag_seconds
+        self.replica_lag_check_seconds = replica_lag_check_seconds
+        self._db_engine, self._db_session_factory = self._setup_db(self.db_url, "primary", PrimarySession)
+        self.replicas: List[Replica] = [
+            Replica(f"replica-{index}", *self._setup_db(replica_url, f"replica-{index}"))
+            for index, replica_url in enumerate(replica_urls)
+        ]
+        self._replica_cycle = itertools.cycle(self.replicas)
+        self._lag_monitor_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a ConnectionManager from the db_* options of Settings."""
+        return cls(
+            config.db_url,
+            config.db_echo,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_recycle=config.db_pool_recycle,
+            pool_pre_ping=config.db_pool_pre_ping,
+            statement_cache_size=config.db_statement_cache_size,
+            replica_urls=config.db_replica_urls,
+            replica_max_lag_seconds=config.db_replica_max_lag_seconds,
+            replica_lag_check_seconds=config.db_replica_lag_check_seconds,
+        )
 
     def get_session_factory(self):
         return self._db_session_factory
 
-    def _setup_db(self):
-        engine = create_async_engine(str(self.db_url), echo=self.db_echo)
+    def get_read_session_factory(self, read_after: Optional[float] = None):
+        """
+        Return the session factory of a replica fresh enough to read from, or the primary's.
+
+        Args:
+            read_after: Commit time the reader must observe, for read-your-writes
+        """
+        max_check_age_seconds = self.replica_lag_check_seconds * 3
+        for _ in range(len(self.replicas)):
+            replica = next(self._replica_cycle)
+            if replica.is_fresh(self.replica_max_lag_seconds, max_check_age_seconds, read_after):
+                return replica.session_factory
+        return self._db_session_factory
+
+    async def start(self):
+        if self.replicas:
+            await self.check_replica_lag()
+            self._lag_monitor_task = asyncio.create_task(self._monitor_replica_lag())
+
+    async def check_replica_lag(self):
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    lag_seconds = await connection.scalar(self.REPLICA_LAG_QUERY)
+                replica.lag_seconds = float(lag_seconds or 0)
+                replica.checked_at = time.time()
+                replica.healthy = True
+            except Exception as e:
+                if replica.healthy:
+                    logger.error("Read replica failed its lag check", replica=replica.name, error=str(e))
+                replica.healthy = False
+
+    async def _monitor_replica_lag(self):
+        while True:
+            await asyncio.sleep(self.replica_lag_check_seconds)
+            await self.check_replica_lag()
+
+    def _setup_db(self, db_url, pool_name: str, sync_session_class=Session):
+        engine = create_async_engine(
+            str(db_url),
+            echo=self.db_echo,
+            poolclass=InstrumentedQueuePool.named(pool_name),
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args={"prepared_statement_cache_size": self.statement_cache_size},
+        )
         session_factory = async_scoped_session(
             sessionmaker(
                 engine,
                 expire_on_commit=False,
                 class_=AsyncSession,
+                sync_session_class=sync_session_class,
             ),
             scopefunc=current_task,
         )
         return engine, session_factory
 
     async def close_connections(self):
+        if self._lag_monitor_task:
+            self._lag_monitor_task.cancel()
         await self._db_engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
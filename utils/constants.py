@@ -1,3 +1,4 @@
 IND_TIME_ZONE = "Asia/Kolkata"
 UTC_TIME_ZONE = "UTC"
 PROMETHEUS_LOG_TIME = 60
+PRODUCTION_ENVS = ("prod", "production")
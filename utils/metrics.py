@@ -0,0 +1,105 @@
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from utils import tracing
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Route template of the request being served, for per-endpoint labels outside the middleware;
+# "background" for work outside requests (startup, lag monitor, scripts)
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "locksmith_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the database pool",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "locksmith_db_pool_checkout_timeouts_total",
+    "Connection checkouts that gave up after db_pool_timeout",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "locksmith_db_pool_checked_out_connections",
+    "Connections currently checked out of the database pool",
+    ["pool"],
+)
+DB_POOL_OVERFLOW = Gauge(
+    "locksmith_db_pool_overflow_connections",
+    "Connections open beyond db_pool_size",
+    ["pool"],
+)
+DB_POOL_SIZE = Gauge(
+    "locksmith_db_pool_size",
+    "Configured size of the database pool",
+    ["pool"],
+)
+DB_CONNECTION_HOLD_SECONDS = Histogram(
+    "locksmith_db_connection_hold_seconds",
+    "Time a session held a pooled connection, from the start of a transaction to its end",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_REQUEST_CONNECTION_HOLD_SECONDS = Histogram(
+    "locksmith_db_request_connection_hold_seconds",
+    "Total time a request held pooled connections across all its transactions",
+    buckets=LATENCY_BUCKETS,
+)
+
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "locksmith_http_request_duration_seconds",
+    "Latency of HTTP requests by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "locksmith_http_requests_in_flight",
+    "HTTP requests currently being served, by route template",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter(
+    "locksmith_db_queries_total",
+    "Statements executed against the database, by route template",
+    ["route"],
+)
+DB_QUERY_DURATION_SECONDS = Histogram(
+    "locksmith_db_query_duration_seconds",
+    "Execution time of database statements, by route template",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+CLERK_REQUEST_DURATION_SECONDS = Histogram(
+    "locksmith_clerk_request_duration_seconds",
+    "Latency of calls to the Clerk API",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+CLERK_REQUEST_ERRORS = Counter(
+    "locksmith_clerk_request_errors_total",
+    "Calls to the Clerk API that raised",
+    ["operation"],
+)
+CACHE_LOOKUPS = Counter(
+    "locksmith_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss); the hit ratio is hit / (hit + miss)",
+    ["cache", "result"],
+)
+
+
+@asynccontextmanager
+async def observe_clerk_call(operation: str):
+    """Time and trace a Clerk API call, and count it as an error if it raises."""
+    started_at = time.perf_counter()
+    try:
+        with tracing.span(f"clerk.{operation}", **{"peer.service": "clerk"}):
+            yield
+    except Exception:
+        CLERK_REQUEST_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        CLERK_REQUEST_DURATION_SECONDS.labels(operation).observe(time.perf_counter() - started_at)
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import Select
+
+from config.settings import loaded_config
+
+T = TypeVar("T")
+
+
+def encode_token(payload: dict) -> str:
+    """Opaque url-safe token carrying payload, for cursors clients hand back unchanged."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return payload
+
+
+def encode_cursor(after: UUID) -> str:
+    """Opaque token for the page that starts after the row keyed by after."""
+    return encode_token({"after": str(after)})
+
+
+def decode_cursor(cursor: str) -> UUID:
+    try:
+        return UUID(decode_token(cursor)["after"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+class PageParams(BaseModel):
+    """
+    Keyset pagination query parameters of list endpoints.
+
+    Lists are ordered by a uuid6 key and a page continues strictly after the last key of the
+    previous one, so pages stay stable under concurrent inserts and cost the same at any depth.
+    """
+    limit: Optional[int] = Field(None, description="Page size, defaults to page_size_default", ge=1)
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+    @field_validator('limit')
+    def validate_limit(cls, v):
+        if v is not None and v > loaded_config.page_size_max:
+            return loaded_config.page_size_max
+        return v
+
+    @property
+    def paginated(self) -> bool:
+        """
+        Whether to return a page. With legacy_unpaginated_lists set, requests without limit or
+        cursor still get the whole list in the old response shape.
+        """
+        return not loaded_config.legacy_unpaginated_lists or self.limit is not None or self.cursor is not None
+
+    @property
+    def size(self) -> int:
+        return self.limit or loaded_config.page_size_default
+
+    @property
+    def after(self) -> Optional[UUID]:
+        return decode_cursor(self.cursor) if self.cursor else None
+
+
+def keyset(stmt: Select, key_column, page: PageParams) -> Select:
+    """Restrict stmt to the page: rows after the cursor in key order, plus one to detect a next page."""
+    after = page.after
+    if after is not None:
+        stmt = stmt.where(key_column > after)
+    return stmt.order_by(key_column).limit(page.size + 1)
+
+
+def page_of(rows: Sequence[T], page: PageParams, key: Callable[[T], UUID]) -> Tuple[List[T], Optional[str]]:
+    """Split the rows of a keyset() query into the page's rows and the cursor of the next page."""
+    rows = list(rows)
+    if len(rows) <= page.size:
+        return rows, None
+    rows = rows[:page.size]
+    return rows, encode_cursor(key(rows[-1]))
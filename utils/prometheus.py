@@ -0,0 +1,101 @@
+import glob
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+from utils import metrics
+
+UNMATCHED_ROUTE = "unmatched"
+METRICS_PATH = "/metrics"
+
+
+def multiprocess_dir():
+    """Directory workers write their metric files to, when running in multiprocess mode."""
+    return os.environ.get("prometheus_multiproc_dir") or None
+
+
+def reset_multiprocess_dir():
+    """
+    Remove the metric files left by earlier runs, before workers start.
+
+    Files of the current process are kept, since its import-time metrics already live there
+    when it serves requests itself (a single worker).
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return
+    os.makedirs(path, exist_ok=True)
+    own_suffix = f"_{os.getpid()}.db"
+    for metric_file in glob.glob(os.path.join(path, "*.db")):
+        if not metric_file.endswith(own_suffix):
+            os.remove(metric_file)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus scrape endpoint, aggregating every worker's metric files in multiprocess mode."""
+    path = multiprocess_dir()
+    if path is None:
+        registry = REGISTRY
+    else:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, path=path)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def route_template(scope) -> str:
+    """
+    The path template of the route a request matches, e.g. /v1.0/teams/{team_id}, so labels
+    stay bounded however many ids are requested.
+    """
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """
+    Records latency and in-flight requests per method and route template, and makes the route
+    available to other instrumentation (DB query metrics) through metrics.current_route.
+
+    A plain ASGI middleware, so streaming responses are timed to their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        route_token = metrics.current_route.set(route)
+        in_flight = metrics.HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.HTTP_REQUEST_DURATION_SECONDS.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - started_at
+            )
+            in_flight.dec()
+            metrics.current_route.reset(route_token)
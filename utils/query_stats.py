@@ -0,0 +1,100 @@
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Expanded IN lists render one placeholder per value; collapse them so a statement keeps one shape
+_PLACEHOLDER_LIST = re.compile(r"\((?:\$\d+|\?)(?:,\s*(?:\$\d+|\?))*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace normalized and placeholder lists collapsed to (...)."""
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements a request executed, their total time, and how often each statement shape ran."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated_statements(self, limit: int) -> dict:
+        """Shapes of the statements executed more than limit times, with their counts."""
+        shapes = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return {shape: count for shape, count in shapes.items() if count > limit}
+
+
+# Stats of the request being served; None outside requests
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the statements and database time of each request, fed by the engine cursor events
+    in utils.connection_manager.
+
+    Logs a warning when a request runs more than query_budget statements, or one statement
+    shape more than repeated_statement_limit times (an N+1 loop). With add_headers, responses
+    carry X-DB-Queries and X-DB-Time (milliseconds); for streaming responses these cover the
+    statements run before the response started.
+    """
+
+    def __init__(self, app, query_budget: int, repeated_statement_limit: int, add_headers: bool = False):
+        self.app = app
+        self.query_budget = query_budget
+        self.repeated_statement_limit = repeated_statement_limit
+        self.add_headers = add_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        stats_token = current_query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.add_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((b"x-db-time", f"{stats.seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(stats_token)
+            self._check(scope, stats)
+
+    def _check(self, scope, stats: QueryStats):
+        if not stats.queries:
+            return
+        request = {"method": scope["method"], "path": scope["path"]}
+        db_time_ms = round(stats.seconds * 1000, 1)
+        if self.query_budget and stats.queries > self.query_budget:
+            logger.warning(
+                "Request exceeded its query budget",
+                queries=stats.queries, budget=self.query_budget, db_time_ms=db_time_ms, **request
+            )
+        if self.repeated_statement_limit:
+            for shape, count in stats.repeated_statements(self.repeated_statement_limit).items():
+                logger.warning(
+                    "Statement repeated within a request, possible N+1",
+                    statement=shape, count=count, limit=self.repeated_statement_limit,
+                    queries=stats.queries, db_time_ms=db_time_ms, **request
+                )
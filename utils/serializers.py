@@ -1,8 +1,12 @@
-from typing import List, Dict, Optional, Union
+from decimal import Decimal
+from typing import Any, List, Dict, Optional, Union
 from uuid import uuid4
 
+import orjson
+from fastapi.encoders import jsonable_encoder
 from pydantic.fields import Field
 from pydantic.main import BaseModel
+from starlette.responses import JSONResponse
 
 
 class ResponseData(BaseModel):
@@ -14,3 +18,38 @@ class ResponseData(BaseModel):
 
     def dict(self, *args, **kwargs):
         return super().model_dump(*args, **kwargs)
+
+
+def json_default(obj: Any):
+    """
+    orjson hook for the values it does not serialize natively, producing what jsonable_encoder would.
+
+    UUIDs, datetimes, enums, dicts and lists never reach it; orjson writes datetimes in
+    isoformat(), so a UTC offset stays "+00:00" as before. The envelope and ORM rows are
+    unpacked field by field without a pydantic pass; nested models are embedded as the JSON
+    pydantic-core writes for them.
+    """
+    if isinstance(obj, ResponseData):
+        return {
+            "identifier": obj.identifier,
+            "success": obj.success,
+            "message": obj.message,
+            "errors": obj.errors,
+            "data": obj.data,
+        }
+    if isinstance(obj, BaseModel):
+        return orjson.Fragment(obj.model_dump_json())
+    if hasattr(obj, "_sa_instance_state"):
+        return {key: value for key, value in vars(obj).items() if not key.startswith("_sa")}
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    return jsonable_encoder(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson straight from the returned objects, skipping jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,161 @@
+import functools
+import inspect
+import sys
+from contextlib import contextmanager
+from typing import Optional
+
+import structlog
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Status, StatusCode
+
+from utils.query_stats import statement_shape
+
+logger = structlog.get_logger(__name__)
+
+SERVICE_NAME = "locksmith"
+
+tracer = trace.get_tracer(SERVICE_NAME)
+
+# Spans are only created once setup_tracing ran, so instrumented code costs one check otherwise
+enabled = False
+# The exporter of setup_tracing("memory"), for tests to read finished spans from
+memory_exporter: Optional[InMemorySpanExporter] = None
+
+
+def _build_exporter(exporter: str, file_path: Optional[str]) -> SpanExporter:
+    global memory_exporter
+    if exporter == "memory":
+        memory_exporter = InMemorySpanExporter()
+        return memory_exporter
+    if exporter == "file":
+        # One JSON span per line
+        return ConsoleSpanExporter(
+            out=open(file_path, "a", buffering=1), formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError("otel_exporter otlp needs the opentelemetry-exporter-otlp-proto-http package") from e
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* environment variables
+        return OTLPSpanExporter()
+    return ConsoleSpanExporter(out=sys.stdout)
+
+
+def setup_tracing(app, exporter: str = "console", sample_ratio: float = 1.0, file_path: Optional[str] = None):
+    """
+    Install the tracer provider and instrument the FastAPI app.
+
+    Args:
+        app: The FastAPI application
+        exporter: "console", "file" (JSON lines at file_path), "memory" (tests) or "otlp"
+        sample_ratio: Share of new traces to sample; child spans follow their parent's decision
+        file_path: Output of the file exporter
+    """
+    global enabled
+    span_exporter = _build_exporter(exporter, file_path)
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+    )
+    # Tests read spans right after a request, so the memory exporter is fed synchronously
+    processor_class = SimpleSpanProcessor if exporter == "memory" else BatchSpanProcessor
+    provider.add_span_processor(processor_class(span_exporter))
+    trace.set_tracer_provider(provider)
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider, excluded_urls="_healthz,_readyz,metrics")
+    enabled = True
+    logger.info("Tracing enabled", exporter=exporter, sample_ratio=sample_ratio)
+    return provider
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """A span around the block, recording an exception that escapes it; a no-op while tracing is off."""
+    if not enabled:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as current_span:
+        yield current_span
+
+
+def _traced_method(name: str, method):
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            if not enabled:
+                async for item in method(*args, **kwargs):
+                    yield item
+                return
+            # Not made current: the context cannot stay attached across the generator's yields
+            generator_span = tracer.start_span(name)
+            try:
+                async for item in method(*args, **kwargs):
+                    yield item
+            except Exception as e:
+                generator_span.record_exception(e)
+                generator_span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+            finally:
+                generator_span.end()
+        return wrapper
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if not enabled:
+            return await method(*args, **kwargs)
+        with tracer.start_as_current_span(name):
+            return await method(*args, **kwargs)
+    return wrapper
+
+
+def traced(cls):
+    """
+    Class decorator giving every coroutine and async generator method of a service or DAO a span
+    named Class.method.
+    """
+    for attribute, method in list(vars(cls).items()):
+        if attribute.startswith("__") or not (
+            inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+        ):
+            continue
+        setattr(cls, attribute, _traced_method(f"{cls.__name__}.{attribute}", method))
+    return cls
+
+
+def start_query_span(statement: str):
+    """
+    Start a span for a SQL statement, ended by end_query_span; None while tracing is off.
+    The statement is recorded by shape, so expanded IN lists do not bloat the span.
+    """
+    if not enabled:
+        return None
+    return tracer.start_span("db.query", kind=trace.SpanKind.CLIENT, attributes={
+        "db.system": "postgresql",
+        "db.statement": statement_shape(statement),
+    })
+
+
+def end_query_span(query_span, error: Optional[BaseException] = None):
+    if query_span is None:
+        return
+    if error is not None:
+        query_span.record_exception(error)
+        query_span.set_status(Status(StatusCode.ERROR, str(error)))
+    query_span.end()
+
+
+def add_trace_context(_, __, event_dict):
+    """structlog processor adding the trace_id and span_id of the current span, if any."""
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        event_dict["trace_id"] = format(span_context.trace_id, "032x")
+        event_dict["span_id"] = format(span_context.span_id, "016x")
+    return event_dict